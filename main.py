@@ -1,60 +1,46 @@
-import tkinter as tk
-from tkinter import messagebox
-import copy
-
-class MancalaBoard:
-    def __init__(self):
-        self.board = {
-            'A': 4, 'B': 4, 'C': 4, 'D': 4, 'E': 4, 'F': 4, 1: 0,
-            'L': 4, 'K': 4, 'J': 4, 'I': 4, 'H': 4, 'G': 4,
-            2: 0
-        }
-        self.player1_pits = ('A', 'B', 'C', 'D', 'E', 'F')
-        self.player2_pits = ('G', 'H', 'I', 'J', 'K', 'L')
-        self.opposite_pits = {
-            'A': 'G', 'B': 'H', 'C': 'I', 'D': 'J', 'E': 'K', 'F': 'L',
-            'G': 'A', 'H': 'B', 'I': 'C', 'J': 'D', 'K': 'E', 'L': 'F'
-        }
-
-    def possibleMoves(self, player):
-        pits = self.player1_pits if player == 1 else self.player2_pits
-        return [pit for pit in pits if self.board[pit] > 0]
+import os
+
+import mancala
+from mancala.search import search
+from mancala.stats import debugEnabled, setDebug
+
+# Set by Play: importing this module for Game must not need a display.
+tk = messagebox = None
+
+
+def importTk():
+    global tk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox
+
+
+class MancalaBoard(mancala.MancalaBoard):
+    __slots__ = ()
 
     def doMove(self, player, pit):
-        seeds = self.board[pit]
-        self.board[pit] = 0
-        pits = list(self.board.keys())
-        current_index = pits.index(pit)
-        while seeds > 0:
-            current_index = (current_index + 1) % len(pits)
-            next_pit = pits[current_index]
-            if (player == 1 and next_pit == 2) or (player == 2 and next_pit == 1):
-                continue
-            self.board[next_pit] += 1
-            seeds -= 1
-        if next_pit in (self.player1_pits if player == 1 else self.player2_pits):
-            if self.board[next_pit] == 1:
-                opposite_pit = self.opposite_pits[next_pit]
-                captured_seeds = self.board[opposite_pit]
-                self.board[opposite_pit] = 0
-                store = 1 if player == 1 else 2
-                print("store:", store)
-                print("captured_seeds:", captured_seeds)
-                
-
-                self.board[store] += captured_seeds + 1
-                self.board[next_pit] = 0
+        record = super().doMove(player, pit)
+        captured_seeds = record[3]
+        if captured_seeds >= 0 and debugEnabled():
+            from mancala.stats import log
+
+            store = 1 if player == 1 else 2
+            log.debug("store %d captured %d seeds", store, captured_seeds)
+        return record
 
 
 class Game:
-    def __init__(self):
-        self.state = MancalaBoard()
+    def __init__(self, pits=6, seeds=4):
+        self.state = MancalaBoard.variant(pits, seeds)()
         self.playerSide = {1: 'Player 1', -1: 'Player 2'}
 
+    def is_terminal(self):
+        return self.state.is_terminal()
+
+    def final_scores(self):
+        return self.state.final_scores()
+
     def gameOver(self):
-        player1_empty = all(self.state.board[pit] == 0 for pit in self.state.player1_pits)
-        player2_empty = all(self.state.board[pit] == 0 for pit in self.state.player2_pits)
-        if player1_empty or player2_empty:
+        if self.state.is_terminal():
             for pit in self.state.player1_pits:
                 self.state.board[1] += self.state.board[pit]
                 self.state.board[pit] = 0
@@ -68,11 +54,15 @@ class Game:
         return (1, self.state.board[1]) if self.state.board[1] > self.state.board[2] else (-1, self.state.board[2])
 
     def evaluate(self):
-        return self.state.board[1] - self.state.board[2]
+        if self.state.is_terminal():
+            score1, score2 = self.state.final_scores()
+            return score1 - score2
+        pits = self.state.pits
+        return pits[self.state.layout.stores[1]] - pits[-1]
 
 
 def MinimaxAlphaBetaPruning(game, player, depth, alpha, beta):
-    if game.gameOver() or depth == 0:
+    if game.is_terminal() or depth == 0:
         return game.evaluate(), None
 
     best_value = float('-inf') if player == 1 else float('inf')
@@ -80,9 +70,9 @@ def MinimaxAlphaBetaPruning(game, player, depth, alpha, beta):
     moves = game.state.possibleMoves(player)
 
     for pit in moves:
-        new_game = copy.deepcopy(game)
-        new_game.state.doMove(player, pit)
-        value, _ = MinimaxAlphaBetaPruning(new_game, -player, depth - 1, alpha, beta)
+        record = game.state.doMove(player, pit)
+        value, _ = MinimaxAlphaBetaPruning(game, -player, depth - 1, alpha, beta)
+        game.state.undoMove(record)
 
         if player == 1:
             if value > best_value:
@@ -102,11 +92,13 @@ def MinimaxAlphaBetaPruning(game, player, depth, alpha, beta):
 
 
 class Play:
-    def __init__(self):
+    def __init__(self, pits=6, seeds=4):
+        importTk()
         self.root = tk.Tk()
         self.root.title("Mancala Game")
-        self.root.geometry("1000x400")  
-        self.game = Game()
+        self.root.geometry(f"{120 * pits + 280}x400")  
+        self.game = Game(pits, seeds)
+        self.time_limit_ms = 1000
 
         
         self.board_frame = tk.Frame(self.root, bg="lightgray", padx=10, pady=10)
@@ -129,7 +121,7 @@ class Play:
             self.board_frame, text=f"Store 1: {self.game.state.board[1]}",
             font=("Arial", 14), bg="lightblue", width=12, height=5, relief="ridge"
         )
-        self.stores[1].grid(row=1, column=7)
+        self.stores[1].grid(row=1, column=len(self.game.state.player1_pits) + 1)
 
         
         for i, pit in enumerate(self.game.state.player1_pits):
@@ -172,7 +164,7 @@ class Play:
         self.root.after(1000, self.computerTurn)
 
     def computerTurn(self):
-        _, pit = MinimaxAlphaBetaPruning(self.game, -1, 3, float('-inf'), float('inf'))
+        _, pit = search(self.game, -1, time_limit_ms=self.time_limit_ms)
         self.game.state.doMove(-1, pit)
         self.updateBoard()
         if self.game.gameOver():
@@ -191,5 +183,12 @@ class Play:
 
 
 if __name__ == "__main__":
-    gui = Play()
+    import argparse
+
+    setDebug(bool(os.environ.get("MANCALA_DEBUG")))
+    parser = argparse.ArgumentParser(description="Play Kalah.")
+    parser.add_argument("--pits", type=int, default=6, help="pits a side")
+    parser.add_argument("--seeds", type=int, default=4, help="seeds in each pit at the start")
+    args = parser.parse_args()
+    gui = Play(args.pits, args.seeds)
     gui.run()
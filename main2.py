@@ -1,143 +1,76 @@
-import tkinter as tk
-from tkinter import messagebox
-import copy
-
-class MancalaBoard:
-    def __init__(self):
-        self.board = {
-            'A': 4, 'B': 4, 'C': 4, 'D': 4, 'E': 4, 'F': 4, 1: 0,
-            'L': 4, 'K': 4, 'J': 4, 'I': 4, 'H': 4, 'G': 4,
-            2: 0
-        }
-        self.player1_pits = ('A', 'B', 'C', 'D', 'E', 'F')
-        self.player2_pits = ('G', 'H', 'I', 'J', 'K', 'L')
-        self.opposite_pits = {
-            'A': 'G', 'B': 'H', 'C': 'I', 'D': 'J', 'E': 'K', 'F': 'L',
-            'G': 'A', 'H': 'B', 'I': 'C', 'J': 'D', 'K': 'E', 'L': 'F'
-        }
-
-    def possibleMoves(self, player):
-        pits = self.player1_pits if player == 1 else self.player2_pits
-        return [pit for pit in pits if self.board[pit] > 0]
-
-    def doMove(self, player, pit):
-        seeds = self.board[pit]
-        self.board[pit] = 0
-        pits = list(self.board.keys())
-        current_index = pits.index(pit)
-        while seeds > 0:
-            current_index = (current_index + 1) % len(pits)
-            next_pit = pits[current_index]
-            if (player == 1 and next_pit == 2) or (player == 2 and next_pit == 1):
-                continue
-            self.board[next_pit] += 1
-            seeds -= 1
-        if next_pit in (self.player1_pits if player == 1 else self.player2_pits):
-            if self.board[next_pit] == 1:
-                opposite_pit = self.opposite_pits[next_pit]
-                captured_seeds = self.board[opposite_pit]
-                self.board[opposite_pit] = 0
-                store = 1 if player == 1 else 2
-                self.board[store] += captured_seeds + 1
-                self.board[next_pit] = 0
-
-
-class Game:
-    def __init__(self):
-        self.state = MancalaBoard()
-        self.playerSide = {1: 'Player 1', 2: 'Player 2'}
-
-    def gameOver(self):
-        player1_empty = all(self.state.board[pit] == 0 for pit in self.state.player1_pits)
-        player2_empty = all(self.state.board[pit] == 0 for pit in self.state.player2_pits)
-        if player1_empty or player2_empty:
-            for pit in self.state.player1_pits:
-                self.state.board[1] += self.state.board[pit]
-                self.state.board[pit] = 0
-            for pit in self.state.player2_pits:
-                self.state.board[2] += self.state.board[pit]
-                self.state.board[pit] = 0
-            return True
-        return False
-
-    def findWinner(self):
-        if self.state.board[1] > self.state.board[2]:
-            return (1, self.state.board[1])
-        elif self.state.board[2] > self.state.board[1]:
-            return (2, self.state.board[2])
-        else:
-            return (0, "égalité")
-
+import os
 
-    def evaluate(self):
-        return self.state.board[1] - self.state.board[2]
-    
-    def evaluate2(self):
-        score = self.state.board[1] - self.state.board[2]
-        player1_seeds = sum(self.state.board[pit] for pit in self.state.player1_pits)
-        player2_seeds = sum(self.state.board[pit] for pit in self.state.player2_pits)
-        score += (player1_seeds - player2_seeds) * 0.1
+from mancala.evaluation import getEvaluator, loadWeights
+from mancala.game import Game
+from mancala.stats import debugEnabled, setDebug
+from mancala.tt import TranspositionTable
 
-        return score
+# Set by Play: importing this module for Game must not need a display.
+tk = messagebox = None
 
+# How often the GUI checks on a background search, in milliseconds.
+POLL_MS = 50
 
-def MinimaxAlphaBetaPruning(play, game, player, depth, alpha, beta, use_heuristic2=False, maximum=True):
-        if game.gameOver() or depth == 0:
-            
-            if use_heuristic2:
-                return game.evaluate2(), None
-            return game.evaluate(), None
+# Built with: python -m mancala.tablebase build --out endgame.tb
+TABLEBASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame.tb")
+# Built with: python -m mancala.book build --out opening.book; only computers
+# using the evaluator it was searched with (--evaluator) play from it.
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening.book")
+# Written by: python -m mancala.tune ... --out weights.json
+WEIGHTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights.json")
 
-        
-        best_value = float('-inf') if maximum == True else float('inf')
-        
-            
-        best_pit = None
-        moves = game.state.possibleMoves(player)
-
-        for pit in moves:
-            new_game = copy.deepcopy(game)
-            new_game.state.doMove(player, pit)
-            player = player % 2 + 1
-            if play.mode == "Computer vs Computer":
-                value, _ = MinimaxAlphaBetaPruning(
-                    play, new_game, player , depth - 1, alpha, beta, use_heuristic2=(player == 2), maximum= True if player == play.maxplayer else False
-                )
-            else:
-                value, _ = MinimaxAlphaBetaPruning(
-                    play, new_game, player, depth - 1, alpha, beta, use_heuristic2=False, maximum= True if player == play.maxplayer else False
-                )
-            
-            if maximum == True:
-                if value > best_value:
-                    best_value = value
-                    best_pit = pit
-                alpha = max(alpha, best_value)
-                
-            else:
-                if value < best_value:
-                    best_value = value
-                    best_pit = pit
-                beta = min(beta, best_value)
-                
-
-            if alpha >= beta:
-                break
-            
-        return best_value, best_pit
 
+def importTk():
+    global tk, messagebox
+    import tkinter as tk
+    from tkinter import messagebox
 
 
 class Play:
-    def __init__(self):
+    def __init__(self, pits=6, seeds=4, evaluators=None, ponder=False, record=None, workers=1):
+        from mancala.book import OpeningBook
+        from mancala.tablebase import Tablebase
+
+        importTk()
         self.root = tk.Tk()
         self.root.title("Mancala Game")
-        self.root.geometry("1000x400")
-        self.game = Game()
+        self.root.geometry(f"{120 * pits + 280}x400")
+        self.game = Game(pits, seeds)
         self.player_choice = 1  
         self.current_player = 1  
         self.mode = "Human vs Computer" 
         self.maxplayer=1
+        # Evaluator names: each computer's in Computer vs Computer, and
+        # "computer" for the opponent of a human.
+        self.evaluators = {1: 'evaluate', 2: 'evaluate2', 'computer': 'evaluate'}
+        self.evaluators.update(evaluators or {})
+        self.tt = TranspositionTable()
+        self.time_limit_ms = 1000
+        self.search_handle = None
+        # More than one worker searches root moves in a process pool.
+        self.search_workers = workers
+        self.parallel = None
+        # Monte Carlo engines by name, kept so their node pools are reused.
+        self.mcts = {}
+        # Search the human's likely replies while they think (alpha-beta
+        # with one worker only), and answer without the fixed delay.
+        self.ponder = ponder
+        self.pondering = None
+        # The engine of the computer's last search, which pondering goes on from.
+        self.last_engine = None
+        # Every game is appended to this game-record file as it is played,
+        # the computer's moves with their search (see mancala.record).
+        self.record = None
+        if record:
+            from mancala.record import RecordWriter
+
+            self.record = RecordWriter(record, flush=True)
+        self.move_note = None
+        # Both files only describe the standard board.
+        standard = (pits, seeds) == (6, 4)
+        self.tablebase = Tablebase(TABLEBASE_PATH) if standard and os.path.exists(TABLEBASE_PATH) else None
+        self.book = OpeningBook.load(BOOK_PATH) if standard and os.path.exists(BOOK_PATH) else None
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         self.initModeSelection()
 
     
@@ -189,8 +122,12 @@ class Play:
         player2_button.pack(pady=10)
 
     def startGameForComputers(self):
+        self.cancelSearch()
+        self.stopPonder()
+        self.last_engine = None
         self.player_choice = 1  
         self.current_player = 1
+        self.beginRecord(1)
 
         for widget in self.root.winfo_children():
             widget.destroy()
@@ -204,15 +141,22 @@ class Play:
             self.endGame()
             return
 
-        _, pit = MinimaxAlphaBetaPruning(self, 
-                self.game, self.current_player, 3, float('-inf'), float('inf'),
-                use_heuristic2=(self.current_player == 2), maximum=True if self.current_player == self.maxplayer else False) 
         self.status_label.config(
         text="Computer 1" if self.current_player == 1 else "Computer 2", 
         bg="lightblue" if self.current_player == 1 else "lightgreen"
         )
-        print(f"Computer {self.current_player} chooses pit {pit}")
+        pit = self.bookMove(self.current_player, self.evaluators[self.current_player])
+        if pit is not None:
+            self.finishComputerTurnLoop(pit)
+            return
+        self.startSearch(self.current_player, self.evaluators[self.current_player], self.finishComputerTurnLoop)
+
+    def finishComputerTurnLoop(self, pit):
+        if debugEnabled():
+            from mancala.stats import log
+            log.debug("computer %d plays %s", self.current_player, pit)
         self.game.state.doMove(self.current_player, pit) 
+        self.recordMove(pit)
 
         self.updateBoard()
         
@@ -223,7 +167,11 @@ class Play:
         self.root.after(1000, self.computerTurnLoop)
 
     def startGame(self, starting_player):
+        self.cancelSearch()
+        self.stopPonder()
+        self.last_engine = None
         self.current_player = starting_player
+        self.beginRecord(starting_player)
         for widget in self.root.winfo_children():
             widget.destroy()
         self.setupBoard()
@@ -309,7 +257,7 @@ class Play:
             self.board_frame, text=f"Store 1: {self.game.state.board[1]}",
             font=("Arial", 14), bg="lightblue", width=12, height=5, relief="ridge"
         )
-        self.stores[1].grid(row=1, column=7)
+        self.stores[1].grid(row=1, column=len(self.game.state.player1_pits) + 1)
 
         
 
@@ -326,6 +274,9 @@ class Play:
         )
         self.status_label.pack(pady=10)
 
+        self.progress_label = tk.Label(self.root, text="", font=("Arial", 12))
+        self.progress_label.pack()
+
     def updateBoard(self):
         for pit in self.buttons.keys():
             self.buttons[pit].config(text=f"{pit}\n{self.game.state.board[pit]}")
@@ -342,6 +293,8 @@ class Play:
             messagebox.showinfo("Invalid Move", "This pit is empty. Choose another one.")
             return
         self.game.state.doMove(self.player_choice, pit)
+        self.recordMove(pit)
+        pondered = self.takePonder(pit)
         self.updateBoard()
         if self.game.gameOver():
             self.endGame()
@@ -351,20 +304,141 @@ class Play:
         text="Computer's turn..." ,
         bg="green" 
     )
-        self.root.after(1000, self.computerTurn)
+        if self.ponder:
+            self.root.after(POLL_MS, self.computerTurn, pondered)
+        else:
+            self.root.after(1000, self.computerTurn)
+
+    def computerTurn(self, pondered=None):
+        pit = self.bookMove(self.maxplayer, self.evaluators['computer'])
+        if pit is not None:
+            self.finishComputerTurn(pit)
+            return
+        self.startSearch(self.maxplayer, self.evaluators['computer'], self.finishComputerTurn, pondered)
 
-    def computerTurn(self):
-        _, pit = MinimaxAlphaBetaPruning(self, self.game, self.maxplayer, 3, float('-inf'), float('inf'), use_heuristic2=False, maximum=True)
+    def finishComputerTurn(self, pit):
         self.game.state.doMove(self.maxplayer, pit)
+        self.recordMove(pit)
         self.updateBoard()
         if self.game.gameOver():
             self.endGame()
             return
+        self.startPonder()
         self.toggleButtons(self.player_choice, state="normal")
         self.status_label.config(
         text="Your turn!" ,
         bg="red" 
     )
+
+    def beginRecord(self, first):
+        if self.record is not None:
+            layout = self.game.state.layout
+            self.record.begin(layout.pits, layout.seeds, first)
+
+    def recordMove(self, pit):
+        """Append ``pit`` to the game record, with the search that chose it if any."""
+        note, self.move_note = self.move_note, None
+        if self.record is not None:
+            self.record.move(pit, *(note or ()))
+
+    def bookMove(self, player, evaluator):
+        # The book holds one evaluator's moves; other players search.
+        if self.book is None or self.book.evaluator != evaluator:
+            return None
+        hit = self.book.lookup(self.game.state, player)
+        return None if hit is None else hit[1]
+
+    def startPonder(self):
+        from mancala.mcts import MCTS_ENGINES
+        from mancala.worker import Ponder
+
+        self.stopPonder()
+        evaluator = self.evaluators['computer']
+        if not self.ponder or self.search_workers > 1 or evaluator in MCTS_ENGINES:
+            return
+        self.pondering = Ponder(self.game, self.player_choice, getEvaluator(evaluator), self.tablebase,
+                                base=self.last_engine)
+
+    def takePonder(self, pit):
+        """``(engine, depth, seconds)`` pondered for the human's move ``pit``, or None."""
+        if self.pondering is None:
+            return None
+        engine, depth, seconds = self.pondering.take(pit)
+        self.pondering = None
+        return (engine, depth, seconds) if engine is not None else None
+
+    def stopPonder(self):
+        if self.pondering is not None:
+            self.pondering.stop()
+            self.pondering = None
+
+    def startSearch(self, player, evaluator, onMove, pondered=None):
+        from mancala.mcts import MCTS_ENGINES, mctsEngine
+        from mancala.parallel import ParallelSearch
+        from mancala.worker import SearchHandle
+
+        self.cancelSearch()
+        engine = None
+        time_limit_ms, min_depth = self.time_limit_ms, 1
+        if pondered is not None:
+            # Carry on from the pondered search: back to its depth through
+            # its table, then whatever is left of the time per move.
+            engine, min_depth, seconds = pondered
+            time_limit_ms = max(0, self.time_limit_ms - int(seconds * 1000))
+            # Its table started as a copy of ours and now holds more; later
+            # searches go on from it.
+            self.tt = engine.tt
+        elif evaluator in MCTS_ENGINES:
+            if evaluator not in self.mcts:
+                self.mcts[evaluator] = mctsEngine(evaluator, self.search_workers)
+            engine = self.mcts[evaluator]
+        else:
+            evaluator = getEvaluator(evaluator)
+            if self.search_workers > 1:
+                if self.parallel is None:
+                    self.parallel = ParallelSearch(self.search_workers)
+                self.parallel.evaluator = evaluator
+                engine = self.parallel
+        self.search_handle = SearchHandle(
+            self.game, player, time_limit_ms=time_limit_ms,
+            evaluator=evaluator, tt=self.tt, tablebase=self.tablebase, engine=engine, min_depth=min_depth)
+        self.root.after(POLL_MS, self.pollSearch, self.search_handle, onMove)
+
+    def pollSearch(self, handle, onMove):
+        if handle is not self.search_handle:
+            return
+        if not handle.done():
+            depth, nodes = handle.progress()
+            self.progress_label.config(text=f"Thinking: depth {depth}, {nodes:,} nodes")
+            self.root.after(POLL_MS, self.pollSearch, handle, onMove)
+            return
+        self.search_handle = None
+        self.last_engine = handle.engine
+        self.progress_label.config(text="")
+        value, pit = handle.result()
+        stats = handle.stats()
+        if stats is not None:
+            self.move_note = (value, stats.depth, stats.nodes, round(stats.seconds * 1000))
+        onMove(pit)
+
+    def cancelSearch(self):
+        if self.search_handle is not None:
+            self.search_handle.cancel()
+            self.search_handle = None
+
+    def close(self):
+        self.cancelSearch()
+        self.stopPonder()
+        if self.parallel is not None:
+            self.parallel.close()
+        for engine in self.mcts.values():
+            if hasattr(engine, 'close'):
+                engine.close()
+        if self.tablebase is not None:
+            self.tablebase.close()
+        if self.record is not None:
+            self.record.close()
+        self.root.destroy()
     
     
 
@@ -377,6 +451,8 @@ class Play:
         else:
             winner_name = "Player 1 = Player 2"
 
+        if self.record is not None:
+            self.record.end((self.game.state.board[1], self.game.state.board[2]))
         messagebox.showinfo("Game Over", f"{winner_name} wins with a score of {score}!")
         self.root.quit()
 
@@ -386,5 +462,30 @@ class Play:
 
 
 if __name__ == "__main__":
-    gui = Play()
+    import argparse
+
+    setDebug(bool(os.environ.get("MANCALA_DEBUG")))
+    parser = argparse.ArgumentParser(description="Play Kalah.")
+    parser.add_argument("--pits", type=int, default=6, help="pits a side")
+    parser.add_argument("--seeds", type=int, default=4, help="seeds in each pit at the start")
+    parser.add_argument("--evaluators", nargs=2, metavar=("COMPUTER1", "COMPUTER2"),
+                        help="evaluators of the two computers in Computer vs Computer, "
+                             "or mcts, mcts-greedy or mcts-batch for Monte Carlo tree search")
+    parser.add_argument("--computer", metavar="EVALUATOR",
+                        help="evaluator (or MCTS engine) of the computer against a human")
+    parser.add_argument("--ponder", action="store_true", help="let the computer think on your time")
+    parser.add_argument("--record", metavar="PATH", help="append every game to this game-record file")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes the computer searches with (pondering needs just one)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if os.path.exists(WEIGHTS_PATH):
+        loadWeights(WEIGHTS_PATH)
+    evaluators = {}
+    if args.evaluators:
+        evaluators[1], evaluators[2] = args.evaluators
+    if args.computer:
+        evaluators['computer'] = args.computer
+    gui = Play(args.pits, args.seeds, evaluators, args.ponder, args.record, args.workers)
     gui.run()
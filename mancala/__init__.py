@@ -0,0 +1,52 @@
+"""Kalah engine: rules and search, without the GUI.
+
+    import mancala
+
+    game = mancala.newGame()
+    mancala.legalMoves(game, 1)          # ['A', 'B', 'C', 'D', 'E', 'F']
+    mancala.applyMove(game, 1, 'C')
+    value, pit = mancala.searchMove(game, 2, time_limit_ms=200)
+
+These functions are the stable interface for workers and scripts.  Players
+are 1 and 2, pits are named by letter as in the GUI, and values are store 1
+minus store 2.  Importing the package loads only the board and ``Game``;
+the search and everything else load on first use, so short-lived processes
+start fast.
+"""
+from .board import MancalaBoard
+from .game import Game
+
+__all__ = ['Game', 'MancalaBoard', 'applyMove', 'legalMoves', 'newGame', 'searchMove', 'undoMove']
+
+
+def newGame(pits=6, seeds=4):
+    """A game at the start position, ``pits`` pits a side of ``seeds`` seeds."""
+    return Game(pits, seeds)
+
+
+def legalMoves(game, player):
+    """Pit names ``player`` may play."""
+    return game.state.possibleMoves(player)
+
+
+def applyMove(game, player, pit):
+    """Play ``pit`` for ``player``; returns a record for ``undoMove``."""
+    return game.state.doMove(player, pit)
+
+
+def undoMove(game, record):
+    game.state.undoMove(record)
+
+
+# Per-move budget when the caller gives none, the same as the GUI's.
+DEFAULT_TIME_MS = 1000
+
+
+def searchMove(game, player, time_limit_ms=DEFAULT_TIME_MS, max_depth=None, evaluator=None, **options):
+    """Best ``(value, pit)`` for ``player``; the keyword arguments are those of
+    ``search.search``.  The search stops after ``DEFAULT_TIME_MS`` unless told
+    otherwise; ``time_limit_ms=None`` with a ``max_depth`` searches to that
+    depth however long it takes."""
+    from .search import MAX_DEPTH, search
+
+    return search(game, player, time_limit_ms, max_depth or MAX_DEPTH, evaluator=evaluator, **options)
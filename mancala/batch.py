@@ -0,0 +1,112 @@
+"""Vectorized move generation and evaluation over many boards at once.
+
+Boards are rows of an ``(N, 14)`` integer array in ``MancalaBoard.pits``
+layout.  ``apply`` plays one move per row with the same closed-form sowing
+as ``MancalaBoard.sow`` (whole laps, then the remainder), including store
+skipping and captures; ``expand`` plays every move of every row and scores
+the results with the batch versions of ``evaluate``/``evaluate2``.
+
+Only the standard six-pit board is supported.  Requires NumPy, which the
+rest of the package does not.
+"""
+import numpy as np
+
+from .board import CYCLE, IS_OWN_PIT, OPPOSITE, PLAYER_PITS, SIZE, SOW_PATH, STORES
+
+# Tables indexed by side - 1.  OFFSETS[s, i, j] is how far along the sowing
+# path from hole i hole j lies (1..13, the origin itself being 13), or 0 for
+# the store that side skips.
+PATHS = np.array([SOW_PATH[side] for side in (1, 2)], dtype=np.intp)
+OFFSETS = np.zeros((2, SIZE, SIZE), dtype=np.int32)
+for _s in (0, 1):
+    for _i in range(SIZE):
+        for _k, _j in enumerate(SOW_PATH[_s + 1][_i]):
+            OFFSETS[_s, _i, _j] = _k + 1
+del _s, _i, _k, _j
+OWN = np.array([IS_OWN_PIT[side] for side in (1, 2)], dtype=bool)
+OPPOSITE_PIT = np.array(OPPOSITE, dtype=np.intp)
+STORE = np.array([STORES[1], STORES[2]], dtype=np.intp)
+MOVES = np.array([PLAYER_PITS[1], PLAYER_PITS[2]], dtype=np.intp)
+
+
+def apply(boards, sides, pits):
+    """Successor of each row after ``sides[n]`` plays hole ``pits[n]``.
+
+    ``sides`` and ``pits`` are scalars or length-N arrays of players (1 or
+    2) and board indices.  Rows whose hole is empty come back unchanged.
+    """
+    boards = np.asarray(boards)
+    n = len(boards)
+    rows = np.arange(n)
+    s = np.broadcast_to(np.asarray(sides) - 1, (n,))
+    pits = np.broadcast_to(np.asarray(pits, dtype=np.intp), (n,))
+    seeds = boards[rows, pits]
+    out = boards.copy()
+    out[rows, pits] = 0
+    laps, rest = np.divmod(seeds, CYCLE)
+    offsets = OFFSETS[s, pits]
+    out += np.where(offsets > 0, laps[:, None] + (offsets <= rest[:, None]), 0).astype(out.dtype)
+    last = PATHS[s, pits, (seeds - 1) % CYCLE]
+    capture = OWN[s, last] & (out[rows, last] == 1) & (seeds > 0)
+    opposite = OPPOSITE_PIT[last]
+    captured = np.where(capture, out[rows, opposite], 0)
+    out[rows[capture], opposite[capture]] = 0
+    out[rows[capture], last[capture]] = 0
+    out[rows, STORE[s]] += (captured + capture).astype(out.dtype)
+    return out
+
+
+def sideSeeds(boards):
+    boards = np.asarray(boards)
+    return boards[:, 0:6].sum(axis=1), boards[:, 7:13].sum(axis=1)
+
+
+def is_terminal(boards):
+    seeds_1, seeds_2 = sideSeeds(boards)
+    return (seeds_1 == 0) | (seeds_2 == 0)
+
+
+def sweep(boards):
+    """The end-of-game sweep of ``Game.gameOver`` applied to every row."""
+    boards = np.asarray(boards)
+    out = boards.copy()
+    terminal = is_terminal(boards)
+    seeds_1, seeds_2 = sideSeeds(boards)
+    out[terminal, 6] += seeds_1[terminal]
+    out[terminal, 13] += seeds_2[terminal]
+    out[terminal, 0:6] = 0
+    out[terminal, 7:13] = 0
+    return out
+
+
+def evaluate(boards):
+    boards = np.asarray(boards)
+    seeds_1, seeds_2 = sideSeeds(boards)
+    terminal = (seeds_1 == 0) | (seeds_2 == 0)
+    score = boards[:, 6] - boards[:, 13]
+    return np.where(terminal, score + seeds_1 - seeds_2, score)
+
+
+def evaluate2(boards):
+    boards = np.asarray(boards)
+    seeds_1, seeds_2 = sideSeeds(boards)
+    terminal = (seeds_1 == 0) | (seeds_2 == 0)
+    score = boards[:, 6] - boards[:, 13]
+    return np.where(terminal, score + seeds_1 - seeds_2, score + (seeds_1 - seeds_2) * 0.1)
+
+
+def expand(boards, side, use_heuristic2=False):
+    """Every move of ``side`` on every row.
+
+    Returns ``(successors, legal, values)``: an ``(N, 6, 14)`` array of
+    positions in ``possibleMoves`` order, an ``(N, 6)`` mask of which moves
+    are legal, and their ``(N, 6)`` evaluations (NaN where illegal).
+    """
+    boards = np.asarray(boards)
+    moves = MOVES[side - 1]
+    successors = np.stack([apply(boards, side, pit) for pit in moves], axis=1)
+    legal = boards[:, moves] > 0
+    score = evaluate2 if use_heuristic2 else evaluate
+    values = score(successors.reshape(-1, SIZE)).reshape(legal.shape).astype(float)
+    values[~legal] = np.nan
+    return successors, legal, values
@@ -0,0 +1,431 @@
+"""Array-backed Kalah board.
+
+The fourteen holes live in a flat list laid out in sowing order::
+
+    index  0..5   -> pits A..F   (player 1)
+    index  6      -> store 1
+    index  7..12  -> pits L..G   (player 2)
+    index  13     -> store 2
+
+so the pit opposite index ``i`` is ``12 - i``.  Everything a move needs
+(next hole, skipped store, opposite pit, sowing paths) is tabulated once per
+board configuration in a ``Layout``.  ``MancalaBoard.board`` keeps the
+historical letter-keyed dict interface as a view over the list, and
+``MancalaBoard.hash`` is a Zobrist hash of the pit counts kept up to date by
+every move, as are the per-side seed counts.
+
+Other sizes follow the same pattern with ``n`` pits a side: pits ``0..n-1``,
+store 1 at ``n``, pits ``n+1..2n`` and store 2 at ``2n+1``, lettered A, B, ...
+so that the first pit of player 2 is opposite A.  ``MancalaBoard.variant(n,
+seeds)`` returns the board class for one; the module-level tables below are
+those of the standard six-pit, four-seed board.
+"""
+import random
+from functools import lru_cache
+
+# string.ascii_uppercase, without importing string (and re) for it.
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MIN_PITS, MAX_PITS = 1, len(LETTERS) // 2
+
+
+def _side(player):
+    # main.py numbers the computer -1, main2.py numbers it 2.
+    return 1 if player == 1 else 2
+
+
+class Layout:
+    """Move tables for a board with ``pits`` pits a side and ``seeds`` seeds in each."""
+
+    def __init__(self, pits, seeds):
+        if not MIN_PITS <= pits <= MAX_PITS or seeds < 1:
+            raise ValueError(f"unsupported board: {pits} pits of {seeds} seeds")
+        self.pits = pits
+        self.seeds = seeds
+        size = self.size = 2 * pits + 2
+        stores = self.stores = {1: pits, 2: size - 1}
+        letters = LETTERS[:2 * pits]
+        self.pit_names = tuple(letters[:pits]) + (1,) + tuple(reversed(letters[pits:])) + (2,)
+        self.pit_index = {name: i for i, name in enumerate(self.pit_names)}
+        # Each side's pits in A..F / G..L order, which is the order moves are listed in.
+        self.player_pits = {1: tuple(range(0, pits)), 2: tuple(range(size - 2, pits, -1))}
+        self.opposite = tuple(i if i in stores.values() else 2 * pits - i for i in range(size))
+        self.start = tuple(0 if i in stores.values() else seeds for i in range(size))
+        # A player's sowing cycle skips the opponent's store, so it is one hole short.
+        cycle = self.cycle = size - 1
+        self.total_seeds = 2 * pits * seeds
+        # Bits per hole in MancalaBoard.packed(); enough for every seed in one hole.
+        self.pack_bits = self.total_seeds.bit_length()
+        self.pack_mask = (1 << self.pack_bits) - 1
+
+        self.next_pit = {}
+        for side in (1, 2):
+            skip = stores[2 if side == 1 else 1]
+            table = []
+            for i in range(size):
+                j = (i + 1) % size
+                if j == skip:
+                    j = (j + 1) % size
+                table.append(j)
+            self.next_pit[side] = tuple(table)
+
+        def sowPath(side, start):
+            path = []
+            i = start
+            for _ in range(cycle):
+                i = self.next_pit[side][i]
+                path.append(i)
+            return tuple(path)
+
+        # sow_path[side][i] is the full lap that seeds taken from hole i follow;
+        # sow_prefix[side][i][r] is the first r holes of it.
+        self.sow_path = {side: tuple(sowPath(side, i) for i in range(size)) for side in (1, 2)}
+        self.sow_prefix = {
+            side: tuple(tuple(path[:r] for r in range(cycle)) for path in self.sow_path[side])
+            for side in (1, 2)
+        }
+        self.is_own_pit = {
+            side: tuple(i in self.player_pits[side] for i in range(size)) for side in (1, 2)
+        }
+        # pit_side[i] is the player owning hole i, 0 for the stores.
+        self.pit_side = tuple(1 if i < pits else 2 if pits < i < size - 1 else 0 for i in range(size))
+        # sow_split[side][i][r] counts how many of sow_prefix[side][i][r] are pits
+        # on side 1 and on side 2; a full lap drops ``pits`` seeds on each side.
+        self.sow_split = {
+            side: tuple(
+                tuple(
+                    (sum(self.pit_side[j] == 1 for j in prefix), sum(self.pit_side[j] == 2 for j in prefix))
+                    for prefix in prefixes
+                )
+                for prefixes in self.sow_prefix[side]
+            )
+            for side in (1, 2)
+        }
+
+        # zobrist[i][n] is the key for hole i holding n seeds,
+        # zobrist_step[i][n] is the change when it goes from n to n + 1 and
+        # zobrist_clear[i][n] the change when it is emptied from n.
+        # side_keys mark the player to move.  The generator is seeded so
+        # hashes are stable between runs and can be stored on disk.
+        rng = random.Random(0x4B414C4148 if (pits, seeds) == (6, 4) else f"kalah {pits}x{seeds}")
+        self.zobrist = tuple(
+            tuple(rng.getrandbits(64) for _ in range(self.total_seeds + 1)) for _ in range(size)
+        )
+        self.zobrist_step = tuple(
+            tuple(keys[n] ^ keys[n + 1] for n in range(self.total_seeds)) for keys in self.zobrist
+        )
+        self.zobrist_clear = tuple(tuple(key ^ keys[0] for key in keys) for keys in self.zobrist)
+        self.side_keys = {1: rng.getrandbits(64), 2: rng.getrandbits(64)}
+        self.start_hash = self.zobristHash(self.start)
+
+    def __repr__(self):
+        return f"Layout({self.pits}, {self.seeds})"
+
+    def zobristHash(self, pits):
+        h = 0
+        zobrist = self.zobrist
+        for i, seeds in enumerate(pits):
+            h ^= zobrist[i][seeds]
+        return h
+
+
+def layout(pits=6, seeds=4):
+    """The tables for a configuration, built once and shared."""
+    return _layout(pits, seeds)
+
+
+@lru_cache(maxsize=None)
+def _layout(pits, seeds):
+    return Layout(pits, seeds)
+
+
+STANDARD = layout()
+
+PIT_NAMES = STANDARD.pit_names
+PIT_INDEX = STANDARD.pit_index
+SIZE = STANDARD.size
+STORES = STANDARD.stores
+PLAYER_PITS = STANDARD.player_pits
+OPPOSITE = STANDARD.opposite
+CYCLE = STANDARD.cycle
+TOTAL_SEEDS = STANDARD.total_seeds
+PACK_BITS = STANDARD.pack_bits
+PACK_MASK = STANDARD.pack_mask
+NEXT_PIT = STANDARD.next_pit
+SOW_PATH = STANDARD.sow_path
+SOW_PREFIX = STANDARD.sow_prefix
+IS_OWN_PIT = STANDARD.is_own_pit
+PIT_SIDE = STANDARD.pit_side
+SOW_SPLIT = STANDARD.sow_split
+ZOBRIST = STANDARD.zobrist
+ZOBRIST_STEP = STANDARD.zobrist_step
+ZOBRIST_CLEAR = STANDARD.zobrist_clear
+SIDE_KEYS = STANDARD.side_keys
+
+
+def zobristHash(pits):
+    return STANDARD.zobristHash(pits)
+
+
+def _moveMethods(layout):
+    """``possibleMoves``, ``sow`` and ``unsow`` with ``layout``'s tables bound
+    in as closure variables, which keeps the standard board as fast as when
+    they were module globals."""
+    pits_a_side = layout.pits
+    pit_names = layout.pit_names
+    player_pits = layout.player_pits
+    cycle = layout.cycle
+    stores = layout.stores
+    opposite_pit = layout.opposite
+    sow_path = layout.sow_path
+    sow_prefix = layout.sow_prefix
+    sow_split = layout.sow_split
+    is_own_pit = layout.is_own_pit
+    pit_side = layout.pit_side
+    zobrist = layout.zobrist
+    zobrist_step = layout.zobrist_step
+    zobrist_clear = layout.zobrist_clear
+
+    def possibleMoves(self, player):
+        pits = self.pits
+        return [pit_names[i] for i in player_pits[_side(player)] if pits[i] > 0]
+
+    def sow(self, side, index):
+        """Play the seeds in hole ``index`` for ``side`` (1 or 2).
+
+        Returns an undo record ``(side, index, seeds, captured, hash)`` where
+        ``captured`` is the number of seeds taken from the opposite pit (-1
+        when the last seed made no capture) and ``hash`` is the Zobrist hash
+        before the move.
+        """
+        pits = self.pits
+        side_seeds = self.side_seeds
+        old_hash = h = self.hash
+        seeds = pits[index]
+        h ^= zobrist_clear[index][seeds]
+        pits[index] = 0
+        side_seeds[pit_side[index]] -= seeds
+        path = sow_path[side][index]
+        # Under a lap, the usual case, is one XOR per pit sown into; a longer
+        # move goes round once per pit with its lap count, then the rest.
+        if seeds < cycle:
+            for j in sow_prefix[side][index][seeds]:
+                n = pits[j]
+                h ^= zobrist_step[j][n]
+                pits[j] = n + 1
+            to1, to2 = sow_split[side][index][seeds]
+            last = path[seeds - 1]
+        else:
+            laps, rest = divmod(seeds, cycle)
+            for j in path:
+                n = pits[j]
+                h ^= zobrist[j][n] ^ zobrist[j][n + laps]
+                pits[j] = n + laps
+            for j in sow_prefix[side][index][rest]:
+                n = pits[j]
+                h ^= zobrist_step[j][n]
+                pits[j] = n + 1
+            to1, to2 = sow_split[side][index][rest]
+            to1 += pits_a_side * laps
+            to2 += pits_a_side * laps
+            last = path[(seeds - 1) % cycle]
+        side_seeds[1] += to1
+        side_seeds[2] += to2
+        captured = -1
+        if is_own_pit[side][last] and pits[last] == 1:
+            opposite = opposite_pit[last]
+            store = stores[side]
+            captured = pits[opposite]
+            h ^= (zobrist_clear[opposite][captured] ^ zobrist_step[last][0]
+                  ^ zobrist[store][pits[store]] ^ zobrist[store][pits[store] + captured + 1])
+            pits[opposite] = 0
+            pits[last] = 0
+            pits[store] += captured + 1
+            side_seeds[side] -= 1
+            side_seeds[3 - side] -= captured
+        self.hash = h
+        return (side, index, seeds, captured, old_hash)
+
+    def unsow(self, record):
+        side, index, seeds, captured, old_hash = record
+        pits = self.pits
+        side_seeds = self.side_seeds
+        laps, rest = divmod(seeds, cycle)
+        path = sow_path[side][index]
+        if captured >= 0:
+            last = path[(seeds - 1) % cycle]
+            pits[stores[side]] -= captured + 1
+            pits[opposite_pit[last]] = captured
+            pits[last] = 1
+            side_seeds[side] += 1
+            side_seeds[3 - side] += captured
+        if laps:
+            for j in path:
+                pits[j] -= laps
+        for j in sow_prefix[side][index][rest]:
+            pits[j] -= 1
+        to1, to2 = sow_split[side][index][rest]
+        side_seeds[1] -= pits_a_side * laps + to1
+        side_seeds[2] -= pits_a_side * laps + to2
+        side_seeds[pit_side[index]] += seeds
+        pits[index] = seeds
+        self.hash = old_hash
+
+    return possibleMoves, sow, unsow
+
+
+class BoardView:
+    """Letter-keyed dict facade over ``MancalaBoard.pits``."""
+
+    __slots__ = ('_board',)
+
+    def __init__(self, board):
+        self._board = board
+
+    def __getitem__(self, pit):
+        board = self._board
+        return board.pits[board.layout.pit_index[pit]]
+
+    def __setitem__(self, pit, seeds):
+        board = self._board
+        layout = board.layout
+        index = layout.pit_index[pit]
+        board.side_seeds[layout.pit_side[index]] += seeds - board.pits[index]
+        board.hash ^= layout.zobrist[index][board.pits[index]] ^ layout.zobrist[index][seeds]
+        board.pits[index] = seeds
+
+    def __contains__(self, pit):
+        return pit in self._board.layout.pit_index
+
+    def __iter__(self):
+        return iter(self._board.layout.pit_names)
+
+    def __len__(self):
+        return self._board.layout.size
+
+    def keys(self):
+        return self._board.layout.pit_names
+
+    def values(self):
+        return list(self._board.pits)
+
+    def items(self):
+        return list(zip(self._board.layout.pit_names, self._board.pits))
+
+    def __eq__(self, other):
+        return dict(self.items()) == dict(other.items())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class MancalaBoard:
+    __slots__ = ('pits', 'side_seeds', 'hash', 'board')
+
+    layout = STANDARD
+    player1_pits = ('A', 'B', 'C', 'D', 'E', 'F')
+    player2_pits = ('G', 'H', 'I', 'J', 'K', 'L')
+    opposite_pits = {
+        'A': 'G', 'B': 'H', 'C': 'I', 'D': 'J', 'E': 'K', 'F': 'L',
+        'G': 'A', 'H': 'B', 'I': 'C', 'J': 'D', 'K': 'E', 'L': 'F'
+    }
+
+    _variants = {}
+
+    def __init__(self):
+        layout = self.layout
+        self.pits = list(layout.start)
+        # Seeds left in each side's pits, indexed by player; slot 0 soaks up
+        # writes to the stores.
+        half = layout.total_seeds // 2
+        self.side_seeds = [0, half, half]
+        self.hash = layout.start_hash
+        self.board = BoardView(self)
+
+    @classmethod
+    def variant(cls, pits=6, seeds=4):
+        """This board class for ``pits`` pits a side of ``seeds`` seeds each."""
+        config = layout(pits, seeds)
+        if config is cls.layout:
+            return cls
+        key = (cls, config)
+        variant = cls._variants.get(key)
+        if variant is None:
+            names = config.pit_names
+            player1 = tuple(names[i] for i in config.player_pits[1])
+            player2 = tuple(names[i] for i in config.player_pits[2])
+            methods = dict(zip(('possibleMoves', 'sow', 'unsow'), _moveMethods(config)))
+            variant = cls._variants[key] = type(f"{cls.__name__}_{pits}x{seeds}", (cls,), {
+                '__slots__': (),
+                'layout': config,
+                **methods,
+                'player1_pits': player1,
+                'player2_pits': player2,
+                'opposite_pits': {names[i]: names[config.opposite[i]]
+                                  for i in config.player_pits[1] + config.player_pits[2]},
+            })
+        return variant
+
+    @classmethod
+    def fromPits(cls, pits):
+        board = cls()
+        store = cls.layout.stores[1]
+        board.pits = list(pits)
+        board.side_seeds = [0, sum(board.pits[0:store]), sum(board.pits[store + 1:-1])]
+        board.hash = cls.layout.zobristHash(board.pits)
+        return board
+
+    @classmethod
+    def fromPacked(cls, code):
+        layout = cls.layout
+        pits = []
+        for _ in range(layout.size):
+            pits.append(code & layout.pack_mask)
+            code >>= layout.pack_bits
+        return cls.fromPits(pits)
+
+    def packed(self):
+        """The position as one int, ``layout.pack_bits`` per hole, hole 0 lowest."""
+        bits = self.layout.pack_bits
+        code = 0
+        for seeds in reversed(self.pits):
+            code = (code << bits) | seeds
+        return code
+
+    def is_terminal(self):
+        side_seeds = self.side_seeds
+        return side_seeds[1] == 0 or side_seeds[2] == 0
+
+    def features(self):
+        """``(stores, seeds, empty, capture)``, each player 1's count minus player
+        2's: seeds in the store, seeds in the pits, empty pits, and the seeds
+        facing empty pits, which a last seed landing there would capture."""
+        layout = self.layout
+        pits = self.pits
+        side_seeds = self.side_seeds
+        opposite = layout.opposite
+        # Counted on demand: scanning the pits here is as quick as reading
+        # bits that every sow would have to keep up to date.
+        empty = capture = 0
+        for i in layout.player_pits[1]:
+            if not pits[i]:
+                empty += 1
+                capture += pits[opposite[i]]
+        for i in layout.player_pits[2]:
+            if not pits[i]:
+                empty -= 1
+                capture -= pits[opposite[i]]
+        return (pits[layout.stores[1]] - pits[-1], side_seeds[1] - side_seeds[2], empty, capture)
+
+    def final_scores(self):
+        """Store totals once the remaining pits are swept, without sweeping."""
+        pits = self.pits
+        side_seeds = self.side_seeds
+        return pits[self.layout.stores[1]] + side_seeds[1], pits[-1] + side_seeds[2]
+
+    possibleMoves, sow, unsow = _moveMethods(STANDARD)
+
+    def doMove(self, player, pit):
+        return self.sow(_side(player), self.layout.pit_index[pit])
+
+    def undoMove(self, record):
+        self.unsow(record)
@@ -0,0 +1,256 @@
+"""Opening book: best moves of the first few plies, searched offline.
+
+Every game starts from the same position, so the positions of the first
+plies can be searched deeply once and looked up afterwards.  Entries are
+keyed like the transposition table, ``MancalaBoard.hash ^ SIDE_KEYS[side]``,
+and hold the move, the depth it was searched to and the value (store 1 minus
+store 2, as ``search`` reports it).  A book is searched with one evaluator,
+whose name it keeps: its moves are that evaluator's, and only players using
+it should follow them.
+
+On disk a book is a small header and the evaluator's name followed by
+fixed-size records sorted by key::
+
+    python -m mancala.book build --plies 4 --depth 12 --workers 4 --evaluator evaluate --out opening.book
+    python -m mancala.tournament evaluate:8 evaluate2:8 --games 200 --out games.jsonl
+    python -m mancala.book extend opening.book games.jsonl --plies 8 --depth 12
+    python -m mancala.book merge opening.book other.book --out opening.book
+
+``extend`` searches the positions that recorded self-play games actually
+reached, so the book grows along the lines engines play; ``merge`` combines
+books built elsewhere with the same evaluator, keeping the deeper search of
+each position.
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .board import PIT_INDEX, PIT_NAMES, PLAYER_PITS, SIDE_KEYS, MancalaBoard
+from .evaluation import getEvaluator
+from .search import Search
+from .tournament import _gameClass
+
+MAGIC = b"MKOB"
+HEADER = struct.Struct("<4sHI")
+# Version 2 follows the header with the evaluator's name, length first;
+# version 1 books were all searched with evaluate.
+VERSION = 2
+NAME = struct.Struct("<B")
+# key, board index, depth, value
+RECORD = struct.Struct("<QBBh")
+
+_engine = None
+
+
+def bookKey(state, side):
+    return state.hash ^ SIDE_KEYS[side]
+
+
+class OpeningBook:
+    def __init__(self, evaluator='evaluate'):
+        # Name of the evaluator every entry was searched with.
+        self.evaluator = evaluator
+        self.entries = {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, count = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError(f"{path} is not a Mancala opening book")
+        offset = HEADER.size
+        book = cls()
+        if version == VERSION:
+            length, = NAME.unpack_from(data, offset)
+            offset += NAME.size
+            book.evaluator = data[offset:offset + length].decode()
+            offset += length
+        for key, index, depth, value in RECORD.iter_unpack(data[offset:offset + count * RECORD.size]):
+            book.entries[key] = (index, depth, value)
+        return book
+
+    def save(self, path):
+        name = self.evaluator.encode()
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.entries)))
+            f.write(NAME.pack(len(name)) + name)
+            for key in sorted(self.entries):
+                f.write(RECORD.pack(key, *self.entries[key]))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def depth(self, key):
+        entry = self.entries.get(key)
+        return -1 if entry is None else entry[1]
+
+    def add(self, key, index, depth, value):
+        """Record a searched move unless a deeper one is already known."""
+        if depth > self.depth(key):
+            self.entries[key] = (index, depth, value)
+
+    def merge(self, other):
+        if other.evaluator != self.evaluator:
+            raise ValueError(f"cannot merge a book of {other.evaluator} into one of {self.evaluator}")
+        for key, entry in other.entries.items():
+            self.add(key, *entry)
+
+    def lookup(self, state, player):
+        """``(value, pit)`` for ``player`` to move, or None when out of book."""
+        side = 1 if player == 1 else 2
+        entry = self.entries.get(bookKey(state, side))
+        if entry is None:
+            return None
+        index, _, value = entry
+        if not state.pits[index]:
+            # A hash collision; never play an illegal move from the book.
+            return None
+        return value, PIT_NAMES[index]
+
+
+def openingPositions(plies):
+    """``(packed, side)`` of every position within ``plies`` moves of the start."""
+    seen = set()
+    frontier = [(MancalaBoard(), 1)]
+    for ply in range(plies + 1):
+        following = []
+        for state, side in frontier:
+            key = bookKey(state, side)
+            if key in seen or state.is_terminal():
+                continue
+            seen.add(key)
+            yield state.packed(), side
+            if ply == plies:
+                continue
+            for index in PLAYER_PITS[side]:
+                if state.pits[index]:
+                    child = MancalaBoard.fromPits(state.pits)
+                    child.sow(side, index)
+                    following.append((child, 3 - side))
+        frontier = following
+
+
+def gamePositions(lines, plies):
+    """``(packed, side)`` of the first ``plies`` positions of recorded games.
+
+    ``lines`` are tournament JSON lines; ``m`` holds every move of the game.
+    """
+    for line in lines:
+        moves = json.loads(line).get("m")
+        if not moves:
+            continue
+        state = MancalaBoard()
+        side = 1
+        for pit in moves[:plies]:
+            if state.is_terminal():
+                break
+            yield state.packed(), side
+            state.sow(side, PIT_INDEX[pit])
+            side = 3 - side
+
+
+def _searchPosition(task):
+    global _engine
+    packed, side, depth, evaluator = task
+    if _engine is None or _engine.evaluator.name != evaluator:
+        _engine = Search(evaluator=evaluator)
+    game = _gameClass()()
+    game.state = MancalaBoard.fromPacked(packed)
+    value, pit = _engine.run(game, side, max_depth=depth)
+    # Records hold whole seeds; weighted evaluators give fractions.
+    return bookKey(game.state, side), PIT_INDEX[pit], depth, round(value)
+
+
+def extend(book, positions, depth, workers=1, report=None):
+    """Search every position the book does not know to ``depth`` yet.
+
+    ``report(done, total)`` is called after each position.
+    """
+    tasks = []
+    queued = set()
+    for packed, side in positions:
+        key = bookKey(MancalaBoard.fromPacked(packed), side)
+        if key not in queued and book.depth(key) < depth:
+            queued.add(key)
+            tasks.append((packed, side, depth, book.evaluator))
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers)
+        results = pool.map(_searchPosition, tasks, chunksize=4)
+    else:
+        pool = None
+        results = map(_searchPosition, tasks)
+    try:
+        for done, result in enumerate(results, 1):
+            book.add(*result)
+            if report is not None:
+                report(done, len(tasks))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return len(tasks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build, extend or merge an opening book.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="search every position of the first plies")
+    build_parser.add_argument("--out", default="opening.book")
+    build_parser.add_argument("--evaluator", default="evaluate", help="evaluator the book is searched with")
+    extend_parser = commands.add_parser("extend", help="search positions reached in recorded games")
+    extend_parser.add_argument("book")
+    extend_parser.add_argument("games", nargs="+", help="tournament JSON-lines files")
+    for command in (build_parser, extend_parser):
+        command.add_argument("--plies", type=int, default=4)
+        command.add_argument("--depth", type=int, default=12)
+        command.add_argument("--workers", type=int, default=1)
+    merge_parser = commands.add_parser("merge", help="combine books, keeping the deeper entries")
+    merge_parser.add_argument("books", nargs="+")
+    merge_parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "merge":
+        books = [OpeningBook.load(path) for path in args.books]
+        book = OpeningBook(books[0].evaluator)
+        try:
+            for other in books:
+                book.merge(other)
+        except ValueError as error:
+            parser.error(str(error))
+        out = args.out
+    else:
+        def report(done, total):
+            print(f"\r{done}/{total} positions", end="", flush=True)
+
+        if args.command == "build":
+            try:
+                getEvaluator(args.evaluator)
+            except ValueError as error:
+                parser.error(str(error))
+            book = OpeningBook(args.evaluator)
+            positions = openingPositions(args.plies)
+            out = args.out
+        else:
+            book = OpeningBook.load(args.book)
+            positions = []
+            for path in args.games:
+                with open(path) as f:
+                    positions.extend(gamePositions(f, args.plies))
+            out = args.book
+        searched = extend(book, positions, args.depth, args.workers, report)
+        print(f"\rsearched {searched} positions to depth {args.depth}")
+    book.save(out)
+    print(f"{out}: {len(book)} {book.evaluator} entries, {os.path.getsize(out):,} bytes, "
+          f"{time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
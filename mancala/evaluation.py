@@ -0,0 +1,142 @@
+"""Weighted evaluation functions, registered by name.
+
+An evaluator scores a position from player 1's point of view as a weighted
+sum of ``MancalaBoard.features()``::
+
+    stores   store 1 minus store 2
+    seeds    seeds in player 1's pits minus seeds in player 2's
+    empty    empty pits, player 1's minus player 2's
+    capture  seeds facing player 1's empty pits minus those facing player 2's
+
+A finished game scores its final store difference whatever the weights.
+``evaluate`` and ``evaluate2`` are registered with the weights that make
+them equal to ``Game.evaluate`` and ``Game.evaluate2``; more come from a
+weight file written by ``python -m mancala.tune``::
+
+    {"tuned": {"stores": 1.0, "seeds": 0.12, "empty": -0.3, "capture": 0.4}}
+
+Each evaluator compiles its weights into a closure once, so a leaf costs the
+same as the hand-written methods and nothing is looked up per move.
+"""
+import random
+
+from .tt import HEURISTIC2_KEY
+
+FEATURES = ('stores', 'seeds', 'empty', 'capture')
+
+# Named subsets of FEATURES for the tuner to fit.
+FEATURE_SETS = {
+    'stores': ('stores',),
+    'material': ('stores', 'seeds'),
+    'full': FEATURES,
+}
+
+
+class Evaluator:
+    """``evaluate(state)`` for one weight vector over ``FEATURES``."""
+
+    def __init__(self, name, weights):
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"unknown features {sorted(unknown)}; expected some of {FEATURES}")
+        self.name = name
+        self.weights = {feature: weights[feature] for feature in FEATURES if weights.get(feature)}
+        # Salt for transposition-table keys: evaluators with the same weights
+        # give the same values and may share entries.  The built-in ones keep
+        # the salts they had as booleans.
+        vector = tuple(self.weights.get(feature, 0) for feature in FEATURES)
+        if vector == (1, 0, 0, 0):
+            self.key = 0
+        elif vector == (1, 0.1, 0, 0):
+            self.key = HEURISTIC2_KEY
+        else:
+            self.key = random.Random(f"evaluator {vector}").getrandbits(64)
+        self.evaluate = _compile(vector)
+
+    def __call__(self, state):
+        return self.evaluate(state)
+
+    def __reduce__(self):
+        # The closure does not pickle; worker processes rebuild it.
+        return Evaluator, (self.name, self.weights)
+
+    def __repr__(self):
+        return f"Evaluator({self.name!r}, {self.weights})"
+
+
+def _compile(vector):
+    w_stores, w_seeds, w_empty, w_capture = vector
+    if w_empty or w_capture:
+        def evaluate(state):
+            side_seeds = state.side_seeds
+            if side_seeds[1] == 0 or side_seeds[2] == 0:
+                score_1, score_2 = state.final_scores()
+                return score_1 - score_2
+            stores, seeds, empty, capture = state.features()
+            return w_stores * stores + w_seeds * seeds + w_empty * empty + w_capture * capture
+    elif w_seeds:
+        def evaluate(state):
+            pits = state.pits
+            side_seeds = state.side_seeds
+            seeds_1, seeds_2 = side_seeds[1], side_seeds[2]
+            if seeds_1 == 0 or seeds_2 == 0:
+                return pits[state.layout.stores[1]] + seeds_1 - pits[-1] - seeds_2
+            return w_stores * (pits[state.layout.stores[1]] - pits[-1]) + w_seeds * (seeds_1 - seeds_2)
+    else:
+        def evaluate(state):
+            pits = state.pits
+            side_seeds = state.side_seeds
+            seeds_1, seeds_2 = side_seeds[1], side_seeds[2]
+            if seeds_1 == 0 or seeds_2 == 0:
+                return pits[state.layout.stores[1]] + seeds_1 - pits[-1] - seeds_2
+            return w_stores * (pits[state.layout.stores[1]] - pits[-1])
+    return evaluate
+
+
+EVALUATORS = {}
+
+
+def register(name, weights):
+    """Add (or replace) the evaluator ``name`` and return it."""
+    result = EVALUATORS[name] = Evaluator(name, weights)
+    return result
+
+
+def getEvaluator(spec=None):
+    """The evaluator for ``spec``: an ``Evaluator``, a registered name, or
+    None for ``evaluate``."""
+    if isinstance(spec, Evaluator):
+        return spec
+    try:
+        return EVALUATORS['evaluate' if spec is None else spec]
+    except KeyError:
+        raise ValueError(f"no evaluator named {spec!r}; known: {', '.join(EVALUATORS)}") from None
+
+
+def loadWeights(path):
+    """Register every evaluator in a weight file; returns their names."""
+    import json
+
+    with open(path) as f:
+        data = json.load(f)
+    return [register(name, weights).name for name, weights in data.items()]
+
+
+def saveWeights(path, evaluators):
+    """Write ``evaluators`` to a weight file, keeping the others already in it."""
+    import json
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    for item in evaluators:
+        data[item.name] = item.weights
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1)
+        f.write('\n')
+
+
+EVALUATE = register('evaluate', {'stores': 1})
+EVALUATE2 = register('evaluate2', {'stores': 1, 'seeds': 0.1})
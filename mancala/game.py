@@ -0,0 +1,130 @@
+"""The game the GUIs play, without the GUI.
+
+``Game`` wraps a ``MancalaBoard`` with the end-of-game sweep, the winner
+and the two hand-written evaluations; ``MinimaxAlphaBetaPruning`` is the
+original fixed-depth search of ``main2.py``, which still takes the ``Play``
+object for its mode and maximizing player.  Nothing here imports tkinter.
+"""
+from .board import MancalaBoard
+from .tt import COMPUTERS_KEY, EXACT, HEURISTIC2_KEY, LOWER, MAXIMUM_KEY, MAXPLAYER2_KEY, UPPER
+
+
+class Game:
+    def __init__(self, pits=6, seeds=4):
+        self.state = MancalaBoard.variant(pits, seeds)()
+        self.playerSide = {1: 'Player 1', 2: 'Player 2'}
+
+    def is_terminal(self):
+        return self.state.is_terminal()
+
+    def final_scores(self):
+        return self.state.final_scores()
+
+    def gameOver(self):
+        if self.state.is_terminal():
+            for pit in self.state.player1_pits:
+                self.state.board[1] += self.state.board[pit]
+                self.state.board[pit] = 0
+            for pit in self.state.player2_pits:
+                self.state.board[2] += self.state.board[pit]
+                self.state.board[pit] = 0
+            return True
+        return False
+
+    def findWinner(self):
+        if self.state.board[1] > self.state.board[2]:
+            return (1, self.state.board[1])
+        elif self.state.board[2] > self.state.board[1]:
+            return (2, self.state.board[2])
+        else:
+            return (0, "égalité")
+
+
+    def evaluate(self):
+        if self.state.is_terminal():
+            score1, score2 = self.state.final_scores()
+            return score1 - score2
+        pits = self.state.pits
+        return pits[self.state.layout.stores[1]] - pits[-1]
+
+    def evaluate2(self):
+        if self.state.is_terminal():
+            score1, score2 = self.state.final_scores()
+            return score1 - score2
+        pits = self.state.pits
+        score = pits[self.state.layout.stores[1]] - pits[-1]
+        player1_seeds, player2_seeds = self.state.side_seeds[1], self.state.side_seeds[2]
+        score += (player1_seeds - player2_seeds) * 0.1
+
+        return score
+
+
+def MinimaxAlphaBetaPruning(play, game, player, depth, alpha, beta, use_heuristic2=False, maximum=True, tt=None):
+        if game.is_terminal() or depth == 0:
+            if use_heuristic2:
+                return game.evaluate2(), None
+            return game.evaluate(), None
+
+        computers = play.mode == "Computer vs Computer"
+        if tt is not None:
+            # Below this node the mode picks each side's heuristic and
+            # maxplayer who maximizes, so both are part of the key.
+            key = game.state.hash ^ game.state.layout.side_keys[player]
+            if maximum:
+                key ^= MAXIMUM_KEY
+            if use_heuristic2:
+                key ^= HEURISTIC2_KEY
+            if computers:
+                key ^= COMPUTERS_KEY
+            if play.maxplayer == 2:
+                key ^= MAXPLAYER2_KEY
+            alpha_orig, beta_orig = alpha, beta
+            entry = tt.lookup(key)
+            if entry is not None and entry[1] >= depth:
+                _, _, bound, value, pit = entry
+                if bound == EXACT:
+                    return value, pit
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, pit
+
+        best_value = float('-inf') if maximum == True else float('inf')
+        best_pit = None
+        moves = game.state.possibleMoves(player)
+
+        for pit in moves:
+            record = game.state.doMove(player, pit)
+            opponent = player % 2 + 1
+            value, _ = MinimaxAlphaBetaPruning(
+                play, game, opponent, depth - 1, alpha, beta,
+                use_heuristic2=computers and opponent == 2, maximum=opponent == play.maxplayer, tt=tt
+            )
+            game.state.undoMove(record)
+
+            if maximum == True:
+                if value > best_value:
+                    best_value = value
+                    best_pit = pit
+                alpha = max(alpha, best_value)
+            else:
+                if value < best_value:
+                    best_value = value
+                    best_pit = pit
+                beta = min(beta, best_value)
+
+            if alpha >= beta:
+                break
+
+        if tt is not None:
+            if best_value <= alpha_orig:
+                bound = UPPER
+            elif best_value >= beta_orig:
+                bound = LOWER
+            else:
+                bound = EXACT
+            tt.store(key, depth, bound, best_value, best_pit)
+
+        return best_value, best_pit
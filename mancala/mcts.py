@@ -0,0 +1,414 @@
+"""Monte Carlo tree search (UCT).
+
+    engine = MCTS(iterations=5000)
+    value, pit = engine.run(game, 2)                    # 5000 playouts
+    value, pit = engine.run(game, 2, time_limit_ms=200)  # or 200 ms
+
+``MCTS`` and ``ParallelMCTS`` have the interface of ``Search``, so they work
+with ``SearchHandle``, in the tournament (engines ``mcts:2000`` and
+``mcts:50ms``) and for either computer in ``main2.py`` (``--evaluators mcts
+evaluate2``).  The move played is the root move with the most playouts and
+its value is the mean final store 1 minus store 2 of those playouts.
+
+The tree lives in a pool of parallel lists, one row per node, that grows
+but is never freed, so a search allocates no per-node objects and the lists
+are reused by the next one.  A node's children are allocated together when
+it is expanded, which happens on its second visit, so a node only stores its
+first child and their count.  Positions are not stored either: each
+iteration plays the path from the root with ``sow`` and takes it back with
+``unsow``.
+
+Playouts play to the end of the game and count a win as 1 and a draw as
+1/2.  ``random`` playouts choose uniformly; ``greedy`` ones take the biggest
+capture, else a move ending in the store, else a random one.  With
+``batch`` > 1 each leaf is scored by that many random playouts at once on
+NumPy (``batch.apply``; standard board only), and ``ParallelMCTS`` grows an
+independent tree in each worker process and adds up their root statistics.
+"""
+import math
+import multiprocessing
+import random
+import time
+from functools import lru_cache
+
+from .board import MancalaBoard
+from .pool import localDeadline, stopRequested, workerPool
+from .stats import SearchStats
+
+PLAYOUTS = ('random', 'greedy')
+
+# Engine names the tournament and main2.py accept next to evaluator names.
+MCTS_ENGINES = {
+    'mcts': {},
+    'mcts-greedy': {'playout': 'greedy'},
+    'mcts-batch': {'batch': 256},
+}
+
+# The clock is read once every CHECK_INTERVAL + 1 iterations.
+CHECK_INTERVAL = 15
+
+
+class MCTS:
+    def __init__(self, iterations=10000, exploration=1.4, playout='random', batch=1, seed=None):
+        if playout not in PLAYOUTS:
+            raise ValueError(f"playout must be one of {PLAYOUTS}, not {playout!r}")
+        self.iterations = iterations
+        self.exploration = exploration
+        self.playout = playout
+        self.batch = batch
+        self.rng = random.Random(seed)
+        self._numpy_rng = None
+        # The node pool: node n is row n of these lists, the root is row 0.
+        # first[n] is n's first child (-1 until expanded) and count[n] how
+        # many it has; wins[n] is the playout score of the player who moved
+        # into n and margins[n] the sum of final store differences.
+        self.move = []
+        self.first = []
+        self.count = []
+        self.visits = []
+        self.wins = []
+        self.margins = []
+        self.size = 0
+        self.root_side = 1
+        self.playouts = 0
+        self.nodes = 0
+        self.depth = 0
+        self.current_depth = 0
+        self.stopped = False
+        self.stats = SearchStats()
+
+    def stop(self):
+        """Ask a running search to return; safe to call from another thread."""
+        self.stopped = True
+
+    def stopping(self, deadline):
+        return self.stopped or deadline is not None and time.perf_counter() >= deadline
+
+    @property
+    def playouts_per_second(self):
+        return self.stats.nps
+
+    def run(self, game, player, time_limit_ms=None, max_depth=None, iterations=None):
+        """Best ``(value, pit)`` for ``player`` after ``iterations`` playouts
+        (``self.iterations`` without a time limit) or ``time_limit_ms``,
+        whichever comes first.  ``max_depth`` is accepted for ``Search``
+        compatibility and ignored."""
+        side = 1 if player == 1 else 2
+        state = game.state
+        start = time.perf_counter()
+        if state.is_terminal():
+            score_1, score_2 = state.final_scores()
+            return score_1 - score_2, None
+        if iterations is None and time_limit_ms is None:
+            iterations = self.iterations
+        deadline = None if time_limit_ms is None else start + time_limit_ms / 1000
+        self.grow(state, side, deadline, iterations)
+        stats = self.stats = SearchStats()
+        stats.seconds = time.perf_counter() - start
+        stats.depth = self.depth
+        # A playout is the unit of work, so nodes/s reads as playouts/s.
+        stats.nodes = stats.leaves = self.playouts
+        best = max(self.rootChildren(), key=lambda child: child[1])
+        index, visits, _, margins = best
+        return margins / visits, state.layout.pit_names[index]
+
+    def rootChildren(self):
+        """``(hole, visits, wins, margins)`` of every root move."""
+        start = self.first[0]
+        return [(self.move[n], self.visits[n], self.wins[n], self.margins[n])
+                for n in range(start, start + self.count[0])]
+
+    def reserve(self, size):
+        if size > len(self.visits):
+            extra = max(size, 2 * len(self.visits), 1024) - len(self.visits)
+            for column in (self.move, self.first, self.count, self.visits, self.wins, self.margins):
+                column.extend([0] * extra)
+
+    def expand(self, node, moves):
+        first = self.size
+        end = self.size = first + len(moves)
+        self.reserve(end)
+        self.first[node] = first
+        self.count[node] = len(moves)
+        self.move[first:end] = moves
+        self.first[first:end] = [-1] * len(moves)
+        self.count[first:end] = [0] * len(moves)
+        self.visits[first:end] = [0] * len(moves)
+        self.wins[first:end] = [0.0] * len(moves)
+        self.margins[first:end] = [0] * len(moves)
+
+    def grow(self, state, side, deadline=None, iterations=None):
+        """Run playouts from ``state`` with ``side`` to move into a new tree."""
+        layout = state.layout
+        player_pits = layout.player_pits
+        pits = state.pits
+        sow, unsow = state.sow, state.unsow
+        if self.batch > 1:
+            if layout.size != 14:
+                raise ValueError("batched playouts need the standard six-pit board")
+            playout = self.batchPlayout
+        else:
+            playout = self.greedyPlayout if self.playout == 'greedy' else self.randomPlayout
+        self.size = 1
+        self.reserve(1)
+        self.first[0], self.count[0], self.visits[0], self.wins[0], self.margins[0] = -1, 0, 0, 0.0, 0
+        self.expand(0, [i for i in player_pits[side] if pits[i]])
+        self.root_side = side
+        self.playouts = self.nodes = self.depth = self.current_depth = 0
+        move, first, count, visits, wins, margins = (
+            self.move, self.first, self.count, self.visits, self.wins, self.margins)
+        c = self.exploration
+        log, sqrt = math.log, math.sqrt
+        # Every root move gets a playout whatever the time or a stop, as
+        # Search always finishes depth 1, so there is a value to return.
+        root_moves = count[0]
+        if iterations is not None:
+            iterations = max(iterations, root_moves)
+        done = 0
+        while iterations is None or done < iterations:
+            if done >= root_moves and not done & CHECK_INTERVAL:
+                self.nodes = self.playouts
+                if self.stopping(deadline):
+                    break
+            done += 1
+            # Selection: UCB1 down to a leaf, playing the moves on the board.
+            node = 0
+            to_move = side
+            path = [0]
+            records = []
+            while count[node]:
+                start = first[node]
+                explore = c * sqrt(log(visits[node] or 1))
+                best, best_score = start, -1.0
+                for child in range(start, start + count[node]):
+                    n = visits[child]
+                    if not n:
+                        best = child
+                        break
+                    score = wins[child] / n + explore / sqrt(n)
+                    if score > best_score:
+                        best, best_score = child, score
+                records.append(sow(to_move, move[best]))
+                to_move = 3 - to_move
+                node = best
+                path.append(node)
+                # A leaf is expanded on its second visit.
+                if not count[node] and visits[node] and first[node] < 0:
+                    moves = [i for i in player_pits[to_move] if pits[i]]
+                    if moves:
+                        self.expand(node, moves)
+                    else:
+                        # Terminal: never expand again.
+                        first[node] = 0
+            if len(path) - 1 > self.depth:
+                self.depth = self.current_depth = len(path) - 1
+            reward, margin, n = playout(state, to_move)
+            self.playouts += n
+            # Backpropagation: path[k] was moved into by side for odd k.
+            for k, node in enumerate(path):
+                visits[node] += n
+                margins[node] += margin
+                wins[node] += reward if (k & 1) == (side == 1) else n - reward
+            for record in reversed(records):
+                unsow(record)
+        self.nodes = self.playouts
+
+    def randomPlayout(self, state, side):
+        """``(player 1's score, store difference, 1)`` of one random game."""
+        margin = _playout(state.layout)(state.pits, state.side_seeds, side, self.rng.random, False)
+        return (1.0 if margin > 0 else 0.5 if margin == 0 else 0.0), margin, 1
+
+    def greedyPlayout(self, state, side):
+        margin = _playout(state.layout)(state.pits, state.side_seeds, side, self.rng.random, True)
+        return (1.0 if margin > 0 else 0.5 if margin == 0 else 0.0), margin, 1
+
+    def batchPlayout(self, state, side):
+        """``self.batch`` random games at once; their summed scores."""
+        import numpy as np
+
+        from . import batch
+
+        if self._numpy_rng is None:
+            self._numpy_rng = np.random.default_rng(self.rng.getrandbits(64))
+        rng = self._numpy_rng
+        boards = np.tile(np.array(state.pits, dtype=np.int64), (self.batch, 1))
+        sides = np.full(self.batch, side, dtype=np.intp)
+        live = np.flatnonzero(~batch.is_terminal(boards))
+        while len(live):
+            rows, movers = boards[live], sides[live]
+            moves = batch.MOVES[movers - 1]
+            legal = np.take_along_axis(rows, moves, axis=1) > 0
+            choice = np.argmax(rng.random(legal.shape) * legal, axis=1)
+            rows = batch.apply(rows, movers, moves[np.arange(len(live)), choice])
+            boards[live] = rows
+            sides[live] = 3 - movers
+            live = live[~batch.is_terminal(rows)]
+        final = batch.sweep(boards)
+        margins = final[:, 6] - final[:, 13]
+        reward = float((margins > 0).sum() + 0.5 * (margins == 0).sum())
+        return reward, int(margins.sum()), self.batch
+
+
+@lru_cache(maxsize=None)
+def _playout(layout):
+    """A playout function for ``layout``'s boards.
+
+    It sows on a copy of the pits with only the per-side seed counts kept
+    up to date, which is all a playout needs to see the game end: the hash
+    that ``sow`` maintains for the search costs about a third of the time
+    here.
+    """
+    pits_a_side = layout.pits
+    player_pits = layout.player_pits
+    cycle = layout.cycle
+    stores = layout.stores
+    opposite_pit = layout.opposite
+    sow_path = layout.sow_path
+    sow_prefix = layout.sow_prefix
+    sow_split = layout.sow_split
+    is_own_pit = layout.is_own_pit
+
+    def playout(pits, side_seeds, side, draw, greedy):
+        """Store 1 minus store 2 at the end of a game played from ``pits``
+        with ``side`` to move; ``draw`` is a ``random.random``."""
+        pits = pits[:]
+        side_seeds = side_seeds[:]
+        while side_seeds[1] and side_seeds[2]:
+            moves = [i for i in player_pits[side] if pits[i]]
+            paths = sow_path[side]
+            index = None
+            if greedy:
+                # The biggest capture, else a move ending in the store.
+                own, store = is_own_pit[side], stores[side]
+                best_score = 0
+                for i in moves:
+                    seeds = pits[i]
+                    last = paths[i][(seeds - 1) % cycle]
+                    if last == store:
+                        score = 1
+                    elif own[last] and (seeds == cycle or seeds < cycle and pits[last] == 0):
+                        score = 2 + pits[opposite_pit[last]]
+                    else:
+                        continue
+                    if score > best_score:
+                        index, best_score = i, score
+            if index is None:
+                index = moves[int(draw() * len(moves))]
+            seeds = pits[index]
+            pits[index] = 0
+            laps, rest = divmod(seeds, cycle)
+            path = paths[index]
+            if laps:
+                for j in path:
+                    pits[j] += laps
+            for j in sow_prefix[side][index][rest]:
+                pits[j] += 1
+            to1, to2 = sow_split[side][index][rest]
+            side_seeds[1] += pits_a_side * laps + to1
+            side_seeds[2] += pits_a_side * laps + to2
+            side_seeds[side] -= seeds
+            last = path[(seeds - 1) % cycle]
+            if is_own_pit[side][last] and pits[last] == 1:
+                opposite = opposite_pit[last]
+                captured = pits[opposite]
+                pits[stores[side]] += captured + 1
+                pits[opposite] = 0
+                pits[last] = 0
+                side_seeds[side] -= 1
+                side_seeds[3 - side] -= captured
+            side = 3 - side
+        return pits[stores[1]] + side_seeds[1] - pits[-1] - side_seeds[2]
+
+    return playout
+
+
+class _WorkerMCTS(MCTS):
+    def stopping(self, deadline):
+        return stopRequested() or super().stopping(deadline)
+
+
+def _growTree(packed, side, deadline, iterations, options, seed):
+    pits, seeds, code = packed
+    state = MancalaBoard.variant(pits, seeds).fromPacked(code)
+    engine = _WorkerMCTS(seed=seed, **options)
+    engine.grow(state, side, localDeadline(deadline), iterations)
+    return engine.rootChildren(), engine.playouts, engine.depth
+
+
+class ParallelMCTS:
+    """Root-parallel MCTS: one independent tree per worker process, their
+    root moves' statistics added up."""
+
+    def __init__(self, workers=None, iterations=10000, seed=None, **options):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.iterations = iterations
+        self.options = options
+        self.rng = random.Random(seed)
+        self.pool, self.stop_event = workerPool(self.workers)
+        self.playouts = 0
+        self.nodes = 0
+        self.depth = 0
+        self.current_depth = 0
+        self.stopped = False
+        self.stats = SearchStats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.stop()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def stop(self):
+        self.stopped = True
+        self.stop_event.set()
+
+    def run(self, game, player, time_limit_ms=None, max_depth=None, iterations=None):
+        side = 1 if player == 1 else 2
+        state = game.state
+        start = time.time()
+        self.stop_event.clear()
+        # A stop() that came before run() still applies.
+        if self.stopped:
+            self.stop_event.set()
+        if state.is_terminal():
+            score_1, score_2 = state.final_scores()
+            return score_1 - score_2, None
+        if iterations is None and time_limit_ms is None:
+            iterations = self.iterations
+        share = None if iterations is None else -(-iterations // self.workers)
+        deadline = None if time_limit_ms is None else start + time_limit_ms / 1000
+        packed = (state.layout.pits, state.layout.seeds, state.packed())
+        futures = [self.pool.submit(_growTree, packed, side, deadline, share, self.options, self.rng.getrandbits(64))
+                   for _ in range(self.workers)]
+        totals = {}
+        self.playouts = self.depth = 0
+        for future in futures:
+            children, playouts, depth = future.result()
+            self.playouts += playouts
+            self.depth = max(self.depth, depth)
+            for index, visits, _, margins in children:
+                total = totals.setdefault(index, [0, 0])
+                total[0] += visits
+                total[1] += margins
+        self.nodes, self.current_depth = self.playouts, self.depth
+        stats = self.stats = SearchStats()
+        stats.seconds = time.time() - start
+        stats.depth = self.depth
+        stats.nodes = stats.leaves = self.playouts
+        index, (visits, margins) = max(totals.items(), key=lambda item: item[1][0])
+        return margins / visits, state.layout.pit_names[index]
+
+
+def mctsEngine(name, workers=1, **options):
+    """The engine called ``name`` in ``MCTS_ENGINES``, or None for other names
+    (evaluators).  Options left None keep their defaults."""
+    if name not in MCTS_ENGINES:
+        return None
+    options = {**MCTS_ENGINES[name], **{key: value for key, value in options.items() if value is not None}}
+    if workers > 1:
+        return ParallelMCTS(workers, **options)
+    return MCTS(**options)
@@ -0,0 +1,134 @@
+"""Root-parallel iterative deepening over a process pool.
+
+Each iteration follows Young Brothers Wait at the root: the eldest move (the
+previous iteration's best) is searched first to get an alpha bound, then the
+remaining root moves are handed out in rounds of one move per worker.  Every
+round is searched with the best alpha found so far, so later rounds cut off
+more.  Workers receive the position as the board shape and
+``MancalaBoard.packed()``, and keep a per-process ``Search`` whose
+transposition table survives between moves.
+"""
+import multiprocessing
+import time
+
+from .board import MancalaBoard
+from .evaluation import getEvaluator
+from .pool import localDeadline, stopRequested, workerPool
+from .search import MAX_DEPTH, Search, SearchStopped
+
+_engines = {}
+
+
+class _WorkerSearch(Search):
+    def checkStop(self):
+        if stopRequested():
+            raise SearchStopped()
+        super().checkStop()
+
+
+def _searchMove(game_class, packed, side, index, depth, alpha, beta, evaluator, deadline):
+    engine = _engines.get(evaluator.key)
+    if engine is None:
+        engine = _engines[evaluator.key] = _WorkerSearch(evaluator=evaluator)
+    pits, seeds, code = packed
+    game = game_class()
+    game.state = MancalaBoard.variant(pits, seeds).fromPacked(code)
+    engine.nodes = 0
+    engine.horizon = False
+    engine.deadline = localDeadline(deadline)
+    game.state.sow(side, index)
+    try:
+        value = -engine.negamax(game, 3 - side, depth - 1, -beta, -alpha, 1)
+    except SearchStopped:
+        value = None
+    return index, value, engine.nodes, engine.horizon
+
+
+class ParallelSearch:
+    def __init__(self, workers=None, use_heuristic2=False, evaluator=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        # Evaluators travel to the workers by name and weights.
+        self.evaluator = getEvaluator(evaluator or ('evaluate2' if use_heuristic2 else 'evaluate'))
+        self.pool, self.stop_event = workerPool(self.workers)
+        self.nodes = 0
+        self.depth = 0
+        self.current_depth = 0
+        self.stopped = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.stop()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def stop(self):
+        self.stopped = True
+        self.stop_event.set()
+
+    def run(self, game, player, time_limit_ms=None, max_depth=MAX_DEPTH):
+        side = 1 if player == 1 else 2
+        sign = 1 if side == 1 else -1
+        start = time.time()
+        self.nodes = 0
+        self.depth = 0
+        self.stop_event.clear()
+        # A stop() that came before run() still applies.
+        if self.stopped:
+            self.stop_event.set()
+        state = game.state
+        if state.is_terminal():
+            return self.evaluator.evaluate(state), None
+        packed = (state.layout.pits, state.layout.seeds, state.packed())
+        moves = [i for i in state.layout.player_pits[side] if state.pits[i]]
+        best_value, best = None, None
+        for depth in range(1, max_depth + 1):
+            self.current_depth = depth
+            deadline = None
+            if time_limit_ms is not None and depth > 1:
+                deadline = start + time_limit_ms / 1000
+            if best is not None:
+                moves.remove(best)
+                moves.insert(0, best)
+            result = self.iteration(type(game), packed, side, depth, moves, deadline)
+            if result is None:
+                break
+            best_value, best, horizon = result
+            self.depth = depth
+            if not horizon:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+        if best is None:
+            return None, None
+        return sign * best_value, state.layout.pit_names[best]
+
+    def iteration(self, game_class, packed, side, depth, moves, deadline):
+        def submit(index, alpha):
+            return self.pool.submit(
+                _searchMove, game_class, packed, side, index, depth, alpha, float('inf'),
+                self.evaluator, deadline)
+
+        rounds = [moves[:1]] + [moves[i:i + self.workers] for i in range(1, len(moves), self.workers)]
+        alpha, best, horizon = float('-inf'), None, False
+        for batch in rounds:
+            futures = [submit(index, alpha) for index in batch]
+            for future in futures:
+                index, value, nodes, reached = future.result()
+                self.nodes += nodes
+                if value is None or self.stopped:
+                    return None
+                horizon = horizon or reached
+                if value > alpha:
+                    alpha, best = value, index
+        return alpha, best, horizon
+
+
+def parallelSearch(game, player, workers=None, time_limit_ms=None, max_depth=MAX_DEPTH, use_heuristic2=False,
+                   evaluator=None):
+    """``search()`` spread over ``workers`` processes."""
+    with ParallelSearch(workers, use_heuristic2, evaluator) as engine:
+        return engine.run(game, player, time_limit_ms, max_depth)
@@ -0,0 +1,38 @@
+"""Process pools shared by the root-parallel engines, ``parallel`` and ``mcts``.
+
+Workers are spawned, so they start with a fresh interpreter on every
+platform, and all of a pool's workers share one ``multiprocessing.Event``
+the parent sets to stop their searches at once.  Deadlines cross over as
+wall-clock times, since ``time.perf_counter`` is per process.
+"""
+import multiprocessing
+import time
+
+_stop_event = None
+
+
+def _initWorker(stop_event):
+    global _stop_event
+    _stop_event = stop_event
+
+
+def workerPool(workers):
+    """``(pool, stop_event)``: ``workers`` spawned processes and their stop event."""
+    # Imported here so that loading an engine module stays cheap.
+    from concurrent.futures import ProcessPoolExecutor
+
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    pool = ProcessPoolExecutor(workers, mp_context=context, initializer=_initWorker, initargs=(stop_event,))
+    return pool, stop_event
+
+
+def stopRequested():
+    """In a worker: whether the parent has set the pool's stop event."""
+    return _stop_event.is_set()
+
+
+def localDeadline(deadline):
+    """The ``time.perf_counter`` reading of a wall-clock ``deadline`` in this
+    process, or None for no deadline."""
+    return None if deadline is None else time.perf_counter() + deadline - time.time()
@@ -0,0 +1,429 @@
+"""Compact game records, written as games are played and analyzed as a stream.
+
+One game per line::
+
+    6x4:1 CJFHA(2.5,9,41210,300)K(-1,10,52002,300)DGB 26-22
+
+``6x4:1`` is the board (pits a side, seeds a pit) and the player who moved
+first; then one letter per ply, the pit played, players alternating; then
+the final stores, or ``*`` for a game that was not finished.  A move may
+carry its search in parentheses: value (store 1 minus store 2), depth,
+nodes and milliseconds, any of them left empty.  Without notes a game
+costs a byte a ply and a dozen more, some 60% of its tournament JSON line.
+
+``RecordWriter`` appends to a file move by move, so a game interrupted
+half-way still leaves its moves behind; ``main2.py --record`` and
+``python -m mancala.tournament --records`` use it.  ``readRecords`` is a
+generator over lines, and the analyzer builds on it::
+
+    python -m mancala.record analyze games.rec --workers 4 [--depth 8] [--blunders blunders.jsonl]
+    python -m mancala.record convert games.jsonl --out games.rec
+
+``analyze`` hands chunks of lines to worker processes, never more than a
+few per worker at a time, so files of millions of games go through in
+constant memory.  Workers replay every game and return partial results the
+parent merges: statistics of every position of the first ``--plies`` plies
+(games through it, moves chosen, mean final store difference) and blunders.
+A blunder is a move after which the mover's prospects fell by ``--margin``
+seeds or more: judged by the annotations of the moves either side of it
+when the record has them, and by a ``--depth`` search of both the best and
+the played move when that is given.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter, deque
+
+from .board import MancalaBoard
+
+_HEADER = re.compile(r"(\d+)x(\d+):([12])$")
+_PLY = re.compile(r"([A-Z])(?:\(([^)]*)\))?")
+
+
+class GameRecord:
+    """One game: board, first player, moves (pit letters), optional per-move
+    notes and the final stores (None if unfinished)."""
+
+    __slots__ = ('pits', 'seeds', 'first', 'moves', 'notes', 'scores')
+
+    def __init__(self, pits=6, seeds=4, first=1, moves='', notes=None, scores=None):
+        self.pits = pits
+        self.seeds = seeds
+        self.first = first
+        self.moves = moves
+        # None, or one (value, depth, nodes, ms) tuple or None per move.
+        self.notes = notes
+        self.scores = scores
+
+    def positions(self):
+        """Yield ``(state, side, ply, pit)`` before every move.  The same board
+        is played on throughout, so copy ``state`` to keep it."""
+        state = MancalaBoard.variant(self.pits, self.seeds)()
+        pit_index = state.layout.pit_index
+        player_pits = state.layout.player_pits
+        side = self.first
+        for ply, pit in enumerate(self.moves):
+            index = pit_index.get(pit)
+            if index is None or index not in player_pits[side] or not state.pits[index]:
+                raise ValueError(f"illegal move {pit!r} for player {side} at ply {ply}")
+            yield state, side, ply, pit
+            state.sow(side, index)
+            side = 3 - side
+
+    def line(self):
+        plies = []
+        for ply, pit in enumerate(self.moves):
+            note = self.notes[ply] if self.notes else None
+            plies.append(pit + formatNote(note))
+        result = '*' if self.scores is None else f"{self.scores[0]}-{self.scores[1]}"
+        return f"{self.pits}x{self.seeds}:{self.first} {''.join(plies)} {result}"
+
+
+def formatNote(note):
+    if note is None:
+        return ''
+    value, depth, nodes, ms = note
+    fields = ['' if value is None else f"{value:.4g}"]
+    fields += ['' if field is None else str(field) for field in (depth, nodes, ms)]
+    return f"({','.join(fields).rstrip(',')})"
+
+
+def _parseNote(text):
+    fields = text.split(',') + [''] * 3
+    value = float(fields[0]) if fields[0] else None
+    if value is not None and value.is_integer():
+        value = int(value)
+    return (value,) + tuple(int(field) if field else None for field in fields[1:4])
+
+
+def parseRecord(line):
+    """The ``GameRecord`` of one line; raises ``ValueError`` on a bad line."""
+    fields = line.split(' ')
+    header = _HEADER.match(fields[0])
+    if header is None or len(fields) > 3:
+        raise ValueError(f"not a game record: {line[:40]!r}")
+    pits, seeds, first = map(int, header.groups())
+    body = fields[1].rstrip('\n') if len(fields) > 1 else ''
+    result = fields[2].strip() if len(fields) > 2 else '*'
+    if '(' in body:
+        moves, notes = [], []
+        for match in _PLY.finditer(body):
+            moves.append(match[1])
+            notes.append(None if match[2] is None else _parseNote(match[2]))
+        moves = ''.join(moves)
+    else:
+        moves, notes = body, None
+    scores = None
+    if result != '*':
+        score_1, _, score_2 = result.partition('-')
+        scores = (int(score_1), int(score_2))
+    return GameRecord(pits, seeds, first, moves, notes, scores)
+
+
+def readRecords(lines, errors=None):
+    """Yield the ``GameRecord`` of every line.  Bad lines raise, or are
+    counted in ``errors['bad']`` and skipped when ``errors`` is a dict."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield parseRecord(line)
+        except ValueError:
+            if errors is None:
+                raise
+            errors['bad'] = errors.get('bad', 0) + 1
+
+
+class RecordWriter:
+    """Appends games to a record file as they are played.
+
+    ``begin`` starts a line, ``move`` adds a ply and ``end`` the result; a game
+    still open at the next ``begin`` or at ``close`` is marked unfinished.
+    With ``flush`` every call reaches the file at once, for games a crash
+    should not lose.
+    """
+
+    def __init__(self, path, flush=False):
+        self.flush = flush
+        self.open = False
+        self.file = open(path, 'a')
+        # A line cut short by a crash would swallow the next game's header.
+        if self.file.tell():
+            with open(path, 'rb') as f:
+                f.seek(-1, 2)
+                if f.read(1) != b'\n':
+                    self.file.write('\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def begin(self, pits=6, seeds=4, first=1):
+        if self.open:
+            self.end(None)
+        self.file.write(f"{pits}x{seeds}:{first} ")
+        self.open = True
+        self._flush()
+
+    def move(self, pit, value=None, depth=None, nodes=None, ms=None):
+        note = None if value is depth is nodes is ms is None else (value, depth, nodes, ms)
+        self.file.write(pit + formatNote(note))
+        self._flush()
+
+    def end(self, scores):
+        """Finish the game with ``(store 1, store 2)``, or None if abandoned."""
+        self.file.write(' *\n' if scores is None else f" {scores[0]}-{scores[1]}\n")
+        self.open = False
+        self._flush()
+
+    def write(self, record):
+        """Append a whole ``GameRecord``."""
+        if self.open:
+            self.end(None)
+        self.file.write(record.line() + '\n')
+        self._flush()
+
+    def _flush(self):
+        if self.flush:
+            self.file.flush()
+
+    def close(self):
+        if self.open:
+            self.end(None)
+        self.file.close()
+
+
+_engine = None
+
+
+def _searchValue(game, side, depth, evaluator):
+    global _engine
+    from .evaluation import getEvaluator
+    from .search import Search
+
+    # A search needs a ply; at none the position is its evaluation.
+    if depth == 0:
+        return getEvaluator(evaluator)(game.state)
+    if _engine is None or _engine.evaluator.name != evaluator:
+        _engine = Search(evaluator=evaluator)
+    value, _ = _engine.run(game, side, max_depth=depth)
+    return value
+
+
+def _analyzeChunk(task):
+    """Worker: partial results for ``(first game number, lines, options)``."""
+    from .game import Game
+
+    number, lines, options = task
+    plies, margin, depth, evaluator = options['plies'], options['margin'], options['depth'], options['evaluator']
+    counts = Counter()
+    positions = {}
+    blunders = []
+    game = Game()
+    for number, line in enumerate(lines, number):
+        try:
+            record = parseRecord(line)
+        except ValueError:
+            counts['bad'] += 1
+            continue
+        counts['games'] += 1
+        counts['plies'] += len(record.moves)
+        if record.scores is None:
+            counts['unfinished'] += 1
+        final = None if record.scores is None else record.scores[0] - record.scores[1]
+        notes = record.notes
+        try:
+            for state, side, ply, pit in record.positions():
+                sign = 1 if side == 1 else -1
+                if ply < plies:
+                    key = (record.pits, record.seeds, state.packed(), side)
+                    entry = positions.get(key)
+                    if entry is None:
+                        entry = positions[key] = [0, Counter(), 0, 0]
+                    entry[0] += 1
+                    entry[1][pit] += 1
+                    if final is not None:
+                        entry[2] += final
+                        entry[3] += 1
+                # The notes either side of this move are the other player's
+                # view before and after it.
+                if notes and 0 < ply < len(notes) - 1 and notes[ply - 1] and notes[ply + 1]:
+                    before, after = notes[ply - 1][0], notes[ply + 1][0]
+                    if before is not None and after is not None and sign * (before - after) >= margin:
+                        blunders.append({'game': number, 'ply': ply, 'side': side, 'move': pit,
+                                         'loss': round(sign * (before - after), 2), 'by': 'notes'})
+                if depth and not state.is_terminal():
+                    game.state = state
+                    best = _searchValue(game, side, depth, evaluator)
+                    undo_record = state.doMove(side, pit)
+                    try:
+                        played = _searchValue(game, 3 - side, depth - 1, evaluator)
+                    finally:
+                        state.undoMove(undo_record)
+                    loss = sign * (best - played)
+                    if loss >= margin:
+                        blunders.append({'game': number, 'ply': ply, 'side': side, 'move': pit,
+                                         'loss': round(loss, 2), 'by': f'depth {depth}'})
+        except ValueError:
+            counts['illegal'] += 1
+    return counts, positions, blunders
+
+
+def _chunks(lines, size):
+    chunk, number = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        chunk.append(line)
+        if len(chunk) == size:
+            yield number, chunk
+            number += size
+            chunk = []
+    if chunk:
+        yield number, chunk
+
+
+def _boundedMap(pool, fn, tasks, window):
+    """``pool.map`` that takes at most ``window`` tasks ahead of the results."""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(fn, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Analysis:
+    """The merged results of ``analyze``."""
+
+    def __init__(self):
+        self.counts = Counter()
+        # (pits, seeds, packed, side) -> [games, Counter of moves, sum of
+        # final store differences, finished games]
+        self.positions = {}
+        self.blunders = []
+
+    def add(self, partial):
+        counts, positions, blunders = partial
+        self.counts.update(counts)
+        for key, (games, moves, margins, finished) in positions.items():
+            entry = self.positions.get(key)
+            if entry is None:
+                self.positions[key] = [games, moves, margins, finished]
+            else:
+                entry[0] += games
+                entry[1].update(moves)
+                entry[2] += margins
+                entry[3] += finished
+        self.blunders.extend(blunders)
+
+    def topPositions(self, count):
+        """``(key, games, most played (pit, times), mean final margin)`` of
+        the ``count`` positions reached most."""
+        ranked = sorted(self.positions.items(), key=lambda item: -item[1][0])[:count]
+        return [(key, games, moves.most_common(1)[0], margins / finished if finished else None)
+                for key, (games, moves, margins, finished) in ranked]
+
+
+def analyze(lines, workers=1, plies=8, margin=4, depth=0, evaluator='evaluate2', chunk=256, report=None):
+    """Stream ``lines`` of records through the analysis; returns an ``Analysis``.
+
+    ``report(games)`` is called as chunks complete.
+    """
+    options = {'plies': plies, 'margin': margin, 'depth': depth, 'evaluator': evaluator}
+    tasks = ((number, lines, options) for number, lines in _chunks(lines, chunk))
+    analysis = Analysis()
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(workers)
+        results = _boundedMap(pool, _analyzeChunk, tasks, 2 * workers)
+    else:
+        results = map(_analyzeChunk, tasks)
+    try:
+        for partial in results:
+            analysis.add(partial)
+            if report is not None:
+                report(analysis.counts['games'])
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return analysis
+
+
+def fromTournamentLine(line):
+    """The ``GameRecord`` of a tournament JSON line (standard board)."""
+    game = json.loads(line)
+    scores = game.get('s')
+    return GameRecord(6, 4, 1, game.get('m', ''), None, tuple(scores) if scores else None)
+
+
+def _lines(paths):
+    for path in paths:
+        with open(path) as f:
+            yield from f
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert or analyze game records.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    analyze_parser = commands.add_parser("analyze", help="position statistics and blunders")
+    analyze_parser.add_argument("records", nargs="+")
+    analyze_parser.add_argument("--workers", type=int, default=1)
+    analyze_parser.add_argument("--plies", type=int, default=8, help="collect statistics of the first plies")
+    analyze_parser.add_argument("--margin", type=float, default=4, help="seeds lost to count as a blunder")
+    analyze_parser.add_argument("--depth", type=int, default=0, help="also search every move to this depth")
+    analyze_parser.add_argument("--evaluator", default="evaluate2")
+    analyze_parser.add_argument("--top", type=int, default=10, help="positions to list")
+    analyze_parser.add_argument("--blunders", help="JSON-lines file for every blunder")
+    convert_parser = commands.add_parser("convert", help="tournament JSON lines to records")
+    convert_parser.add_argument("games", nargs="+")
+    convert_parser.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "convert":
+        games = 0
+        with RecordWriter(args.out) as writer:
+            for line in _lines(args.games):
+                if line.strip():
+                    writer.write(fromTournamentLine(line))
+                    games += 1
+        print(f"{args.out}: {games} games in {time.perf_counter() - start:.1f}s")
+        return
+
+    def report(games):
+        print(f"\r{games:,} games", end="", flush=True)
+
+    analysis = analyze(_lines(args.records), args.workers, args.plies, args.margin, args.depth,
+                       args.evaluator, report=report)
+    seconds = time.perf_counter() - start
+    counts = analysis.counts
+    print(f"\r{counts['games']:,} games, {counts['plies']:,} plies in {seconds:.1f}s "
+          f"({counts['games'] / seconds:,.0f} games/s); unfinished {counts['unfinished']}, "
+          f"bad lines {counts['bad']}, illegal {counts['illegal']}")
+    print(f"{len(analysis.positions):,} positions in the first {args.plies} plies; most reached:")
+    for (pits, seeds, packed, side), games, (pit, times), mean in analysis.topPositions(args.top):
+        state = MancalaBoard.variant(pits, seeds).fromPacked(packed)
+        mean = '-' if mean is None else f"{mean:+.2f}"
+        print(f"  {' '.join(map(str, state.pits))}  player {side}: {games:>8,} games, "
+              f"{pit} {times / games:4.0%}, final margin {mean}")
+    blunders = sorted(analysis.blunders, key=lambda blunder: -blunder['loss'])
+    print(f"{len(blunders):,} blunders of {args.margin:g} seeds or more")
+    for blunder in blunders[:args.top]:
+        print(f"  game {blunder['game']} ply {blunder['ply']}: player {blunder['side']} {blunder['move']} "
+              f"loses {blunder['loss']:g} ({blunder['by']})")
+    if args.blunders:
+        with open(args.blunders, 'w') as f:
+            for blunder in blunders:
+                f.write(json.dumps(blunder, separators=(',', ':')) + '\n')
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""Anytime alpha-beta search.
+
+``search(game, player, time_limit_ms=..., max_depth=...)`` deepens one ply
+at a time and returns the best move of the deepest iteration that finished
+inside the budget.  Each iteration starts from the previous best move, and
+the transposition table carries the best move of every other node forward
+as well.
+
+With a ``Tablebase``, positions it covers are scored exactly instead of
+searched, and a covered root is answered straight from the table.
+
+Moves are tried in this order: the transposition-table move, moves whose
+last seed lands in the mover's store, captures (largest first), the two
+killer moves of the ply, then the rest by history score.
+
+Leaves are scored by an ``Evaluator`` (see ``evaluation``): ``evaluate``
+by default, ``evaluate2`` with ``use_heuristic2``, or any registered one
+passed as ``evaluator``.
+
+Values are reported like ``MinimaxAlphaBetaPruning``: store 1 minus store 2,
+so player 1 wants them high and player 2 low.  Internally the search is a
+negamax over board indices.
+"""
+import time
+
+from .board import MAX_PITS
+from .evaluation import getEvaluator
+from .stats import SearchStats, debugEnabled, profilerCalls
+from .tt import EXACT, LOWER, NEGAMAX_KEY, UPPER, TranspositionTable
+
+MAX_DEPTH = 64
+
+# Depth recorded for subtrees searched to the end of the game: their values
+# are exact whatever depth a later probe asks for.
+SOLVED_DEPTH = 1000
+
+# The clock is read once every CHECK_INTERVAL + 1 nodes.
+CHECK_INTERVAL = 1023
+
+# Ordering tiers; history scores stay far below KILLER_SCORE.
+HASH_MOVE_SCORE = 1 << 46
+STORE_MOVE_SCORE = 1 << 44
+CAPTURE_SCORE = 1 << 42
+KILLER_SCORE = 1 << 40
+
+
+class SearchStopped(Exception):
+    pass
+
+
+class Search:
+    def __init__(self, use_heuristic2=False, tt=None, ordering=True, tablebase=None, evaluator=None):
+        self.use_heuristic2 = use_heuristic2
+        self.evaluator = getEvaluator(evaluator or ('evaluate2' if use_heuristic2 else 'evaluate'))
+        self.evaluate = self.evaluator.evaluate
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.ordering = ordering
+        self.tablebase = tablebase
+        self.killers = [[None, None] for _ in range(MAX_DEPTH + 1)]
+        # Indexed by hole, so sized for the largest board.
+        self.history = {1: [0] * (2 * MAX_PITS + 2), 2: [0] * (2 * MAX_PITS + 2)}
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = [0] * (MAX_DEPTH + 1)
+        self.depth = 0
+        self.current_depth = 0
+        self.deadline = None
+        self.stopped = False
+        self.horizon = False
+        self.stats = SearchStats()
+        # Set to a cProfile.Profile (or a sampling profiler) to profile run().
+        self.profiler = None
+
+    def stop(self):
+        """Ask a running search to return; safe to call from another thread."""
+        self.stopped = True
+
+    def checkStop(self):
+        if self.stopped or self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchStopped()
+
+    def run(self, game, player, time_limit_ms=None, max_depth=MAX_DEPTH, min_depth=1):
+        """Best ``(value, pit)``; iterations up to ``min_depth`` finish whatever
+        the time limit."""
+        if self.profiler is None:
+            return self.iterate(game, player, time_limit_ms, max_depth, min_depth)
+        start, stop = profilerCalls(self.profiler)
+        start()
+        try:
+            return self.iterate(game, player, time_limit_ms, max_depth, min_depth)
+        finally:
+            stop()
+
+    def iterate(self, game, player, time_limit_ms, max_depth, min_depth=1):
+        side = 1 if player == 1 else 2
+        sign = 1 if side == 1 else -1
+        start = time.perf_counter()
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = [0] * (MAX_DEPTH + 1)
+        self.depth = 0
+        stats = self.stats = SearchStats()
+        tt_hits, tt_probes = self.tt.hits, self.tt.hits + self.tt.misses
+        for killers in self.killers:
+            killers[0] = killers[1] = None
+        for history in self.history.values():
+            history[:] = [score >> 1 for score in history]
+        if game.state.is_terminal():
+            return self.evaluate(game.state), None
+        if self.tablebase is not None and self.tablebase.covers(game.state):
+            value, index = self.tablebase.bestMove(game.state, side)
+            return sign * value, game.state.layout.pit_names[index]
+        best_value, best = None, None
+        for depth in range(1, max_depth + 1):
+            self.current_depth = depth
+            # Depth 1 always finishes unless stopped, so there is a move to return.
+            if time_limit_ms is not None and depth > min_depth:
+                self.deadline = start + time_limit_ms / 1000
+            else:
+                self.deadline = None
+            self.horizon = False
+            try:
+                value, index = self.root(game, side, depth, best)
+            except SearchStopped:
+                break
+            best_value, best, self.depth = value, index, depth
+            stats.iterations.append((depth, time.perf_counter() - start, self.nodes))
+            if not self.horizon:
+                # No leaf was cut off by the depth limit: the value is exact.
+                break
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                break
+        self.deadline = None
+        stats.seconds = time.perf_counter() - start
+        stats.depth = self.depth
+        stats.nodes = self.nodes
+        stats.leaves = self.leaves
+        cutoffs = self.cutoffs
+        while cutoffs and not cutoffs[-1]:
+            cutoffs = cutoffs[:-1]
+        stats.cutoffs = cutoffs
+        stats.tt_hits = self.tt.hits - tt_hits
+        stats.tt_probes = self.tt.hits + self.tt.misses - tt_probes
+        if debugEnabled():
+            from .stats import log
+            log.debug("search for player %d: %s\n%s", side,
+                      None if best is None else game.state.layout.pit_names[best], stats)
+        if best is None:
+            return None, None
+        return sign * best_value, game.state.layout.pit_names[best]
+
+    def key(self, state, side):
+        return state.hash ^ state.layout.side_keys[side] ^ NEGAMAX_KEY ^ self.evaluator.key
+
+    def orderedMoves(self, state, side, first, ply):
+        pits = state.pits
+        layout = state.layout
+        moves = [i for i in layout.player_pits[side] if pits[i]]
+        if not self.ordering:
+            if first is not None and first in moves:
+                moves.remove(first)
+                moves.insert(0, first)
+            return moves
+        if len(moves) < 2:
+            return moves
+        store = layout.stores[side]
+        own = layout.is_own_pit[side]
+        paths = layout.sow_path[side]
+        cycle = layout.cycle
+        opposite = layout.opposite
+        killers = self.killers[ply]
+        history = self.history[side]
+        scores = {}
+        for i in moves:
+            seeds = pits[i]
+            last = paths[i][(seeds - 1) % cycle]
+            if i == first:
+                scores[i] = HASH_MOVE_SCORE
+            elif last == store:
+                scores[i] = STORE_MOVE_SCORE
+            elif own[last] and (seeds == cycle or seeds < cycle and pits[last] == 0):
+                scores[i] = CAPTURE_SCORE + pits[opposite[last]]
+            elif i == killers[0] or i == killers[1]:
+                scores[i] = KILLER_SCORE
+            else:
+                scores[i] = history[i]
+        moves.sort(key=scores.__getitem__, reverse=True)
+        return moves
+
+    def cutoff(self, side, index, depth, ply):
+        self.cutoffs[ply] += 1
+        killers = self.killers[ply]
+        if killers[0] != index:
+            killers[1] = killers[0]
+            killers[0] = index
+        self.history[side][index] += depth * depth
+
+    def root(self, game, side, depth, previous):
+        state = game.state
+        alpha, beta = float('-inf'), float('inf')
+        best = None
+        for index in self.orderedMoves(state, side, previous, 0):
+            record = state.sow(side, index)
+            try:
+                value = -self.negamax(game, 3 - side, depth - 1, -beta, -alpha, 1)
+            finally:
+                state.unsow(record)
+            if value > alpha:
+                alpha, best = value, index
+        self.tt.store(self.key(state, side), depth if self.horizon else SOLVED_DEPTH, EXACT, alpha, best)
+        return alpha, best
+
+    def negamax(self, game, side, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & CHECK_INTERVAL:
+            self.checkStop()
+        state = game.state
+        terminal = state.is_terminal()
+        if not terminal and self.tablebase is not None:
+            value = self.tablebase.value(state, side)
+            if value is not None:
+                return value
+        if terminal or depth == 0:
+            if not terminal:
+                self.horizon = True
+            self.leaves += 1
+            value = self.evaluate(state)
+            return value if side == 1 else -value
+
+        tt = self.tt
+        key = self.key(state, side)
+        alpha_orig = alpha
+        first = None
+        entry = tt.lookup(key)
+        if entry is not None:
+            _, entry_depth, bound, value, first = entry
+            if entry_depth >= depth:
+                cutoff = bound == EXACT
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                elif bound == UPPER:
+                    beta = min(beta, value)
+                if cutoff or alpha >= beta:
+                    if entry_depth < SOLVED_DEPTH:
+                        self.horizon = True
+                    return value
+
+        # Track whether this subtree reaches the depth limit anywhere.
+        horizon = self.horizon
+        self.horizon = False
+        best_value = float('-inf')
+        best = None
+        for index in self.orderedMoves(state, side, first, ply):
+            record = state.sow(side, index)
+            try:
+                value = -self.negamax(game, 3 - side, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                state.unsow(record)
+            if value > best_value:
+                best_value, best = value, index
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        self.cutoff(side, index, depth, ply)
+                        break
+
+        if best_value <= alpha_orig:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        tt.store(key, depth if self.horizon else SOLVED_DEPTH, bound, best_value, best)
+        self.horizon = horizon or self.horizon
+        return best_value
+
+
+def search(game, player, time_limit_ms=None, max_depth=MAX_DEPTH, use_heuristic2=False, tt=None, tablebase=None,
+           with_stats=False, evaluator=None):
+    """Best ``(value, pit)`` for ``player`` within the time and depth budget.
+
+    With ``with_stats`` the result is ``(value, pit, SearchStats)``.
+    """
+    engine = Search(use_heuristic2, tt, tablebase=tablebase, evaluator=evaluator)
+    value, pit = engine.run(game, player, time_limit_ms, max_depth)
+    if with_stats:
+        return value, pit, engine.stats
+    return value, pit
@@ -0,0 +1,405 @@
+"""Many human-vs-computer games over one asyncio server and one engine pool.
+
+    python -m mancala.server --port 8765 --workers 4
+    python -m mancala.server --stdio
+
+The protocol is one JSON object per line each way.  Every request may carry
+an ``id``, echoed in its response; responses come back as they finish, not
+in request order.  Operations::
+
+    {"op": "new", "human": 1, "pits": 6, "seeds": 4, "evaluator": "evaluate2", "time_ms": 200}
+    {"op": "move", "session": 7, "pit": "C"}
+    {"op": "state", "session": 7}
+    {"op": "close", "session": 7}
+    {"op": "stats"}
+
+``new`` and ``move`` answer with the position after the computer's reply
+(``computer`` is its pit, absent when it did not move) and ``over`` with the
+final ``scores`` once the game has ended.  Errors answer ``{"error": ...}``;
+``"busy"`` means the server is at its pending-search limit and the request
+may be retried.  A ``move`` may carry its own ``time_ms``; like the
+session's, it is capped by the server's ``--max-time-ms``.  Sessions belong
+to the connection that opened them and end when it closes; requests still
+in progress then are dropped unanswered.
+
+Sessions are a ``Game`` each and cost a few hundred bytes, so thousands fit
+easily; only searches use the pool.  The ``Scheduler`` in front of the pool
+keeps at most ``workers`` searches in flight, so a search starts as soon as
+a process is free, and picks the next one round-robin over connections: a
+client with a thousand sessions waiting cannot hold back one with a single
+move.  Searches beyond ``max_pending`` are refused rather than queued
+without bound, and a connection with ``max_outstanding`` requests in
+progress is not read from until one finishes, which pushes back on the
+client through the socket.
+"""
+import asyncio
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .board import MAX_PITS, MIN_PITS, MancalaBoard
+from .evaluation import getEvaluator
+from .game import Game
+from .search import MAX_DEPTH, Search
+from .tt import TranspositionTable
+
+# Seeds a pit on a board a request may ask for; Layout tables grow with it.
+MAX_SEEDS = 12
+
+_engines = {}
+
+
+class Busy(Exception):
+    pass
+
+
+def _think(packed, side, time_limit_ms, max_depth, evaluator):
+    """Worker: ``(value, pit)`` for ``side`` in the packed position."""
+    engine = _engines.get(evaluator.key)
+    if engine is None:
+        engine = _engines[evaluator.key] = Search(tt=TranspositionTable(8), evaluator=evaluator)
+    pits, seeds, code = packed
+    game = Game(pits, seeds)
+    game.state = MancalaBoard.variant(pits, seeds).fromPacked(code)
+    return engine.run(game, side, time_limit_ms, max_depth)
+
+
+def _ready():
+    return True
+
+
+def _intField(request, name, default, low, high=None):
+    """``request[name]``, an int from ``low`` to ``high``; raises ``ValueError``."""
+    value = request.get(name, default)
+    if type(value) is not int or value < low or (high is not None and value > high):
+        raise ValueError(f"bad {name} {value!r}")
+    return value
+
+
+class Scheduler:
+    """Runs searches on a process pool, ``slots`` at a time, taking queued
+    requests round-robin over clients."""
+
+    def __init__(self, pool, slots, max_pending):
+        self.pool = pool
+        self.slots = slots
+        self.max_pending = max_pending
+        # client -> deque of (args, future), in the order clients take turns.
+        self.queues = OrderedDict()
+        self.running = 0
+        self.pending = 0
+
+    def submit(self, client, *args):
+        """A future for ``_think(*args)``; raises ``Busy`` past ``max_pending``."""
+        if self.pending >= self.max_pending:
+            raise Busy()
+        future = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(client, deque()).append((args, future))
+        self.pending += 1
+        self.dispatch()
+        return future
+
+    def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self.running < self.slots and self.queues:
+            client, queue = next(iter(self.queues.items()))
+            args, future = queue.popleft()
+            if queue:
+                self.queues.move_to_end(client)
+            else:
+                del self.queues[client]
+            self.pending -= 1
+            if future.cancelled():
+                continue
+            self.running += 1
+            job = loop.run_in_executor(self.pool, _think, *args)
+            job.add_done_callback(lambda job, future=future: self.finished(job, future))
+
+    def finished(self, job, future):
+        self.running -= 1
+        if not future.cancelled():
+            if job.exception() is not None:
+                future.set_exception(job.exception())
+            else:
+                future.set_result(job.result())
+        self.dispatch()
+
+    def forget(self, client):
+        """Drop the queued searches of a client that went away."""
+        for _, future in self.queues.pop(client, ()):
+            self.pending -= 1
+            future.cancel()
+
+
+class Session:
+    __slots__ = ('game', 'owner', 'human', 'computer', 'evaluator', 'time_limit_ms', 'max_depth', 'busy')
+
+    def __init__(self, game, owner, human, evaluator, time_limit_ms, max_depth):
+        self.game = game
+        # The client that opened the session; no other may use it.
+        self.owner = owner
+        self.human = human
+        self.computer = 3 - human
+        self.evaluator = evaluator
+        self.time_limit_ms = time_limit_ms
+        self.max_depth = max_depth
+        self.busy = False
+
+
+class GameServer:
+    def __init__(self, workers=None, max_sessions=100_000, max_pending=None, max_outstanding=64,
+                 default_time_ms=100, max_time_ms=2000):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_sessions = max_sessions
+        self.max_outstanding = max_outstanding
+        self.default_time_ms = default_time_ms
+        self.max_time_ms = max_time_ms
+        context = multiprocessing.get_context("spawn")
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context)
+        self.scheduler = Scheduler(self.pool, self.workers, max_pending or 64 * self.workers)
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.moves = 0
+        self.started = time.perf_counter()
+
+    async def start(self):
+        """Start every worker process, so the first searches do not wait for it."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ready) for _ in range(self.workers)))
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+    async def handle(self, request, client):
+        """The response to one request from ``client``."""
+        if not isinstance(request, dict):
+            return {'error': "a request is a JSON object"}
+        op = request.get('op')
+        if op == 'new':
+            return await self.newSession(request, client)
+        if op == 'stats':
+            return self.stats()
+        if op not in ('move', 'state', 'close'):
+            return {'error': f"unknown op {op!r}"}
+        session_id = request.get('session')
+        session = self.sessions.get(session_id) if type(session_id) is int else None
+        if session is None or session.owner is not client:
+            return {'error': "no such session"}
+        if op == 'move':
+            try:
+                time_limit_ms = min(_intField(request, 'time_ms', session.time_limit_ms, 1), self.max_time_ms)
+            except ValueError as error:
+                return {'error': str(error)}
+            return await self.move(session_id, session, request.get('pit'), client, time_limit_ms)
+        if op == 'state':
+            return self.describe(session_id, session)
+        del self.sessions[session_id]
+        return {'session': session_id, 'closed': True}
+
+    async def newSession(self, request, client):
+        if len(self.sessions) >= self.max_sessions:
+            return {'error': "too many sessions"}
+        try:
+            pits = _intField(request, 'pits', 6, MIN_PITS, MAX_PITS)
+            seeds = _intField(request, 'seeds', 4, 1, MAX_SEEDS)
+            human = _intField(request, 'human', 1, 1, 2)
+            time_limit_ms = min(_intField(request, 'time_ms', self.default_time_ms, 1), self.max_time_ms)
+            max_depth = min(_intField(request, 'depth', MAX_DEPTH, 1), MAX_DEPTH)
+            name = request.get('evaluator')
+            if name is not None and not isinstance(name, str):
+                raise ValueError(f"bad evaluator {name!r}")
+            evaluator = getEvaluator(name)
+        except ValueError as error:
+            return {'error': str(error)}
+        session_id = next(self.ids)
+        session = self.sessions[session_id] = Session(
+            Game(pits, seeds), client, human, evaluator, time_limit_ms, max_depth)
+        # Player 1 moves first.
+        if session.computer == 1:
+            try:
+                return await self.reply(session_id, session, client)
+            except Busy:
+                del self.sessions[session_id]
+                return {'error': "busy"}
+        return self.describe(session_id, session)
+
+    async def move(self, session_id, session, pit, client, time_limit_ms=None):
+        if session.busy:
+            return {'error': "the computer is still thinking"}
+        state = session.game.state
+        if state.is_terminal():
+            return {'error': "the game is over"}
+        if pit not in state.possibleMoves(session.human):
+            return {'error': f"illegal move {pit!r}"}
+        record = state.doMove(session.human, pit)
+        try:
+            response = await self.reply(session_id, session, client, human=pit, time_limit_ms=time_limit_ms)
+        except Busy:
+            state.undoMove(record)
+            return {'error': "busy"}
+        self.moves += 1
+        return response
+
+    async def reply(self, session_id, session, client, human=None, time_limit_ms=None):
+        """Play the computer's move, unless the game just ended; raises
+        ``Busy`` when the search cannot be queued."""
+        state = session.game.state
+        computer = None
+        wait_ms = None
+        if not state.is_terminal():
+            layout = state.layout
+            packed = (layout.pits, layout.seeds, state.packed())
+            future = self.scheduler.submit(
+                client, packed, session.computer, time_limit_ms or session.time_limit_ms, session.max_depth,
+                session.evaluator)
+            session.busy = True
+            start = time.perf_counter()
+            try:
+                _, computer = await future
+            finally:
+                session.busy = False
+            wait_ms = round((time.perf_counter() - start) * 1000, 1)
+            if self.sessions.get(session_id) is not session:
+                return {'error': "session closed"}
+            state.doMove(session.computer, computer)
+            self.moves += 1
+        response = self.describe(session_id, session)
+        if human is not None:
+            response['human'] = human
+        if computer is not None:
+            response['computer'] = computer
+            response['think_ms'] = wait_ms
+        return response
+
+    def describe(self, session_id, session):
+        """The session's position: ``board`` in ``MancalaBoard.pits`` order and
+        the human's legal ``moves``, or the final ``scores``."""
+        game = session.game
+        response = {'session': session_id, 'board': list(game.state.pits)}
+        if game.gameOver():
+            response['over'] = True
+            response['scores'] = [game.state.board[1], game.state.board[2]]
+        else:
+            response['moves'] = game.state.possibleMoves(session.human)
+        return response
+
+    def stats(self):
+        return {'sessions': len(self.sessions), 'workers': self.workers, 'running': self.scheduler.running,
+                'pending': self.scheduler.pending, 'moves': self.moves,
+                'uptime_s': round(time.perf_counter() - self.started, 1)}
+
+    async def serveConnection(self, reader, writer):
+        """Answer requests from one client until it disconnects."""
+        client = object()
+        outstanding = asyncio.Semaphore(self.max_outstanding)
+        tasks = set()
+
+        async def answer(line):
+            try:
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'error': "bad json"}
+                else:
+                    try:
+                        response = await self.handle(request, client)
+                    except Exception as error:
+                        response = {'error': f"{type(error).__name__}: {error}"}
+                    if isinstance(request, dict) and 'id' in request:
+                        response['id'] = request['id']
+                writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+                await writer.drain()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                outstanding.release()
+
+        try:
+            while True:
+                await outstanding.acquire()
+                line = await reader.readline()
+                if not line:
+                    outstanding.release()
+                    break
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            # Nobody is left to answer: free the client's place in the queue
+            # before anything else, then stop what is still in progress.
+            self.scheduler.forget(client)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.wait(tasks)
+            for session_id in [key for key, session in self.sessions.items() if session.owner is client]:
+                del self.sessions[session_id]
+            writer.close()
+
+    async def serveTcp(self, host, port):
+        await self.start()
+        server = await asyncio.start_server(self.serveConnection, host, port, limit=1 << 16)
+        async with server:
+            await server.serve_forever()
+
+    async def serveStdio(self):
+        await self.start()
+        stdio = _Stdio()
+        await self.serveConnection(stdio, stdio)
+
+
+class _Stdio:
+    """Reader and writer over stdin and stdout, which may be files or
+    terminals rather than the pipes asyncio's transports require."""
+
+    async def readline(self):
+        return await asyncio.to_thread(sys.stdin.buffer.readline)
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve many games over a JSON-lines protocol.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--stdio', action='store_true', help="serve one client on stdin/stdout")
+    parser.add_argument('--workers', type=int, help="search processes (default: one per CPU)")
+    parser.add_argument('--max-sessions', type=int, default=100_000)
+    parser.add_argument('--max-pending', type=int, help="queued searches before refusing (default 64 per worker)")
+    parser.add_argument('--time-ms', type=int, default=100, help="default time per computer move")
+    parser.add_argument('--max-time-ms', type=int, default=2000, help="cap on a session's time per move")
+    parser.add_argument('--weights', help="weight file of more evaluators")
+    args = parser.parse_args(argv)
+
+    if args.weights:
+        from .evaluation import loadWeights
+        loadWeights(args.weights)
+    server = GameServer(args.workers, args.max_sessions, args.max_pending,
+                        default_time_ms=args.time_ms, max_time_ms=args.max_time_ms)
+    try:
+        if args.stdio:
+            asyncio.run(server.serveStdio())
+        else:
+            print(f"serving on {args.host}:{args.port} with {server.workers} workers", file=sys.stderr)
+            asyncio.run(server.serveTcp(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Exact game values by MTD(f) over null-window alpha-beta.
+
+``Solver.run(game, player)`` returns the game-theoretic value (store 1
+minus store 2 after perfect play, like ``search``) and a best pit.  Only the
+seeds left in the pits matter for the rest of the game, so the search value
+of a node is the mover's future store gain minus the opponent's, and nodes
+are keyed by the pit counts alone, mover's pits first, packed
+``layout.pack_bits`` to a pit into one int.  A position and its mirror
+image with the other side to move share an entry, and the stores never
+split a key.
+
+The table keeps a lower and upper bound and the best move per key, which is
+what MTD(f) needs between its null-window passes, packed into one small int
+so that an entry costs no more than its key.  An endgame ``Tablebase``
+answers the positions it covers directly.
+
+    python -m mancala.solver --moves CJFHAKDGBLEI
+    python -m mancala.solver --random 24 --count 5
+"""
+import argparse
+import random
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+# Values fit in a signed byte on every supported board (at most 96 seeds).
+INFINITY = 127
+# Table entries are one int: lower and upper bound offset by BIAS, then best + 1.
+BIAS = 128
+
+
+def peakMemory():
+    """Peak resident set size of this process in bytes, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Solver:
+    def __init__(self, tablebase=None, max_entries=20_000_000):
+        self.tablebase = tablebase
+        self.max_entries = max_entries
+        self.table = {}
+        self.nodes = 0
+        self.passes = 0
+        self.seconds = 0.0
+
+    def key(self, state, side):
+        layout = state.layout
+        bits = layout.pack_bits
+        pits = state.pits
+        key = 0
+        for i in layout.player_pits[side]:
+            key = (key << bits) | pits[i]
+        for i in layout.player_pits[3 - side]:
+            key = (key << bits) | pits[i]
+        return key
+
+    def orderedMoves(self, state, side, first):
+        pits = state.pits
+        layout = state.layout
+        store = layout.stores[side]
+        own = layout.is_own_pit[side]
+        paths = layout.sow_path[side]
+        cycle = layout.cycle
+        scores = {}
+        for i in layout.player_pits[side]:
+            seeds = pits[i]
+            if not seeds:
+                continue
+            last = paths[i][(seeds - 1) % cycle]
+            if i == first:
+                scores[i] = 1 << 20
+            elif last == store:
+                scores[i] = 1 << 10
+            elif own[last] and (seeds == cycle or seeds < cycle and pits[last] == 0):
+                scores[i] = 1 + pits[layout.opposite[last]]
+            else:
+                scores[i] = 0
+        return sorted(scores, key=scores.__getitem__, reverse=True)
+
+    def alphaBeta(self, state, side, alpha, beta):
+        """Mover's future gain difference, fail-soft within ``(alpha, beta)``."""
+        self.nodes += 1
+        tablebase = self.tablebase
+        if tablebase is not None:
+            value = tablebase.probe(state, side)
+            if value is not None:
+                return value
+        table = self.table
+        key = self.key(state, side)
+        entry = table.get(key)
+        first = None
+        if entry is not None:
+            lower = (entry >> 16) - BIAS
+            upper = ((entry >> 8) & 0xFF) - BIAS
+            first = (entry & 0xFF) - 1
+            if lower >= beta:
+                return lower
+            if upper <= alpha:
+                return upper
+            alpha = max(alpha, lower)
+            beta = min(beta, upper)
+        else:
+            lower, upper = -INFINITY, INFINITY
+        alpha_orig = alpha
+        store = state.layout.stores[side]
+        pits = state.pits
+        side_seeds = state.side_seeds
+        best_value, best = -INFINITY, None
+        for index in self.orderedMoves(state, side, first):
+            before = pits[store]
+            record = state.sow(side, index)
+            gain = pits[store] - before
+            if side_seeds[1] == 0 or side_seeds[2] == 0:
+                value = gain + side_seeds[side] - side_seeds[3 - side]
+            else:
+                value = gain - self.alphaBeta(state, 3 - side, gain - beta, gain - alpha)
+            state.unsow(record)
+            if value > best_value:
+                best_value, best = value, index
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        if best_value <= alpha_orig:
+            upper = best_value
+        elif best_value >= beta:
+            lower = best_value
+        else:
+            lower = upper = best_value
+        if entry is not None or len(table) < self.max_entries:
+            table[key] = (lower + BIAS) << 16 | (upper + BIAS) << 8 | best + 1
+        return best_value
+
+    def mtdf(self, state, side, guess=0):
+        """Exact mover's future gain difference by null-window passes."""
+        value = guess
+        lower, upper = -INFINITY, INFINITY
+        while lower < upper:
+            beta = value + 1 if value == lower else value
+            value = self.alphaBeta(state, side, beta - 1, beta)
+            self.passes += 1
+            if value < beta:
+                upper = value
+            else:
+                lower = value
+        return value
+
+    def run(self, game, player, guess=0):
+        """``(value, pit)``: store 1 minus store 2 under perfect play, and a move
+        that achieves it (None when the game is already over)."""
+        side = 1 if player == 1 else 2
+        sign = 1 if side == 1 else -1
+        state = game.state
+        start = time.perf_counter()
+        self.nodes = self.passes = 0
+        layout = state.layout
+        stores = state.pits[layout.stores[side]] - state.pits[layout.stores[3 - side]]
+        if state.is_terminal():
+            score_1, score_2 = state.final_scores()
+            self.seconds = time.perf_counter() - start
+            return score_1 - score_2, None
+        future = self.mtdf(state, side, guess)
+        # The table's best move may come from a pass that failed low, so
+        # confirm one that reaches the value with a null-window test.
+        best = None
+        pits = state.pits
+        side_seeds = state.side_seeds
+        store = layout.stores[side]
+        for index in self.orderedMoves(state, side, None):
+            before = pits[store]
+            record = state.sow(side, index)
+            gain = pits[store] - before
+            if side_seeds[1] == 0 or side_seeds[2] == 0:
+                value = gain + side_seeds[side] - side_seeds[3 - side]
+            else:
+                value = gain - self.alphaBeta(state, 3 - side, gain - future, gain - future + 1)
+            state.unsow(record)
+            if value >= future:
+                best = index
+                break
+        self.seconds = time.perf_counter() - start
+        return sign * (stores + future), layout.pit_names[best]
+
+
+def solve(game, player, tablebase=None):
+    """Exact ``(value, pit)`` for ``player``; see ``Solver.run``."""
+    return Solver(tablebase).run(game, player)
+
+
+def randomPosition(game_class, rng, seeds):
+    """A position reached by random play with at most ``seeds`` left in the pits."""
+    while True:
+        game = game_class()
+        state = game.state
+        side = 1
+        while not state.is_terminal() and sum(state.side_seeds) > seeds:
+            state.sow(side, rng.choice([i for i in state.layout.player_pits[side] if state.pits[i]]))
+            side = 3 - side
+        if not state.is_terminal():
+            return game, side
+
+
+def main(argv=None):
+    from .board import PIT_INDEX
+    from .tournament import _gameClass
+
+    parser = argparse.ArgumentParser(description="Solve positions exactly.")
+    parser.add_argument('--moves', help="pit names played from the start, e.g. CJFHAK")
+    parser.add_argument('--random', type=int, metavar='SEEDS',
+                        help="solve random positions with at most SEEDS seeds left in the pits")
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tablebase', help="endgame tablebase file to probe")
+    args = parser.parse_args(argv)
+
+    game_class = _gameClass()
+    if args.random is not None:
+        rng = random.Random(args.seed)
+        positions = [randomPosition(game_class, rng, args.random) for _ in range(args.count)]
+    else:
+        game = game_class()
+        side = 1
+        for pit in args.moves or '':
+            game.state.sow(side, PIT_INDEX[pit])
+            side = 3 - side
+        positions = [(game, side)]
+
+    tablebase = None
+    if args.tablebase:
+        from .tablebase import Tablebase
+        tablebase = Tablebase(args.tablebase)
+    print(f"{'seeds':>5}{'value':>7}{'move':>6}{'seconds':>10}{'nodes':>13}{'passes':>8}{'entries':>12}{'peak MB':>9}")
+    for game, side in positions:
+        solver = Solver(tablebase)
+        value, pit = solver.run(game, side)
+        peak = peakMemory()
+        print(f"{sum(game.state.side_seeds):>5}{value:>7}{pit:>6}{solver.seconds:>10.2f}{solver.nodes:>13,}"
+              f"{solver.passes:>8}{len(solver.table):>12,}{'' if peak is None else f'{peak / 2**20:.0f}':>9}",
+              flush=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""What a search did: counters, timings and profiling hooks.
+
+Every ``Search.run`` leaves a ``SearchStats`` in ``Search.stats``;
+``search(..., with_stats=True)`` returns it next to the move.  Comparing
+nodes and cutoffs between two versions tells an algorithmic change (the
+tree changed) from interpreter overhead (same tree, fewer nodes per second).
+
+``profileMove`` runs one search under ``cProfile``; ``Search.profiler``
+accepts any profiler with ``enable``/``disable`` or ``start``/``stop``
+methods, which covers sampling profilers as well::
+
+    python -m mancala.stats --depth 10 --profile
+    MANCALA_DEBUG=1 python main2.py
+"""
+import sys
+
+
+class SearchStats:
+    def __init__(self):
+        self.depth = 0
+        self.nodes = 0
+        self.leaves = 0
+        # cutoffs[ply] counts beta cutoffs at that distance from the root.
+        self.cutoffs = []
+        self.tt_probes = 0
+        self.tt_hits = 0
+        # (depth, seconds, nodes) of each finished iteration, cumulative.
+        self.iterations = []
+        self.seconds = 0.0
+
+    @property
+    def nps(self):
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def branching(self):
+        """Effective branching factor: node growth between the last two iterations."""
+        nodes = [0] + [n for _, _, n in self.iterations]
+        if len(nodes) < 3:
+            return None
+        previous = nodes[-2] - nodes[-3]
+        return (nodes[-1] - nodes[-2]) / previous if previous else None
+
+    def asDict(self):
+        return {
+            'depth': self.depth,
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'cutoffs': self.cutoffs,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'iterations': self.iterations,
+            'seconds': self.seconds,
+            'nps': self.nps,
+            'branching': self.branching,
+        }
+
+    def __str__(self):
+        lines = [f"depth {self.depth}, {self.nodes:,} nodes ({self.leaves:,} leaves) "
+                 f"in {self.seconds:.3f}s, {self.nps:,.0f} nodes/s"]
+        branching = self.branching
+        if branching is not None:
+            lines.append(f"effective branching factor {branching:.2f}")
+        if self.tt_probes:
+            lines.append(f"tt hits {self.tt_hits:,} of {self.tt_probes:,} "
+                         f"({self.tt_hits / self.tt_probes:.1%})")
+        if self.cutoffs:
+            lines.append("cutoffs by ply " + " ".join(str(n) for n in self.cutoffs))
+        for depth, seconds, nodes in self.iterations:
+            lines.append(f"  depth {depth:>2}: {seconds:8.3f}s {nodes:>12,} nodes")
+        return "\n".join(lines)
+
+
+def profilerCalls(profiler):
+    """``(start, stop)`` callables of a cProfile-style or sampling profiler."""
+    if hasattr(profiler, 'enable'):
+        return profiler.enable, profiler.disable
+    return profiler.start, profiler.stop
+
+
+def __getattr__(name):
+    # ``log``, the "mancala" logger, is made on first use: the engine itself
+    # never needs to import logging.
+    if name == 'log':
+        import logging
+        return logging.getLogger("mancala")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def debugEnabled():
+    """Whether the "mancala" logger takes debug records."""
+    # Nothing can have enabled it before logging was imported.
+    logging = sys.modules.get('logging')
+    return logging is not None and logging.getLogger("mancala").isEnabledFor(logging.DEBUG)
+
+
+def setDebug(enabled=True):
+    """Send the engine's debug log (moves, captures, search stats) to stderr."""
+    import logging
+
+    log = logging.getLogger("mancala")
+    if enabled and not log.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(name)s: %(message)s"))
+        log.addHandler(handler)
+    log.setLevel(logging.DEBUG if enabled else logging.WARNING)
+
+
+def profileMove(game, player, time_limit_ms=None, max_depth=None, use_heuristic2=False):
+    """Search one move under cProfile: ``(value, pit, stats, pstats.Stats)``."""
+    # Imported here: pstats alone costs more than the rest of the engine.
+    import cProfile
+    import io
+    import pstats
+
+    from .search import MAX_DEPTH, Search
+
+    engine = Search(use_heuristic2)
+    engine.profiler = cProfile.Profile()
+    value, pit = engine.run(game, player, time_limit_ms, max_depth or MAX_DEPTH)
+    return value, pit, engine.stats, pstats.Stats(engine.profiler, stream=io.StringIO())
+
+
+def main(argv=None):
+    import argparse
+
+    from .board import PIT_INDEX
+    from .search import Search
+    from .tournament import _gameClass
+
+    parser = argparse.ArgumentParser(description="Search one position and report what the search did.")
+    parser.add_argument('--moves', default='', help="pit names played from the start, e.g. FLC")
+    parser.add_argument('--depth', type=int, default=10)
+    parser.add_argument('--time-ms', type=int)
+    parser.add_argument('--heuristic2', action='store_true')
+    parser.add_argument('--profile', action='store_true', help="also print the top cProfile entries")
+    args = parser.parse_args(argv)
+
+    game = _gameClass()()
+    side = 1
+    for pit in args.moves:
+        game.state.sow(side, PIT_INDEX[pit])
+        side = 3 - side
+    if args.profile:
+        value, pit, stats, profile = profileMove(game, side, args.time_ms, args.depth, args.heuristic2)
+    else:
+        engine = Search(args.heuristic2)
+        value, pit = engine.run(game, side, args.time_ms, args.depth)
+        stats, profile = engine.stats, None
+    print(f"player {side} plays {pit} (value {value})")
+    print(stats)
+    if profile is not None:
+        profile.stream = sys.stdout
+        profile.sort_stats('tottime').print_stats(15)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Endgame tablebase: exact values of every position with few seeds left.
+
+The table is for the standard six-pit board.  Only the seeds in the twelve
+pits matter for the rest of the game; the stores just add a constant.  The
+table therefore stores, for every distribution of at most ``K`` seeds over
+the pits with player 1 to move, the best achievable (mover's future gain -
+opponent's future gain) as one signed byte.  Positions with player 2 to
+move are looked up mirrored, since rotating the board by seven holes swaps
+the two sides exactly.
+
+Entries are indexed by a combinatorial ranking: all positions with fewer
+seeds come first, then the rank of the distribution among those with the
+same seed count (stars and bars in the combinatorial number system).
+
+The table is filled by a memoized forward search, not by retrograde
+passes over unmoves: positions are visited in rank order and each one is
+solved by negamax over its moves, recursing into successors not solved yet
+and storing every value as it is found.  Seeds never return to the pits
+once they reach a store, so each position only depends on positions with
+fewer seeds or, for moves that stay on the mover's side, on positions where
+seeds sit closer to their store, and the recursion terminates; it can run
+about twelve frames per seed deep, so the recursion limit is raised while
+building.  ``scripts/check_tablebase.py`` checks the table against a
+brute-force search.
+
+    python -m mancala.tablebase build --seeds 10 --out endgame.tb
+    python -m mancala.tablebase bench endgame.tb
+"""
+import argparse
+import mmap
+import random
+import struct
+import sys
+import time
+from math import comb
+
+from .board import CYCLE, OPPOSITE, PLAYER_PITS, SOW_PATH, STANDARD, MancalaBoard
+
+MAGIC = b"MKTB"
+HEADER = struct.Struct("<4sHH")
+
+
+def _tables(max_seeds):
+    binom = [[comb(n, k) for k in range(13)] for n in range(max_seeds + 13)]
+    # offsets[n] is the number of distributions with fewer than n seeds.
+    offsets = [comb(n + 11, 12) for n in range(max_seeds + 2)]
+    return binom, offsets
+
+
+def rank(counts, binom, offsets):
+    """Index of twelve pit counts: the mover's six pits, then the opponent's."""
+    r = offsets[sum(counts)]
+    b = -1
+    for j in range(11):
+        b += counts[j] + 1
+        r += binom[b][j + 1]
+    return r
+
+
+def _counts(pits, side):
+    """The twelve pit counts of a 14-hole board as seen by ``side``."""
+    if side == 1:
+        return pits[0:6] + pits[7:13]
+    return pits[7:13] + pits[0:6]
+
+
+def _moves(counts):
+    """``(gain, next counts or None when the game ended)`` for each move.
+
+    ``counts`` has player 1 to move; ``next counts`` has the opponent to
+    move and is already mirrored for them.
+    """
+    board = counts[0:6] + [0] + counts[6:12] + [0]
+    path_table = SOW_PATH[1]
+    for index in range(6):
+        seeds = board[index]
+        if not seeds:
+            continue
+        pits = board[:]
+        pits[index] = 0
+        laps, rest = divmod(seeds, CYCLE)
+        path = path_table[index]
+        if laps:
+            for j in path:
+                pits[j] += laps
+        for j in path[:rest]:
+            pits[j] += 1
+        last = path[(seeds - 1) % CYCLE]
+        if last < 6 and pits[last] == 1:
+            opposite = OPPOSITE[last]
+            pits[6] += pits[opposite] + 1
+            pits[opposite] = 0
+            pits[last] = 0
+        own, other = sum(pits[0:6]), sum(pits[7:13])
+        if not own or not other:
+            yield pits[6] + own - other, None
+        else:
+            yield pits[6], pits[7:13] + pits[0:6]
+
+
+def build(max_seeds, path, report=None):
+    """Solve every position with up to ``max_seeds`` seeds and write ``path``.
+
+    ``report(seeds, entries, seconds)`` is called as each seed count is
+    finished; the first ``entries`` bytes form the table for that count.
+    """
+    if not 0 <= max_seeds <= 127:
+        raise ValueError("max_seeds must be between 0 and 127")
+    binom, offsets = _tables(max_seeds)
+    table = bytearray(offsets[max_seeds + 1])
+    known = bytearray(len(table))
+
+    def solve(counts):
+        index = rank(counts, binom, offsets)
+        if known[index]:
+            value = table[index]
+            return value - 256 if value > 127 else value
+        own, other = sum(counts[0:6]), sum(counts[6:12])
+        if not own or not other:
+            best = own - other
+        else:
+            best = None
+            for gain, after in _moves(counts):
+                value = gain if after is None else gain - solve(after)
+                if best is None or value > best:
+                    best = value
+        table[index] = best & 0xFF
+        known[index] = 1
+        return best
+
+    def distributions(total, parts):
+        if parts == 1:
+            yield [total]
+            return
+        for first in range(total + 1):
+            for rest in distributions(total - first, parts - 1):
+                yield [first] + rest
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 12 * max_seeds + 1000))
+    start = time.perf_counter()
+    try:
+        for seeds in range(max_seeds + 1):
+            for counts in distributions(seeds, 12):
+                solve(counts)
+            if report is not None:
+                report(seeds, offsets[seeds + 1], time.perf_counter() - start)
+    finally:
+        sys.setrecursionlimit(limit)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 1, max_seeds))
+        f.write(table)
+
+
+class Tablebase:
+    """A built table, memory-mapped read-only."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_seeds = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != 1:
+            self.close()
+            raise ValueError(f"{path} is not a Mancala tablebase")
+        self._binom, self._offsets = _tables(self.max_seeds)
+        self._base = HEADER.size
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def covers(self, state):
+        side_seeds = state.side_seeds
+        return side_seeds[1] + side_seeds[2] <= self.max_seeds and state.layout is STANDARD
+
+    def probe(self, state, side):
+        """Best future gain difference for ``side`` to move, or None if the
+        position has too many seeds left."""
+        if not self.covers(state):
+            return None
+        value = self._map[self._base + rank(_counts(state.pits, side), self._binom, self._offsets)]
+        return value - 256 if value > 127 else value
+
+    def value(self, state, side):
+        """Final store difference for ``side`` to move under perfect play."""
+        future = self.probe(state, side)
+        if future is None:
+            return None
+        pits = state.pits
+        stores = pits[6] - pits[13]
+        return (stores if side == 1 else -stores) + future
+
+    def bestMove(self, state, side):
+        """``(final store difference for side, board index)`` of a perfect move."""
+        best, best_index = None, None
+        for index in PLAYER_PITS[side]:
+            if not state.pits[index]:
+                continue
+            record = state.sow(side, index)
+            if state.is_terminal():
+                score_1, score_2 = state.final_scores()
+                value = score_1 - score_2 if side == 1 else score_2 - score_1
+            else:
+                value = -self.value(state, 3 - side)
+            state.unsow(record)
+            if best is None or value > best:
+                best, best_index = value, index
+        return best, best_index
+
+
+def _benchProbes(tablebase, count, seed):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        pits = [0] * 14
+        for _ in range(rng.randint(1, tablebase.max_seeds)):
+            pits[rng.choice((0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12))] += 1
+        boards.append(MancalaBoard.fromPits(pits))
+    start = time.perf_counter()
+    for board in boards:
+        tablebase.probe(board, 1)
+    return (time.perf_counter() - start) / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or measure an endgame tablebase.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build")
+    build_parser.add_argument("--seeds", type=int, default=10, help="largest number of seeds in the pits")
+    build_parser.add_argument("--out", default="endgame.tb")
+    bench_parser = commands.add_parser("bench")
+    bench_parser.add_argument("path")
+    bench_parser.add_argument("--probes", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        print(f"{'K':>3}{'positions':>12}{'file bytes':>12}{'build s':>9}")
+
+        def report(seeds, entries, seconds):
+            print(f"{seeds:>3}{entries:>12,}{entries + HEADER.size:>12,}{seconds:>9.2f}", flush=True)
+
+        build(args.seeds, args.out, report)
+    else:
+        tablebase = Tablebase(args.path)
+        try:
+            latency = _benchProbes(tablebase, args.probes, 0)
+        finally:
+            tablebase.close()
+        print(f"K={tablebase.max_seeds}: {latency * 1e6:.2f} us per probe")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Headless engine-vs-engine matches.
+
+    python -m mancala.tournament evaluate:3 evaluate2:3 --games 1000 --workers 4
+
+An engine is written ``<evaluator>:<budget>`` where the evaluator is
+``evaluate``, ``evaluate2`` or one from the ``--weights`` file, and the
+budget is a fixed depth (``5``) or a time per move (``50ms``).  In place of
+an evaluator, ``mcts``, ``mcts-greedy`` or ``mcts-batch`` selects Monte
+Carlo tree search, whose fixed budget is a number of playouts
+(``mcts:2000``).  Every opening (a few random plies from the start
+position) is played twice with the engines swapping sides.  Results stream
+to a JSON-lines file, one game per line with all its moves (which
+``python -m mancala.book extend`` can feed into the opening book), and with
+``--records`` to a compact game-record file that also keeps the search
+behind every move (see ``mancala.record``).  The
+summary reports win/draw/loss for the first engine, the Elo difference with
+a 95% confidence interval, and games per second.
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .board import PIT_NAMES, PLAYER_PITS
+from .evaluation import getEvaluator, loadWeights
+from .mcts import MCTS_ENGINES, mctsEngine
+from .record import GameRecord, RecordWriter
+from .search import Search
+from .tt import TranspositionTable
+
+
+def _gameClass():
+    from .game import Game
+    return Game
+
+
+def parseEngine(spec):
+    """``'evaluate2:50ms'`` -> ``{'evaluator': EVALUATE2, 'time_limit_ms': 50, ...}``."""
+    name, _, budget = spec.partition(':')
+    if not budget:
+        raise ValueError(f"engine must look like evaluate:3 or evaluate2:50ms, not {spec!r}")
+    mcts = name in MCTS_ENGINES
+    engine = {'name': spec, 'evaluator': None if mcts else getEvaluator(name), 'mcts': name if mcts else None,
+              'max_depth': None, 'iterations': None, 'time_limit_ms': None}
+    if budget.endswith('ms'):
+        engine['time_limit_ms'] = int(budget[:-2])
+    else:
+        engine['iterations' if mcts else 'max_depth'] = int(budget)
+    return engine
+
+
+def newEngine(engine, seed=None):
+    """The searcher for a ``parseEngine`` result."""
+    if engine['mcts']:
+        return mctsEngine(engine['mcts'], iterations=engine['iterations'], seed=seed)
+    return Search(tt=TranspositionTable(4), evaluator=engine['evaluator'])
+
+
+def randomOpening(rng, plies):
+    """Pit names for ``plies`` random moves, alternating from player 1."""
+    game = _gameClass()()
+    state = game.state
+    moves = []
+    side = 1
+    for _ in range(plies):
+        legal = [i for i in PLAYER_PITS[side] if state.pits[i]]
+        if not legal or state.is_terminal():
+            break
+        index = rng.choice(legal)
+        state.sow(side, index)
+        moves.append(PIT_NAMES[index])
+        side = 3 - side
+    if state.is_terminal():
+        return moves[:-1]
+    return moves
+
+
+def playGame(task):
+    """Play one game; ``task`` is ``(game_id, opening, engine_1, engine_2)``."""
+    game_id, opening, engine_1, engine_2 = task
+    game = _gameClass()()
+    engines = {}
+    for side, engine in ((1, engine_1), (2, engine_2)):
+        engines[side] = (newEngine(engine, seed=2 * game_id + side), engine)
+    player = 1
+    for pit in opening:
+        game.state.doMove(player, pit)
+        player = player % 2 + 1
+    moves = list(opening)
+    # (value, depth, nodes, ms) of every searched move, for game records.
+    notes = [None] * len(opening)
+    while not game.gameOver():
+        searcher, engine = engines[player]
+        max_depth = engine['max_depth'] or 64
+        value, pit = searcher.run(game, player, engine['time_limit_ms'], max_depth)
+        stats = searcher.stats
+        notes.append((value, stats.depth, stats.nodes, round(stats.seconds * 1000)))
+        game.state.doMove(player, pit)
+        player = player % 2 + 1
+        moves.append(pit)
+    return game_id, game.state.board[1], game.state.board[2], moves, notes
+
+
+def schedule(games, opening_plies, seed, engine_a, engine_b):
+    """Yield ``(task, a_side)``: each opening twice, the engines swapping sides."""
+    rng = random.Random(seed)
+    for game_id in range(0, games, 2):
+        opening = randomOpening(rng, opening_plies)
+        yield (game_id, opening, engine_a, engine_b), 1
+        if game_id + 1 < games:
+            yield (game_id + 1, opening, engine_b, engine_a), 2
+
+
+def eloDifference(wins, draws, losses):
+    """``(elo, low, high)`` of the first engine over the second, 95% interval."""
+    games = wins + draws + losses
+    if not games:
+        return 0.0, float('-inf'), float('inf')
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = 1.96 * math.sqrt(variance / games)
+
+    def elo(p):
+        if p <= 0:
+            return float('-inf')
+        if p >= 1:
+            return float('inf')
+        return -400 * math.log10(1 / p - 1)
+
+    return elo(score), elo(score - margin), elo(score + margin)
+
+
+def runMatch(engine_a, engine_b, games=100, workers=1, opening_plies=2, seed=0, out=None, records=None):
+    """Play the match and return ``(wins, draws, losses, seconds)`` for engine_a.
+
+    ``out`` is an open text file that receives one JSON line per game as
+    soon as it finishes; ``records`` a ``RecordWriter`` that receives the
+    game with the search of every move.
+    """
+    tasks = list(schedule(games, opening_plies, seed, engine_a, engine_b))
+    a_sides = {task[0]: a_side for task, a_side in tasks}
+    openings = {task[0]: task[1] for task, _ in tasks}
+    wins = draws = losses = 0
+    start = time.perf_counter()
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers)
+        results = pool.map(playGame, [task for task, _ in tasks], chunksize=4)
+    else:
+        pool = None
+        results = map(playGame, [task for task, _ in tasks])
+    try:
+        for game_id, score_1, score_2, moves, notes in results:
+            a_side = a_sides[game_id]
+            a_score, b_score = (score_1, score_2) if a_side == 1 else (score_2, score_1)
+            if a_score > b_score:
+                wins += 1
+            elif a_score < b_score:
+                losses += 1
+            else:
+                draws += 1
+            if out is not None:
+                out.write(json.dumps(
+                    {'g': game_id, 'a': a_side, 's': [score_1, score_2], 'n': len(moves),
+                     'o': ''.join(openings[game_id]), 'm': ''.join(moves)}, separators=(',', ':')) + '\n')
+                out.flush()
+            if records is not None:
+                records.write(GameRecord(moves=''.join(moves), notes=notes, scores=(score_1, score_2)))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return wins, draws, losses, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play engine-vs-engine matches without the GUI.")
+    parser.add_argument('engine_a', help="e.g. evaluate:3")
+    parser.add_argument('engine_b', help="e.g. evaluate2:50ms")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--opening-plies', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="JSON-lines file for per-game results")
+    parser.add_argument('--records', help="game-record file to append every game to, see mancala.record")
+    parser.add_argument('--weights', help="weight file of more evaluators, from python -m mancala.tune")
+    args = parser.parse_args(argv)
+
+    if args.weights:
+        loadWeights(args.weights)
+    try:
+        engine_a, engine_b = parseEngine(args.engine_a), parseEngine(args.engine_b)
+    except ValueError as error:
+        parser.error(str(error))
+    out = open(args.out, 'w') if args.out else None
+    records = RecordWriter(args.records, flush=True) if args.records else None
+    try:
+        wins, draws, losses, seconds = runMatch(
+            engine_a, engine_b, args.games, args.workers, args.opening_plies, args.seed, out, records)
+    finally:
+        if out is not None:
+            out.close()
+        if records is not None:
+            records.close()
+    elo, low, high = eloDifference(wins, draws, losses)
+    games = wins + draws + losses
+    print(f"{args.engine_a} vs {args.engine_b}: +{wins} ={draws} -{losses} of {games}")
+    print(f"Elo {elo:+.1f} [{low:+.1f}, {high:+.1f}]")
+    print(f"{games / seconds:.2f} games/s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
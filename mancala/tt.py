@@ -0,0 +1,88 @@
+"""Transposition table for the alpha-beta search.
+
+Entries are ``(key, depth, bound, value, pit)`` tuples.  The table is an
+array of two-slot buckets: the first slot keeps whichever entry was searched
+deepest, the second is overwritten by every store that does not qualify for
+the first.  The number of buckets follows from the memory cap, so the table
+never grows past it.
+"""
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Salts folded into keys when the same position can be searched for
+# different values: as the maximizing side, scored with evaluate2, or by the
+# negamax search, which stores values from the mover's point of view.  The
+# GUI's fixed-depth search also salts the game mode, which picks the
+# children's heuristics, and player 2 being the maximizing player.
+MAXIMUM_KEY = 0x9E3779B97F4A7C15
+HEURISTIC2_KEY = 0xC2B2AE3D27D4EB4F
+NEGAMAX_KEY = 0x165667B19E3779F9
+COMPUTERS_KEY = 0x94D049BB133111EB
+MAXPLAYER2_KEY = 0xBF58476D1CE4E5B9
+
+# Rough footprint of one stored entry in CPython: the 5-tuple, a 64-bit
+# key, a float value and the list slot pointing at it.
+ENTRY_BYTES = 160
+
+
+class TranspositionTable:
+    __slots__ = ('buckets', 'table', 'hits', 'misses', 'stores', 'replacements')
+
+    def __init__(self, megabytes=16):
+        self.buckets = max(1, int(megabytes * 2 ** 20) // (2 * ENTRY_BYTES))
+        self.table = [None] * (2 * self.buckets)
+        self.hits = self.misses = self.stores = self.replacements = 0
+
+    def lookup(self, key):
+        table = self.table
+        i = (key % self.buckets) << 1
+        entry = table[i]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = table[i + 1]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, bound, value, pit):
+        table = self.table
+        i = (key % self.buckets) << 1
+        kept = table[i]
+        if kept is None or kept[0] == key or depth >= kept[1]:
+            target = i
+        else:
+            target = i + 1
+        old = table[target]
+        if old is not None and old[0] != key:
+            self.replacements += 1
+        table[target] = (key, depth, bound, value, pit)
+        self.stores += 1
+
+    def copy(self):
+        """A table with the same entries that can be written without changing
+        this one.  Entries are immutable, so only the slot list is copied."""
+        other = TranspositionTable.__new__(TranspositionTable)
+        other.buckets = self.buckets
+        other.table = self.table[:]
+        other.hits = other.misses = other.stores = other.replacements = 0
+        return other
+
+    def clear(self):
+        self.table = [None] * (2 * self.buckets)
+        self.hits = self.misses = self.stores = self.replacements = 0
+
+    def __len__(self):
+        return sum(entry is not None for entry in self.table)
+
+    def stats(self):
+        return {
+            'entries': len(self),
+            'capacity': len(self.table),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'replacements': self.replacements,
+        }
@@ -0,0 +1,203 @@
+"""Fit evaluator weights to game outcomes or deep-search values.
+
+    python -m mancala.tournament evaluate2:6 evaluate2:6 --games 2000 --workers 4 --out games.jsonl
+    python -m mancala.tune --games games.jsonl --out weights.json
+    python -m mancala.tune --random 50000 --depth 8 --workers 4 --out weights.json --name deep
+
+Samples are the non-terminal positions of recorded games, each labelled with
+the game's final store difference, or random positions labelled with the
+value of a ``--depth`` search.  Evaluators estimate exactly that number, so
+the weights are the least-squares fit of ``features() . w`` to the labels,
+optionally ridge-regularized.
+
+Everything past labelling is vectorized: random positions are played out in
+one NumPy batch (``batch.apply``), features are computed for all boards at
+once, and the fit solves one small system of normal equations in this
+process, which takes milliseconds even for millions of samples.  Searches,
+the expensive part of ``--random``, are spread over ``--workers``.  The
+fitted evaluator is added to the weight file, which ``main2.py`` and
+``python -m mancala.tournament --weights`` load at startup.
+
+Only the standard six-pit board is supported, like ``batch``.  Requires
+NumPy.
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import batch
+from .board import PIT_INDEX, STANDARD, MancalaBoard
+from .evaluation import EVALUATORS, FEATURE_SETS, FEATURES, Evaluator, getEvaluator, saveWeights
+from .search import Search
+from .tournament import _gameClass
+
+P1_PITS = np.array(STANDARD.player_pits[1], dtype=np.intp)
+P2_PITS = np.array(STANDARD.player_pits[2], dtype=np.intp)
+OPPOSITE = np.array(STANDARD.opposite, dtype=np.intp)
+
+_engine = None
+
+
+def boardFeatures(boards):
+    """``(N, 4)`` array of ``MancalaBoard.features()`` for every row."""
+    boards = np.asarray(boards)
+    stores = boards[:, STANDARD.stores[1]] - boards[:, -1]
+    columns = [stores]
+    empty = boards == 0
+    capture = np.where(empty, boards[:, OPPOSITE], 0)
+    for counts in (boards, empty, capture):
+        columns.append(counts[:, P1_PITS].sum(axis=1) - counts[:, P2_PITS].sum(axis=1))
+    return np.stack(columns, axis=1).astype(float)
+
+
+def gameSamples(lines):
+    """``(boards, sides, margins)`` of every non-terminal position of recorded
+    games, ``margins`` being each game's final store 1 minus store 2.
+
+    ``lines`` are tournament JSON lines; ``m`` holds every move of the game.
+    """
+    boards, sides, margins = [], [], []
+    for line in lines:
+        record = json.loads(line)
+        moves = record.get("m")
+        if not moves:
+            continue
+        margin = record["s"][0] - record["s"][1]
+        state = MancalaBoard()
+        side = 1
+        for pit in moves:
+            if state.is_terminal():
+                break
+            boards.append(list(state.pits))
+            sides.append(side)
+            margins.append(margin)
+            state.sow(side, PIT_INDEX[pit])
+            side = 3 - side
+    return np.array(boards, dtype=np.int64).reshape(-1, STANDARD.size), np.array(sides), np.array(margins, float)
+
+
+def randomBoards(count, rng, min_plies=4, max_plies=40):
+    """``(boards, sides)``: non-terminal positions after a uniform random number
+    of random moves from the start, all ``count`` games played at once."""
+    boards = np.tile(np.array(STANDARD.start, dtype=np.int64), (count, 1))
+    sides = np.ones(count, dtype=np.intp)
+    target = rng.integers(min_plies, max_plies + 1, count)
+    out, out_sides = boards.copy(), sides.copy()
+    rows = np.arange(count)
+    moves = batch.MOVES
+    for ply in range(max_plies + 1):
+        at = target == ply
+        out[at], out_sides[at] = boards[at], sides[at]
+        if ply == max_plies:
+            break
+        legal = boards[rows[:, None], moves[sides - 1]] > 0
+        choice = np.argmax(rng.random(legal.shape) * legal, axis=1)
+        boards = batch.apply(boards, sides, moves[sides - 1, choice])
+        sides = 3 - sides
+    live = ~batch.is_terminal(out)
+    return out[live], out_sides[live]
+
+
+def _searchValues(task):
+    global _engine
+    boards, sides, depth, evaluator = task
+    if _engine is None or _engine.evaluator.key != evaluator.key:
+        _engine = Search(evaluator=evaluator)
+    game = _gameClass()()
+    values = []
+    for pits, side in zip(boards, sides):
+        game.state = MancalaBoard.fromPits(pits)
+        value, _ = _engine.run(game, side, max_depth=depth)
+        values.append(value)
+    return values
+
+
+def searchValues(boards, sides, depth, evaluator=None, pool=None, report=None):
+    """The ``depth``-ply search value (store 1 minus store 2) of every row."""
+    evaluator = getEvaluator(evaluator)
+    chunks = max(1, len(boards) // 64)
+    tasks = [(b.tolist(), s.tolist(), depth, evaluator)
+             for b, s in zip(np.array_split(boards, chunks), np.array_split(sides, chunks))]
+    results = (pool.map if pool is not None else map)(_searchValues, tasks)
+    values = []
+    for result in results:
+        values.extend(result)
+        if report is not None:
+            report(len(values), len(boards))
+    return np.array(values, dtype=float)
+
+
+def fit(features, targets, ridge=0.0):
+    """Least-squares weights for the columns of ``features``."""
+    gram = features.T @ features + ridge * len(targets) * np.eye(features.shape[1])
+    return np.linalg.solve(gram, features.T @ targets)
+
+
+def meanSquaredError(features, targets, evaluator):
+    vector = np.array([evaluator.weights.get(feature, 0) for feature in FEATURES], dtype=float)
+    return float(np.mean((features @ vector - targets) ** 2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit evaluator weights.")
+    parser.add_argument('--games', nargs='+', default=[], help="tournament JSON-lines files; fit to game outcomes")
+    parser.add_argument('--random', type=int, default=0, metavar='N',
+                        help="fit to the search values of N random positions")
+    parser.add_argument('--depth', type=int, default=8, help="search depth for --random")
+    parser.add_argument('--target', default='evaluate2', help="evaluator of the --random searches")
+    parser.add_argument('--features', choices=sorted(FEATURE_SETS), default='full')
+    parser.add_argument('--ridge', type=float, default=0.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--name', default='tuned', help="name of the fitted evaluator")
+    parser.add_argument('--out', help="weight file to add the evaluator to")
+    args = parser.parse_args(argv)
+    if not args.games and not args.random:
+        parser.error("give --games or --random")
+
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+    try:
+        start = time.perf_counter()
+        boards = [np.zeros((0, STANDARD.size), dtype=np.int64)]
+        targets = [np.zeros(0)]
+        for path in args.games:
+            with open(path) as f:
+                game_boards, _, margins = gameSamples(f)
+            boards.append(game_boards)
+            targets.append(margins)
+        if args.random:
+            random_boards, sides = randomBoards(args.random, np.random.default_rng(args.seed))
+
+            def report(done, total):
+                print(f"\r{done}/{total} searches", end="", flush=True)
+
+            values = searchValues(random_boards, sides, args.depth, args.target, pool, report)
+            print()
+            boards.append(random_boards)
+            targets.append(values)
+        boards, targets = np.concatenate(boards), np.concatenate(targets)
+        print(f"{len(boards):,} samples in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        features = boardFeatures(boards)
+        columns = [FEATURES.index(feature) for feature in FEATURE_SETS[args.features]]
+        weights = fit(features[:, columns], targets, args.ridge)
+        print(f"fitted in {time.perf_counter() - start:.3f}s")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    tuned = Evaluator(args.name, {FEATURES[c]: round(float(w), 4) for c, w in zip(columns, weights)})
+    for evaluator in (EVALUATORS['evaluate'], EVALUATORS['evaluate2'], tuned):
+        print(f"{evaluator.name:>10}  mse {meanSquaredError(features, targets, evaluator):8.3f}  {evaluator.weights}")
+    if args.out:
+        saveWeights(args.out, [tuned])
+        print(f"{args.out}: {args.name}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Run a search on a background thread so the Tk event loop keeps running.
+
+The GUI starts a ``SearchHandle``, polls ``done()``/``progress()`` from
+``root.after`` callbacks and reads ``result()`` once it has finished.  The
+search works on its own copy of the game, so cancelling it never leaves the
+displayed board half-played.
+
+A ``Ponder`` searches on the opponent's time: started once the computer has
+moved, it deepens the positions after the opponent's likely replies until
+the real reply arrives, and ``take(pit)`` hands over the engine that
+searched it.
+"""
+import copy
+import threading
+import time
+
+from .search import MAX_DEPTH, Search
+
+
+class SearchHandle:
+    def __init__(self, game, player, time_limit_ms=None, max_depth=MAX_DEPTH, use_heuristic2=False, tt=None,
+                 tablebase=None, engine=None, evaluator=None, min_depth=1):
+        # engine replaces the default Search, e.g. with a ParallelSearch.
+        # min_depth (Search only) is searched to whatever the time limit.
+        if engine is None:
+            engine = Search(use_heuristic2, tt, tablebase=tablebase, evaluator=evaluator)
+        self.engine = engine
+        # Cleared here, not in run(), so a cancel() before the thread gets
+        # going is not lost.
+        engine.stopped = False
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, args=(copy.deepcopy(game), player, time_limit_ms, max_depth, min_depth),
+            name="mancala-search", daemon=True)
+        self._thread.start()
+
+    def _run(self, game, player, time_limit_ms, max_depth, min_depth):
+        try:
+            if min_depth > 1:
+                self._result = self.engine.run(game, player, time_limit_ms, max_depth, min_depth)
+            else:
+                self._result = self.engine.run(game, player, time_limit_ms, max_depth)
+        except BaseException as error:
+            self._error = error
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def progress(self):
+        """``(depth being searched, nodes searched so far)``."""
+        return self.engine.current_depth, self.engine.nodes
+
+    def cancel(self, wait=True):
+        self.engine.stop()
+        if wait:
+            self._thread.join()
+
+    def stats(self):
+        """``SearchStats`` of the last finished search, if the engine keeps them."""
+        return getattr(self.engine, 'stats', None)
+
+    @property
+    def cancelled(self):
+        return self.engine.stopped
+
+    def result(self):
+        """``(value, pit)`` of a finished search; re-raises a worker error."""
+        if not self.done():
+            raise RuntimeError("search still running")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class Ponder:
+    """Search the positions after ``player``'s replies while ``player`` thinks.
+
+    Every reply gets its own ``Search``, so its own transposition table,
+    killers and history, all starting from a copy of those of ``base`` (the
+    engine that just moved, whose table holds the game so far).  All replies
+    are searched to depth 1, then the ``width`` best for ``player`` (by their
+    latest values) are deepened round-robin, one ply at a time, until
+    ``take`` or ``stop``.
+    """
+
+    def __init__(self, game, player, evaluator=None, tablebase=None, width=3, max_depth=MAX_DEPTH, base=None):
+        self.player = 1 if player == 1 else 2
+        self.computer = 3 - self.player
+        self.evaluator = evaluator
+        self.tablebase = tablebase
+        self.width = width
+        self.base = base
+        self.engines = {}
+        # Per reply: latest value (store 1 minus store 2), depth reached and
+        # seconds spent.
+        self.values = {}
+        self.depths = {}
+        self.seconds = {}
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._current = None
+        game = copy.deepcopy(game)
+        self.replies = game.state.possibleMoves(self.player)
+        self._thread = threading.Thread(target=self._run, args=(game, max_depth), name="mancala-ponder", daemon=True)
+        self._thread.start()
+
+    def _run(self, game, max_depth):
+        state = game.state
+        sign = 1 if self.player == 1 else -1
+        solved = set()
+        for depth in range(1, max_depth + 1):
+            replies = [pit for pit in self.replies if pit not in solved]
+            if depth > 1:
+                replies.sort(key=lambda pit: -sign * self.values[pit])
+                replies = replies[:self.width]
+            if not replies:
+                return
+            for pit in replies:
+                engine = self.engines.get(pit)
+                if engine is None:
+                    engine = self.engines[pit] = self.newEngine()
+                with self._lock:
+                    if self._stopped:
+                        return
+                    self._current = engine
+                record = state.doMove(self.player, pit)
+                start = time.perf_counter()
+                try:
+                    value, _ = engine.run(game, self.computer, None, depth)
+                finally:
+                    state.undoMove(record)
+                    self.seconds[pit] = self.seconds.get(pit, 0.0) + time.perf_counter() - start
+                if engine.stopped:
+                    return
+                self.values[pit], self.depths[pit] = value, engine.depth
+                if engine.depth < depth:
+                    # Searched to the end of the game: nothing left to deepen.
+                    solved.add(pit)
+
+    def newEngine(self):
+        base = self.base
+        if base is None:
+            return Search(tablebase=self.tablebase, evaluator=self.evaluator)
+        engine = Search(tt=base.tt.copy(), tablebase=self.tablebase, evaluator=self.evaluator)
+        engine.history = {side: list(scores) for side, scores in base.history.items()}
+        return engine
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            if self._current is not None:
+                self._current.stop()
+        self._thread.join()
+
+    def take(self, pit):
+        """Stop pondering; ``(engine, depth, seconds)`` for the reply ``pit``, or
+        ``(None, 0, 0.0)`` if it was not searched.  The other engines are
+        dropped."""
+        self.stop()
+        engine = self.engines.pop(pit, None)
+        self.engines.clear()
+        if engine is None or pit not in self.depths:
+            return None, 0, 0.0
+        engine.stopped = False
+        return engine, self.depths[pit], self.seconds[pit]
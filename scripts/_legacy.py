@@ -0,0 +1,131 @@
+"""The original dict-based engine from main2.py, kept verbatim as a reference.
+
+Benchmarks measure the array board against it and the differential checks
+compare search results with it; nothing in the game imports this module.
+"""
+import copy
+
+
+class MancalaBoard:
+    def __init__(self):
+        self.board = {
+            'A': 4, 'B': 4, 'C': 4, 'D': 4, 'E': 4, 'F': 4, 1: 0,
+            'L': 4, 'K': 4, 'J': 4, 'I': 4, 'H': 4, 'G': 4,
+            2: 0
+        }
+        self.player1_pits = ('A', 'B', 'C', 'D', 'E', 'F')
+        self.player2_pits = ('G', 'H', 'I', 'J', 'K', 'L')
+        self.opposite_pits = {
+            'A': 'G', 'B': 'H', 'C': 'I', 'D': 'J', 'E': 'K', 'F': 'L',
+            'G': 'A', 'H': 'B', 'I': 'C', 'J': 'D', 'K': 'E', 'L': 'F'
+        }
+
+    def possibleMoves(self, player):
+        pits = self.player1_pits if player == 1 else self.player2_pits
+        return [pit for pit in pits if self.board[pit] > 0]
+
+    def doMove(self, player, pit):
+        seeds = self.board[pit]
+        self.board[pit] = 0
+        pits = list(self.board.keys())
+        current_index = pits.index(pit)
+        while seeds > 0:
+            current_index = (current_index + 1) % len(pits)
+            next_pit = pits[current_index]
+            if (player == 1 and next_pit == 2) or (player == 2 and next_pit == 1):
+                continue
+            self.board[next_pit] += 1
+            seeds -= 1
+        if next_pit in (self.player1_pits if player == 1 else self.player2_pits):
+            if self.board[next_pit] == 1:
+                opposite_pit = self.opposite_pits[next_pit]
+                captured_seeds = self.board[opposite_pit]
+                self.board[opposite_pit] = 0
+                store = 1 if player == 1 else 2
+                self.board[store] += captured_seeds + 1
+                self.board[next_pit] = 0
+
+
+class Game:
+    def __init__(self):
+        self.state = MancalaBoard()
+        self.playerSide = {1: 'Player 1', 2: 'Player 2'}
+
+    def gameOver(self):
+        player1_empty = all(self.state.board[pit] == 0 for pit in self.state.player1_pits)
+        player2_empty = all(self.state.board[pit] == 0 for pit in self.state.player2_pits)
+        if player1_empty or player2_empty:
+            for pit in self.state.player1_pits:
+                self.state.board[1] += self.state.board[pit]
+                self.state.board[pit] = 0
+            for pit in self.state.player2_pits:
+                self.state.board[2] += self.state.board[pit]
+                self.state.board[pit] = 0
+            return True
+        return False
+
+    def findWinner(self):
+        if self.state.board[1] > self.state.board[2]:
+            return (1, self.state.board[1])
+        elif self.state.board[2] > self.state.board[1]:
+            return (2, self.state.board[2])
+        else:
+            return (0, "égalité")
+
+
+    def evaluate(self):
+        return self.state.board[1] - self.state.board[2]
+    
+    def evaluate2(self):
+        score = self.state.board[1] - self.state.board[2]
+        player1_seeds = sum(self.state.board[pit] for pit in self.state.player1_pits)
+        player2_seeds = sum(self.state.board[pit] for pit in self.state.player2_pits)
+        score += (player1_seeds - player2_seeds) * 0.1
+
+        return score
+
+
+def MinimaxAlphaBetaPruning(play, game, player, depth, alpha, beta, use_heuristic2=False, maximum=True):
+        if game.gameOver() or depth == 0:
+            
+            if use_heuristic2:
+                return game.evaluate2(), None
+            return game.evaluate(), None
+
+        
+        best_value = float('-inf') if maximum == True else float('inf')
+        
+            
+        best_pit = None
+        moves = game.state.possibleMoves(player)
+
+        for pit in moves:
+            new_game = copy.deepcopy(game)
+            new_game.state.doMove(player, pit)
+            player = player % 2 + 1
+            if play.mode == "Computer vs Computer":
+                value, _ = MinimaxAlphaBetaPruning(
+                    play, new_game, player , depth - 1, alpha, beta, use_heuristic2=(player == 2), maximum= True if player == play.maxplayer else False
+                )
+            else:
+                value, _ = MinimaxAlphaBetaPruning(
+                    play, new_game, player, depth - 1, alpha, beta, use_heuristic2=False, maximum= True if player == play.maxplayer else False
+                )
+            
+            if maximum == True:
+                if value > best_value:
+                    best_value = value
+                    best_pit = pit
+                alpha = max(alpha, best_value)
+                
+            else:
+                if value < best_value:
+                    best_value = value
+                    best_pit = pit
+                beta = min(beta, best_value)
+                
+
+            if alpha >= beta:
+                break
+            
+        return best_value, best_pit
@@ -0,0 +1,55 @@
+"""Positions per second of the batch engine against the scalar board.
+
+Run from the repository root::
+
+    python -m scripts.bench_batch [--boards 1000 10000 100000]
+
+Both paths generate every successor of every board for player 1 and score
+it with ``evaluate2``.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+import main2
+from mancala import MancalaBoard, batch
+from mancala.board import PLAYER_PITS
+from scripts.check_search import randomPosition
+
+
+def scalar(positions):
+    game = main2.Game()
+    values = []
+    for pits in positions:
+        game.state = state = MancalaBoard.fromPits(pits)
+        for index in PLAYER_PITS[1]:
+            if state.pits[index]:
+                record = state.sow(1, index)
+                values.append(game.evaluate2())
+                state.unsow(record)
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--boards', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    print(f"{'boards':>8}{'scalar pos/s':>15}{'batch pos/s':>15}{'speedup':>9}")
+    for count in args.boards:
+        positions = [randomPosition(rng) for _ in range(count)]
+        boards = np.array(positions, dtype=np.int32)
+        start = time.perf_counter()
+        generated = len(scalar(positions))
+        scalar_rate = generated / (time.perf_counter() - start)
+        start = time.perf_counter()
+        _, legal, _ = batch.expand(boards, 1, use_heuristic2=True)
+        batch_rate = int(legal.sum()) / (time.perf_counter() - start)
+        print(f"{count:>8}{scalar_rate:>15,.0f}{batch_rate:>15,.0f}{batch_rate / scalar_rate:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Moves per second of the dict board (before) against the array board (after).
+
+Run from the repository root::
+
+    python -m scripts.bench_board [--games N] [--seed S]
+
+Random games are recorded once, then replayed on each board; the final
+positions are compared so the numbers are only reported for identical play.
+Every recorded game ends with a side out of seeds, so both finals are compared
+after the end-of-game sweep, which the array board may already have made.
+"""
+import argparse
+import random
+import time
+
+from mancala import MancalaBoard
+from scripts import _legacy
+
+
+def recordGames(count, seed):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        board = _legacy.MancalaBoard()
+        player = 1
+        moves = []
+        while True:
+            legal = board.possibleMoves(player)
+            if not legal or not board.possibleMoves(player % 2 + 1):
+                break
+            pit = rng.choice(legal)
+            board.doMove(player, pit)
+            moves.append((player, pit))
+            player = player % 2 + 1
+        games.append(moves)
+    return games
+
+
+def settled(board):
+    """The final position with each side's pits swept into its store."""
+    pits = dict(board.board.items())
+    for store, names in ((1, 'ABCDEF'), (2, 'GHIJKL')):
+        for name in names:
+            pits[store] += pits[name]
+            pits[name] = 0
+    return pits
+
+
+def replay(boardClass, games):
+    finals = []
+    start = time.perf_counter()
+    for moves in games:
+        board = boardClass()
+        for player, pit in moves:
+            board.doMove(player, pit)
+        finals.append(board)
+    elapsed = time.perf_counter() - start
+    return elapsed, [settled(board) for board in finals]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    games = recordGames(args.games, args.seed)
+    total = sum(len(moves) for moves in games)
+    before, expected = replay(_legacy.MancalaBoard, games)
+    after, actual = replay(MancalaBoard, games)
+    if expected != actual:
+        raise SystemExit("array board diverged from the dict board")
+
+    print(f"{args.games} games, {total} moves")
+    print(f"dict board : {total / before:12,.0f} moves/s")
+    print(f"array board: {total / after:12,.0f} moves/s  ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
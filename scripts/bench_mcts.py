@@ -0,0 +1,68 @@
+"""Playout rate of the Monte Carlo engines, and their strength against
+alpha-beta at the same time per move.
+
+Run from the repository root::
+
+    python -m scripts.bench_mcts [--time-ms 500] [--workers 2 4] [--games 40 --budgets 20 50]
+
+The first table runs every engine for ``--time-ms`` on each position of
+``bench_search`` and reports playouts per second and the deepest tree path.
+With ``--games``, each Monte Carlo engine then plays that many tournament
+games against ``evaluate2`` at every budget in ``--budgets`` milliseconds a
+move, giving its Elo against alpha-beta per unit of time.
+"""
+import argparse
+
+from mancala.mcts import MCTS, MCTS_ENGINES, ParallelMCTS
+from mancala.tournament import eloDifference, parseEngine, runMatch
+from scripts.bench_search import POSITIONS, position
+
+CONFIGS = {
+    "random": {},
+    "greedy": {'playout': 'greedy'},
+    "batch 64": {'batch': 64},
+    "batch 256": {'batch': 256},
+}
+
+
+def rate(engine, time_ms):
+    playouts = seconds = depth = 0
+    for moves in POSITIONS.values():
+        engine.run(position(moves), 2, time_limit_ms=time_ms)
+        playouts += engine.stats.nodes
+        seconds += engine.stats.seconds
+        depth = max(depth, engine.stats.depth)
+    return playouts / seconds, depth
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--time-ms', type=int, default=500)
+    parser.add_argument('--workers', type=int, nargs='*', default=[2])
+    parser.add_argument('--games', type=int, default=0)
+    parser.add_argument('--budgets', type=int, nargs='+', default=[20, 50])
+    args = parser.parse_args(argv)
+
+    print(f"{'engine':<16}{'playouts/s':>12}{'depth':>7}")
+    for name, options in CONFIGS.items():
+        playouts, depth = rate(MCTS(seed=0, **options), args.time_ms)
+        print(f"{name:<16}{playouts:>12,.0f}{depth:>7}")
+    for workers in args.workers:
+        with ParallelMCTS(workers, seed=0) as engine:
+            engine.run(position([]), 1, iterations=workers)
+            playouts, depth = rate(engine, args.time_ms)
+        print(f"{f'random x{workers}':<16}{playouts:>12,.0f}{depth:>7}")
+
+    if args.games:
+        print(f"\n{'engine':<14}{'budget':>8}{'score':>14}{'Elo vs evaluate2':>26}")
+        for name in MCTS_ENGINES:
+            for budget in args.budgets:
+                wins, draws, losses, _ = runMatch(
+                    parseEngine(f"{name}:{budget}ms"), parseEngine(f"evaluate2:{budget}ms"), args.games)
+                elo, low, high = eloDifference(wins, draws, losses)
+                print(f"{name:<14}{budget:>6}ms{f'+{wins} ={draws} -{losses}':>14}"
+                      f"{elo:>+10.0f} [{low:+.0f}, {high:+.0f}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Node counts and time of the iterative-deepening search with and without
+move ordering.
+
+Run from the repository root::
+
+    python -m scripts.bench_ordering [--depths 4 6 8 10 12]
+
+"Plain" only tries the transposition-table move first; "ordered" adds
+store-ending moves, captures, killers and history.  Every run uses a fresh
+table and searches to the fixed depth without a time limit.
+"""
+import argparse
+import time
+
+from mancala.search import Search
+from scripts.bench_search import POSITIONS, position
+
+
+def measure(game, depth, ordering):
+    engine = Search(ordering=ordering)
+    start = time.perf_counter()
+    value, pit = engine.run(game, 2, max_depth=depth)
+    return engine.nodes, time.perf_counter() - start, value, pit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depths', type=int, nargs='+', default=[4, 6, 8, 10, 12])
+    args = parser.parse_args(argv)
+
+    print(f"{'position':<11}{'depth':>6}{'plain':>11}{'ordered':>11}{'ratio':>7}"
+          f"{'plain s':>9}{'ordered s':>11}")
+    for name, moves in POSITIONS.items():
+        game = position(moves)
+        for depth in args.depths:
+            nodes, elapsed, value, _ = measure(game, depth, False)
+            ordered_nodes, ordered_elapsed, ordered_value, _ = measure(game, depth, True)
+            if value != ordered_value:
+                raise SystemExit(f"{name} depth {depth}: ordering changed the value")
+            print(f"{name:<11}{depth:>6}{nodes:>11,}{ordered_nodes:>11,}"
+                  f"{ordered_nodes / nodes:>7.2f}{elapsed:>9.2f}{ordered_elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
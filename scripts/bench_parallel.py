@@ -0,0 +1,51 @@
+"""Speedup and efficiency of the root-parallel search at a fixed depth.
+
+Run from the repository root::
+
+    python -m scripts.bench_parallel [--workers 1 2 4 8] [--depth 12]
+
+Each pool is started and warmed up before timing, so process start-up is
+not counted.  Speedup is relative to one worker; the in-process ``Search``
+is shown as the sequential reference.
+"""
+import argparse
+import os
+import time
+
+from mancala.parallel import ParallelSearch
+from mancala.search import Search
+from scripts.bench_search import POSITIONS, position
+
+
+def timeRuns(engine, depth):
+    nodes = 0
+    start = time.perf_counter()
+    for moves in POSITIONS.values():
+        engine.run(position(moves), 2, max_depth=depth)
+        nodes += engine.nodes
+    return time.perf_counter() - start, nodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--depth', type=int, default=12)
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} CPUs, depth {args.depth}, {len(POSITIONS)} positions")
+    elapsed, nodes = timeRuns(Search(), args.depth)
+    print(f"{'sequential':>10}{elapsed:>9.2f}s{nodes:>11,} nodes")
+    baseline = None
+    for workers in args.workers:
+        with ParallelSearch(workers) as engine:
+            for moves in POSITIONS.values():
+                engine.run(position(moves), 2, max_depth=2)
+            elapsed, nodes = timeRuns(engine, args.depth)
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(f"{workers:>7} wk{elapsed:>9.2f}s{nodes:>11,} nodes"
+              f"  speedup {speedup:4.2f}  efficiency {speedup / workers:4.2f}")
+
+
+if __name__ == "__main__":
+    main()
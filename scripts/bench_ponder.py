@@ -0,0 +1,95 @@
+"""Response time of the computer with and without pondering.
+
+Run from the repository root::
+
+    python -m scripts.bench_ponder [--games 2] [--time-ms 500] [--human-ms 1000]
+
+The computer (``evaluate2``, player 2) plays a simulated human: a
+``--human-depth`` search that then takes ``--human-ms`` to "decide", during
+which a ``Ponder`` runs from the computer's last engine, as in
+``main2.py --ponder``.  At every computer move the same position is also
+searched the old way, from a ``Search`` sharing one table across the game,
+and the table compares the two: response time from the human's move to the
+computer's, depth reached and how often the reply played was one of those
+deepened.  ``main2.py`` also waits a fixed second before that search
+without pondering, which is not counted.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from mancala.game import Game
+from mancala.search import Search
+from mancala.tournament import randomOpening
+from mancala.tt import TranspositionTable
+from mancala.worker import Ponder
+
+COMPUTER, HUMAN = 2, 1
+
+
+def playGame(args, rng, rows):
+    game = Game()
+    for ply, pit in enumerate(randomOpening(rng, 2)):
+        game.state.doMove(1 if ply % 2 == 0 else 2, pit)
+    human = Search(evaluator='evaluate2')
+    plain = Search(tt=TranspositionTable(), evaluator='evaluate2')
+    ponder = None
+    while not game.is_terminal():
+        # The human: a quick search, then time to think, spent pondering.
+        _, pit = human.run(game, HUMAN, max_depth=args.human_depth)
+        if ponder is None:
+            ponder = Ponder(game, HUMAN, 'evaluate2')
+        time.sleep(args.human_ms / 1000)
+        engine, depth, seconds = ponder.take(pit)
+        game.state.doMove(HUMAN, pit)
+        if game.is_terminal():
+            break
+
+        start = time.perf_counter()
+        plain.run(game, COMPUTER, args.time_ms)
+        plain_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        if engine is None:
+            engine = Search(evaluator='evaluate2')
+            _, reply = engine.run(game, COMPUTER, args.time_ms)
+        else:
+            _, reply = engine.run(game, COMPUTER, max(0, args.time_ms - int(seconds * 1000)), min_depth=depth)
+        ponder_ms = (time.perf_counter() - start) * 1000
+        rows.append((plain_ms, plain.depth, ponder_ms, engine.depth, depth))
+        game.state.doMove(COMPUTER, reply)
+        ponder = None if game.is_terminal() else Ponder(game, HUMAN, 'evaluate2', base=engine)
+    if ponder is not None:
+        ponder.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=2)
+    parser.add_argument('--time-ms', type=int, default=500)
+    parser.add_argument('--human-ms', type=int, default=1000)
+    parser.add_argument('--human-depth', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    rows = []
+    for _ in range(args.games):
+        playGame(args, rng, rows)
+    plain_ms, plain_depth, ponder_ms, ponder_depth, pondered = zip(*rows)
+    print(f"{len(rows)} computer moves, {args.time_ms} ms a move, human thinking {args.human_ms} ms")
+    print(f"{'':<10}{'median ms':>10}{'mean ms':>10}{'mean depth':>12}")
+    print(f"{'plain':<10}{statistics.median(plain_ms):>10.0f}{statistics.mean(plain_ms):>10.0f}"
+          f"{statistics.mean(plain_depth):>12.1f}")
+    print(f"{'ponder':<10}{statistics.median(ponder_ms):>10.0f}{statistics.mean(ponder_ms):>10.0f}"
+          f"{statistics.mean(ponder_depth):>12.1f}")
+    hits = sum(depth > 1 for depth in pondered)
+    print(f"reply among those pondered past depth 1: {hits}/{len(rows)}, "
+          f"mean depth reached on it while pondering {statistics.mean(pondered):.1f}")
+    print(f"response time "
+          f"{1 - statistics.mean(ponder_ms) / statistics.mean(plain_ms):.0%} lower")
+
+
+if __name__ == "__main__":
+    main()
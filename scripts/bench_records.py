@@ -0,0 +1,92 @@
+"""Size and speed of game records against tournament JSON lines.
+
+Run from the repository root::
+
+    python -m scripts.bench_records [--games 20000] [--notes 0.5] [--workers 1 2]
+
+Plays ``--games`` random games (a ``--notes`` share of their moves carrying
+a made-up search note, as the computer's moves do, which also makes up
+blunders), writes them move by move with ``RecordWriter`` and whole as
+tournament JSON lines, then streams the record file through
+``mancala.record.analyze`` with every ``--workers``.
+Reports bytes per game, games written per second, games analyzed per second
+and the peak memory of the process before and after analyzing: the
+analysis adds only its results, however many games the file holds.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+
+from mancala.board import MancalaBoard
+from mancala.record import GameRecord, RecordWriter, analyze
+
+
+def randomGame(rng):
+    state = MancalaBoard()
+    side, moves = 1, []
+    while not state.is_terminal():
+        pit = rng.choice(state.possibleMoves(side))
+        state.doMove(side, pit)
+        moves.append(pit)
+        side = 3 - side
+    return moves, state.final_scores()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=20000)
+    parser.add_argument('--notes', type=float, default=0.0, help="share of moves with a search note")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    games = [randomGame(rng) for _ in range(args.games)]
+    directory = tempfile.mkdtemp()
+    record_path = os.path.join(directory, 'games.rec')
+    json_path = os.path.join(directory, 'games.jsonl')
+
+    start = time.perf_counter()
+    with RecordWriter(record_path) as writer:
+        for moves, scores in games:
+            writer.begin()
+            for ply, pit in enumerate(moves):
+                if rng.random() < args.notes:
+                    writer.move(pit, round(rng.gauss(0, 5), 2), 9, rng.randrange(100000), 300)
+                else:
+                    writer.move(pit)
+            writer.end(scores)
+    write_seconds = time.perf_counter() - start
+    with open(json_path, 'w') as f:
+        for game_id, (moves, scores) in enumerate(games):
+            f.write(json.dumps({'g': game_id, 'a': 1, 's': list(scores), 'n': len(moves), 'o': '',
+                                'm': ''.join(moves)}, separators=(',', ':')) + '\n')
+
+    plies = sum(len(moves) for moves, _ in games)
+    bare_bytes = sum(len(GameRecord(moves=''.join(moves), scores=scores).line()) + 1 for moves, scores in games)
+    record_bytes, json_bytes = os.path.getsize(record_path), os.path.getsize(json_path)
+    print(f"{args.games:,} games, {plies / args.games:.1f} plies a game, {args.notes:.0%} of moves with notes")
+    print(f"bytes/game: record {record_bytes / args.games:.1f}, record without notes "
+          f"{bare_bytes / args.games:.1f}, JSON without notes {json_bytes / args.games:.1f}")
+    print(f"written move by move at {args.games / write_seconds:,.0f} games/s")
+    del games
+    print(f"peak memory before analyzing {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    for workers in args.workers:
+        start = time.perf_counter()
+        with open(record_path) as f:
+            analysis = analyze(f, workers)
+        seconds = time.perf_counter() - start
+        print(f"analyze, {workers} workers: {analysis.counts['games'] / seconds:,.0f} games/s, "
+              f"{len(analysis.positions):,} positions, {len(analysis.blunders):,} blunders")
+    print(f"peak memory after {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    for path in (record_path, json_path):
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
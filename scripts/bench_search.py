@@ -0,0 +1,57 @@
+"""Depth reached and latency of the anytime search under a time budget.
+
+Run from the repository root::
+
+    python -m scripts.bench_search [--budgets 100 250 500 1000]
+
+The fixed depth-3 ``MinimaxAlphaBetaPruning`` the GUI used before is timed
+on the same positions for comparison.
+"""
+import argparse
+import time
+import types
+
+import main2
+from mancala.game import MinimaxAlphaBetaPruning
+from mancala.search import Search
+
+POSITIONS = {
+    "start": [],
+    "middlegame": [('C', 1), ('J', 2), ('F', 1), ('H', 2), ('A', 1), ('K', 2)],
+    "late": [('C', 1), ('J', 2), ('F', 1), ('H', 2), ('A', 1), ('K', 2), ('D', 1),
+             ('G', 2), ('B', 1), ('L', 2), ('E', 1), ('I', 2), ('C', 1), ('J', 2)],
+}
+
+
+def position(moves):
+    game = main2.Game()
+    for pit, player in moves:
+        game.state.doMove(player, pit)
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budgets', type=int, nargs='+', default=[100, 250, 500, 1000])
+    args = parser.parse_args(argv)
+
+    play = types.SimpleNamespace(mode="Human vs Computer", maxplayer=2)
+    print(f"{'position':<11}{'budget':>8}{'depth':>7}{'nodes':>10}{'elapsed':>10}  move")
+    for name, moves in POSITIONS.items():
+        game = position(moves)
+        start = time.perf_counter()
+        _, pit = MinimaxAlphaBetaPruning(
+            play, game, 2, 3, float('-inf'), float('inf'), maximum=True)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{name:<11}{'depth 3':>8}{3:>7}{'':>10}{elapsed:>8.1f}ms  {pit}")
+        for budget in args.budgets:
+            engine = Search()
+            start = time.perf_counter()
+            _, pit = engine.run(game, 2, time_limit_ms=budget)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{name:<11}{budget:>6}ms{engine.depth:>7}{engine.nodes:>10,}"
+                  f"{elapsed:>8.1f}ms  {pit}")
+
+
+if __name__ == "__main__":
+    main()
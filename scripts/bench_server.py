@@ -0,0 +1,143 @@
+"""Load generator for ``mancala.server``: move latency and sessions per core.
+
+Run from the repository root::
+
+    python -m scripts.bench_server [--sessions 200] [--connections 4] [--workers 1] [--depth 4]
+    python -m scripts.bench_server --port 8765 ...     # against a running server
+
+Without ``--port`` a server is started in this process on a free port.
+Every session plays random legal moves against the computer until its game
+ends, ``--pause-s`` apart, and the time from sending a move to its answer,
+including any ``busy`` retries (with random exponential back-off), is the
+latency.
+
+Sessions per core is the moves per second each worker sustained, times the
+seconds a human takes per move (``--human-s``): how many people playing at
+that pace one core keeps up with.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from mancala.server import GameServer
+
+
+class Client:
+    """One connection; requests carry ids so answers can arrive in any order."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}
+        self.ids = 0
+        self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            self.waiting.pop(response['id']).set_result(response)
+
+    async def request(self, **request):
+        self.ids += 1
+        request['id'] = self.ids
+        future = self.waiting[self.ids] = asyncio.get_running_loop().create_future()
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        # Half-close and let the server finish and hang up first.
+        self.writer.write_eof()
+        await self.listener
+        self.writer.close()
+
+
+async def retry(client, rng, counts, **request):
+    """Send ``request`` until it is not refused as busy, backing off."""
+    delay = 0.005
+    while True:
+        response = await client.request(**request)
+        if response.get('error') != "busy":
+            if 'error' in response:
+                raise RuntimeError(response['error'])
+            return response
+        counts['busy'] += 1
+        await asyncio.sleep(delay * rng.random())
+        delay = min(delay * 2, 0.5)
+
+
+async def playSession(client, args, rng, latencies, counts):
+    response = await retry(client, rng, counts, op='new', human=rng.choice((1, 2)), depth=args.depth,
+                           time_ms=args.time_ms)
+    session = response['session']
+    while not response.get('over'):
+        await asyncio.sleep(args.pause_s)
+        pit = rng.choice(response['moves'])
+        start = time.perf_counter()
+        response = await retry(client, rng, counts, op='move', session=session, pit=pit)
+        latencies.append(time.perf_counter() - start)
+    await client.request(op='close', session=session)
+    counts['games'] += 1
+
+
+async def run(args):
+    server = None
+    host, port = args.host, args.port
+    if port is None:
+        server = GameServer(args.workers, max_pending=args.max_pending)
+        await server.start()
+        tcp = await asyncio.start_server(server.serveConnection, host, 0)
+        port = tcp.sockets[0].getsockname()[1]
+    try:
+        clients = [Client(*await asyncio.open_connection(host, port)) for _ in range(args.connections)]
+        workers = (await clients[0].request(op='stats'))['workers']
+        rng = random.Random(args.seed)
+        latencies, counts = [], {'busy': 0, 'games': 0}
+        start = time.perf_counter()
+        await asyncio.gather(*(playSession(clients[i % len(clients)], args, random.Random(rng.random()),
+                                           latencies, counts) for i in range(args.sessions)))
+        elapsed = time.perf_counter() - start
+        for client in clients:
+            await client.close()
+    finally:
+        if server is not None:
+            tcp.close()
+            server.close()
+    return workers, elapsed, latencies, counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="a running server (default: start one here)")
+    parser.add_argument('--workers', type=int, default=1, help="search processes of the in-process server")
+    parser.add_argument('--max-pending', type=int, help="of the in-process server")
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--connections', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--time-ms', type=int, default=100)
+    parser.add_argument('--pause-s', type=float, default=0.0, help="wait before each human move")
+    parser.add_argument('--human-s', type=float, default=5.0, help="a human's time per move, for sessions per core")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    workers, elapsed, latencies, counts = asyncio.run(run(args))
+    latencies.sort()
+    rate = len(latencies) / elapsed
+    print(f"{counts['games']} games, {len(latencies)} moves in {elapsed:.2f}s over {args.connections} connections, "
+          f"{workers} workers, depth {args.depth}")
+    print(f"latency  p50 {statistics.median(latencies) * 1000:7.1f} ms"
+          f"  p99 {latencies[int(0.99 * (len(latencies) - 1))] * 1000:7.1f} ms"
+          f"  max {latencies[-1] * 1000:7.1f} ms")
+    print(f"{rate:.0f} moves/s, {rate / workers:.0f} per worker; busy retries {counts['busy']}")
+    print(f"sessions per core at {args.human_s:g}s a human move: {rate / workers * args.human_s:.0f}")
+
+
+if __name__ == "__main__":
+    main()
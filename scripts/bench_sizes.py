@@ -0,0 +1,50 @@
+"""How search cost grows with the board: pits a side and seeds a pit.
+
+Run from the repository root::
+
+    python -m scripts.bench_sizes [--pits 4 5 6 7 8] [--seeds 3 4 5 6] [--depth 8]
+
+For each board the start position is searched to a fixed depth with a fresh
+``Search``; the table shows nodes, time, nodes per second and the effective
+branching factor, plus raw ``sow``/``unsow`` throughput.
+"""
+import argparse
+import time
+
+from mancala import Game
+from mancala.search import Search
+
+
+def movesPerSecond(game, loops=2000):
+    state = game.state
+    moves = [i for i in state.layout.player_pits[1] if state.pits[i]]
+    start = time.perf_counter()
+    for _ in range(loops):
+        for index in moves:
+            state.unsow(state.sow(1, index))
+    return loops * len(moves) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pits', type=int, nargs='+', default=[4, 5, 6, 7, 8])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[3, 4, 5, 6])
+    parser.add_argument('--depth', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    print(f"depth {args.depth} from the start position")
+    print(f"{'board':>6}{'nodes':>11}{'seconds':>9}{'nodes/s':>10}{'branching':>11}{'moves/s':>11}")
+    for pits in args.pits:
+        for seeds in args.seeds:
+            game = Game(pits, seeds)
+            engine = Search()
+            engine.run(game, 1, max_depth=args.depth)
+            stats = engine.stats
+            branching = stats.branching
+            print(f"{pits:>3}x{seeds:<2}{stats.nodes:>11,}{stats.seconds:>9.3f}{stats.nps:>10,.0f}"
+                  f"{branching if branching is not None else float('nan'):>11.2f}"
+                  f"{movesPerSecond(game):>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start cost of the engine against the GUI modules.
+
+Run from the repository root::
+
+    python -m scripts.bench_startup [--runs 15]
+
+Each target is imported in a fresh interpreter ``--runs`` times; the table
+shows the median wall time above a bare ``python -c pass`` and which heavy
+modules came along.  ``gui stack`` is everything ``main2.py`` used to import
+at the top, for comparison.  The last line times a spawned worker process
+from pool creation to its first search result, the path every
+``ParallelSearch``, tournament and book worker takes.
+
+Byte-code must be up to date (``python -m compileall -q .``), or every run
+pays for compiling the sources.
+"""
+import argparse
+import multiprocessing
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+TARGETS = {
+    "mancala": "import mancala",
+    "mancala.search": "import mancala.search",
+    "main2": "import main2",
+    "main": "import main",
+    "gui stack": ("import main2; main2.importTk(); "
+                  "import mancala.book, mancala.parallel, mancala.tablebase, mancala.worker"),
+}
+
+HEAVY = ("tkinter", "logging", "concurrent.futures", "multiprocessing", "numpy")
+
+
+def interpreterSeconds(code, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def loadedModules(code):
+    probe = f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True).stdout.split()
+
+
+def firstSearch():
+    import mancala
+
+    game = mancala.newGame()
+    return mancala.searchMove(game, 1, max_depth=2)
+
+
+def workerSeconds(runs):
+    times = []
+    context = multiprocessing.get_context("spawn")
+    for _ in range(runs):
+        start = time.perf_counter()
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            pool.submit(firstSearch).result()
+            times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    bare = interpreterSeconds("pass", args.runs)
+    print(f"python -c pass: {bare * 1000:.1f} ms")
+    print(f"{'target':<16}{'ms':>8}  heavy modules loaded")
+    for name, code in TARGETS.items():
+        seconds = interpreterSeconds(code, args.runs) - bare
+        print(f"{name:<16}{seconds * 1000:>8.1f}  {' '.join(loadedModules(code)) or '-'}")
+    print(f"{'spawned worker':<16}{workerSeconds(max(1, args.runs // 3)) * 1000:>8.1f}  "
+          f"pool start to first depth-2 search")
+
+
+if __name__ == "__main__":
+    main()
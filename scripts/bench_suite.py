@@ -0,0 +1,184 @@
+"""Engine benchmark suite over a fixed corpus, with a regression gate.
+
+Run from the repository root::
+
+    python -m scripts.bench_suite run --out baseline.json
+    python -m scripts.bench_suite compare baseline.json [current.json] [--threshold 0.25]
+
+``run`` times ``doMove`` (with ``undoMove``) and ``possibleMoves`` on every
+corpus position, then a fixed-depth search at each depth with ``evaluate``
+and ``evaluate2``, and writes JSON.  Every timing is the best of
+``--repeat`` samples, each long enough to swamp timer resolution.
+``compare`` runs the suite itself when no current file is given and lists
+every benchmark that got slower than the baseline by more than the
+threshold.  Single timings are noisy, so the gate is on groups: it exits
+with status 1 when the geometric mean slowdown of any kind of benchmark on
+any position category (``search/evaluate2`` on ``capture`` positions, say)
+exceeds the threshold.  Node counts are compared too: a changed count means
+the search tree changed, so the timing difference is algorithmic rather
+than interpreter overhead.
+"""
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import timeit
+
+from mancala import Game, MancalaBoard
+from mancala.search import Search
+
+# name -> (category, pits, side to move)
+CORPUS = {
+    "start": ("opening", [4, 4, 4, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 0], 1),
+    "after-F": ("opening", [4, 4, 4, 4, 4, 0, 1, 5, 5, 5, 4, 4, 4, 0], 2),
+    "middle-1": ("middlegame", [0, 6, 2, 6, 6, 0, 8, 0, 0, 2, 7, 1, 7, 3], 1),
+    "middle-2": ("middlegame", [3, 4, 0, 3, 1, 6, 7, 3, 8, 0, 3, 2, 3, 5], 2),
+    "capture-1": ("capture", [4, 5, 1, 3, 0, 0, 13, 0, 9, 1, 4, 1, 0, 7], 2),
+    "capture-2": ("capture", [1, 6, 2, 1, 1, 0, 15, 0, 0, 2, 5, 1, 1, 13], 2),
+    "endgame-1": ("near-terminal", [0, 0, 3, 0, 0, 3, 17, 2, 0, 0, 6, 0, 0, 17], 2),
+    "endgame-2": ("near-terminal", [0, 0, 0, 1, 0, 5, 20, 0, 2, 0, 0, 0, 0, 20], 2),
+}
+
+
+def game(pits):
+    result = Game()
+    result.state = MancalaBoard.fromPits(pits)
+    return result
+
+
+def best(repeat, function, minimum=0.05):
+    """Seconds per call of ``function``: the best of ``repeat`` samples, each
+    looping it until at least ``minimum`` seconds have passed."""
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < minimum:
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
+
+
+def benchMoves(state, side, loops):
+    moves = state.possibleMoves(side)
+
+    def run():
+        for _ in range(loops):
+            for pit in moves:
+                state.undoMove(state.doMove(side, pit))
+
+    return run, loops * len(moves)
+
+
+def benchPossibleMoves(state, side, loops):
+    def run():
+        for _ in range(loops):
+            state.possibleMoves(side)
+
+    return run, loops
+
+
+def runSuite(depths, repeat=3, loops=100):
+    results = {}
+    for name, (category, pits, side) in CORPUS.items():
+        state = MancalaBoard.fromPits(pits)
+        for kind, bench in (("doMove", benchMoves), ("possibleMoves", benchPossibleMoves)):
+            run, calls = bench(state, side, loops)
+            seconds = best(repeat, run)
+            results[f"{kind}/{name}"] = {"category": category, "seconds": seconds / calls,
+                                        "per_second": calls / seconds}
+        for heuristic in ("evaluate", "evaluate2"):
+            for depth in depths:
+                engines = []
+
+                def run():
+                    engine = Search(heuristic == "evaluate2")
+                    engine.run(game(pits), side, max_depth=depth)
+                    engines.append(engine)
+
+                seconds = best(repeat, run)
+                results[f"search/{heuristic}/{name}/d{depth}"] = {
+                    "category": category, "seconds": seconds, "nodes": engines[-1].nodes,
+                    "depth": engines[-1].depth}
+    return {
+        "meta": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                 "machine": platform.machine(), "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "depths": depths, "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(baseline, current):
+    """``{name: (before, after)}`` for timings and for node counts of every
+    benchmark in both runs."""
+    times, nodes = {}, {}
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            continue
+        times[name] = before["seconds"], after["seconds"]
+        if "nodes" in before:
+            nodes[name] = before["nodes"], after.get("nodes")
+    return times, nodes
+
+
+def categoryRatios(baseline, times):
+    """Geometric mean of after/before per group (``search/evaluate/middlegame``...)."""
+    logs = {}
+    for name, (before, after) in times.items():
+        kind = name.rsplit("/", 2)[0] if name.startswith("search/") else name.split("/")[0]
+        group = f"{kind}/{baseline['results'][name]['category']}"
+        logs.setdefault(group, []).append(math.log(after / before))
+    return {group: math.exp(sum(values) / len(values)) for group, values in logs.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--out", help="JSON file; printed to stdout if omitted")
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current", nargs="?", help="JSON from run; runs the suite if omitted")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    run_parser.add_argument("--depths", type=int, nargs="+", default=[4, 6, 8])
+    for command in (run_parser, compare_parser):
+        command.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = json.dumps(runSuite(args.depths, args.repeat), indent=1)
+        if args.out:
+            with open(args.out, "w") as f:
+                f.write(report + "\n")
+        else:
+            print(report)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = runSuite(baseline["meta"]["depths"], args.repeat)
+    times, nodes = compare(baseline, current)
+    for name, (before, after) in nodes.items():
+        if before != after:
+            # An engine without stats (ParallelSearch) records no count.
+            before, after = ('-' if n is None else f"{n:,}" for n in (before, after))
+            print(f"tree changed  {name}: {before} -> {after} nodes")
+    for name, (before, after) in times.items():
+        if after > before * (1 + args.threshold):
+            print(f"slower        {name}: {before:.3g}s -> {after:.3g}s ({after / before - 1:+.0%})")
+    failed = 0
+    print(f"{'group':<38}{'after/before':>13}")
+    for group, ratio in sorted(categoryRatios(baseline, times).items()):
+        flag = ratio > 1 + args.threshold
+        failed += flag
+        print(f"{group:<38}{ratio:>13.3f}{'  REGRESSION' if flag else ''}")
+    print(f"{failed} groups slower than the {args.threshold:.0%} threshold")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
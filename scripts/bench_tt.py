@@ -0,0 +1,71 @@
+"""Nodes searched by mancala.game's MinimaxAlphaBetaPruning with and
+without a transposition table.
+
+Run from the repository root::
+
+    python -m scripts.bench_tt [--depths 6 8 10 12] [--megabytes 64]
+
+Each depth is searched from the start position and from a middlegame with
+a fresh table, the way ``Play.computerTurn`` calls it for player 2.
+"""
+import argparse
+import time
+import types
+
+import main2
+from mancala import MancalaBoard
+from mancala.game import MinimaxAlphaBetaPruning
+from mancala.tt import TranspositionTable
+
+MIDDLEGAME = [('C', 1), ('J', 2), ('F', 1), ('H', 2), ('A', 1), ('K', 2)]
+
+
+class CountingBoard(MancalaBoard):
+    __slots__ = ('nodes',)
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = 0
+
+    def doMove(self, player, pit):
+        self.nodes += 1
+        return super().doMove(player, pit)
+
+
+def position(moves):
+    game = main2.Game()
+    game.state = CountingBoard()
+    for pit, player in moves:
+        game.state.doMove(player, pit)
+    game.state.nodes = 0
+    return game
+
+
+def measure(moves, depth, tt):
+    game = position(moves)
+    play = types.SimpleNamespace(mode="Human vs Computer", maxplayer=2)
+    start = time.perf_counter()
+    value, pit = MinimaxAlphaBetaPruning(
+        play, game, 2, depth, float('-inf'), float('inf'), maximum=True, tt=tt)
+    return game.state.nodes, time.perf_counter() - start, value, pit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depths', type=int, nargs='+', default=[6, 8, 10, 12])
+    parser.add_argument('--megabytes', type=float, default=64)
+    args = parser.parse_args(argv)
+
+    print(f"{'position':<11}{'depth':>5}{'nodes':>12}{'tt nodes':>12}{'ratio':>7}"
+          f"{'time':>9}{'tt time':>9}{'hits':>10}{'repl':>9}")
+    for name, moves in (("start", []), ("middlegame", MIDDLEGAME)):
+        for depth in args.depths:
+            nodes, elapsed, _, _ = measure(moves, depth, None)
+            tt = TranspositionTable(args.megabytes)
+            tt_nodes, tt_elapsed, _, _ = measure(moves, depth, tt)
+            print(f"{name:<11}{depth:>5}{nodes:>12,}{tt_nodes:>12,}{tt_nodes / nodes:>7.2f}"
+                  f"{elapsed:>8.2f}s{tt_elapsed:>8.2f}s{tt.hits:>10,}{tt.replacements:>9,}")
+
+
+if __name__ == "__main__":
+    main()
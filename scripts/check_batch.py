@@ -0,0 +1,73 @@
+"""Randomized equivalence check of mancala.batch against MancalaBoard.
+
+Run from the repository root::
+
+    python -m scripts.check_batch [--boards N] [--seed S]
+
+Random boards (random play and arbitrary seed distributions, including
+pits big enough to lap the board) are expanded by ``batch.expand`` and by
+``MancalaBoard.sow`` one move at a time.  Successors, legality, both
+evaluations and the end-of-game sweep must agree exactly.
+"""
+import argparse
+import random
+
+import numpy as np
+
+import main2
+from mancala import MancalaBoard, batch
+from mancala.board import PLAYER_PITS
+from scripts.check_search import randomPosition
+
+
+def lappingPosition(rng):
+    pits = [0] * 14
+    pits[rng.choice(PLAYER_PITS[rng.choice((1, 2))])] = rng.randint(13, 40)
+    for _ in range(48 - sum(pits)):
+        pits[rng.randrange(14)] += 1
+    return pits
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--boards', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    positions = [randomPosition(rng) if n % 10 else lappingPosition(rng) for n in range(args.boards)]
+    boards = np.array(positions, dtype=np.int32)
+    mismatches = 0
+    for side in (1, 2):
+        for use_heuristic2 in (False, True):
+            successors, legal, values = batch.expand(boards, side, use_heuristic2)
+            for n, pits in enumerate(positions):
+                for k, index in enumerate(PLAYER_PITS[side]):
+                    if legal[n, k] != (pits[index] > 0):
+                        mismatches += 1
+                        continue
+                    if not pits[index]:
+                        continue
+                    game = main2.Game()
+                    game.state = MancalaBoard.fromPits(pits)
+                    game.state.sow(side, index)
+                    expected = game.evaluate2() if use_heuristic2 else game.evaluate()
+                    if game.state.pits != successors[n, k].tolist() or expected != values[n, k]:
+                        mismatches += 1
+                        if mismatches <= 10:
+                            print("MISMATCH", pits, side, index, game.state.pits,
+                                  successors[n, k].tolist(), expected, values[n, k])
+    swept = batch.sweep(boards)
+    for n, pits in enumerate(positions):
+        game = main2.Game()
+        game.state = MancalaBoard.fromPits(pits)
+        game.gameOver()
+        if game.state.pits != swept[n].tolist():
+            mismatches += 1
+    print(f"{args.boards} boards: {mismatches} mismatches")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run()
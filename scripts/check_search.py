@@ -0,0 +1,191 @@
+"""Differential check: in-place search against the original deepcopy search.
+
+Run from the repository root::
+
+    python -m scripts.check_search [--positions N] [--depth D] [--seed S]
+
+Every random position is searched by the make/unmake
+``MinimaxAlphaBetaPruning`` of main.py and mancala.game and by the deepcopy
+versions they replaced.  The value and best pit must agree, and the position
+must be left exactly as it was found, even when it is already over.  The
+mancala.game search is also run with one transposition table shared by every
+mode and maximizing player of the position, whose keys must keep their
+values apart.
+"""
+import argparse
+import contextlib
+import copy
+import io
+import random
+import types
+
+import main
+import main2
+from mancala.game import MinimaxAlphaBetaPruning
+from mancala.tt import TranspositionTable
+from scripts import _legacy
+
+MODES = ("Human vs Computer", "Computer vs Computer")
+
+
+def deepcopySearch(game, player, depth, alpha, beta):
+    # main.py's search as it was before doMove returned undo records.
+    if game.gameOver() or depth == 0:
+        return game.evaluate(), None
+
+    best_value = float('-inf') if player == 1 else float('inf')
+    best_pit = None
+    for pit in game.state.possibleMoves(player):
+        new_game = copy.deepcopy(game)
+        new_game.state.doMove(player, pit)
+        value, _ = deepcopySearch(new_game, -player, depth - 1, alpha, beta)
+        if player == 1:
+            if value > best_value:
+                best_value, best_pit = value, pit
+            alpha = max(alpha, best_value)
+        else:
+            if value < best_value:
+                best_value, best_pit = value, pit
+            beta = min(beta, best_value)
+        if alpha >= beta:
+            break
+    return best_value, best_pit
+
+
+def deepcopySearch2(play, game, player, depth, alpha, beta, use_heuristic2=False, maximum=True):
+    # The original main2.py search on the dict board, with the child's side
+    # to move computed per sibling instead of flipped inside the loop.
+    if game.gameOver() or depth == 0:
+        return (game.evaluate2() if use_heuristic2 else game.evaluate()), None
+
+    best_value = float('-inf') if maximum else float('inf')
+    best_pit = None
+    for pit in game.state.possibleMoves(player):
+        new_game = copy.deepcopy(game)
+        new_game.state.doMove(player, pit)
+        opponent = player % 2 + 1
+        value, _ = deepcopySearch2(
+            play, new_game, opponent, depth - 1, alpha, beta,
+            use_heuristic2=(opponent == 2) if play.mode == "Computer vs Computer" else False,
+            maximum=opponent == play.maxplayer)
+        if maximum:
+            if value > best_value:
+                best_value, best_pit = value, pit
+            alpha = max(alpha, best_value)
+        else:
+            if value < best_value:
+                best_value, best_pit = value, pit
+            beta = min(beta, best_value)
+        if alpha >= beta:
+            break
+    return best_value, best_pit
+
+
+def randomPosition(rng):
+    # Half of the positions come from random play, half are arbitrary
+    # distributions, which reach the large-pit and empty-side corner cases.
+    if rng.random() < 0.5:
+        game = main2.Game()
+        player = 1
+        for _ in range(rng.randrange(40)):
+            moves = game.state.possibleMoves(player)
+            if not moves or game.gameOver():
+                break
+            game.state.doMove(player, rng.choice(moves))
+            player = player % 2 + 1
+        pits = list(game.state.pits)
+    else:
+        pits = [0] * 14
+        for _ in range(48):
+            pits[rng.randrange(14)] += 1
+    return pits
+
+
+def load(game, pits):
+    for name, seeds in zip(game.state.board.keys(), pits):
+        game.state.board[name] = seeds
+    return game
+
+
+def legacyGame(pits):
+    game = _legacy.Game()
+    for name, seeds in zip(main2.Game().state.board.keys(), pits):
+        game.state.board[name] = seeds
+    return game
+
+
+def check(pits, depth, rng):
+    inf = float('inf')
+    failures = []
+
+    mode = rng.choice(MODES)
+    player = rng.choice([1, 2])
+    play = types.SimpleNamespace(mode=mode, maxplayer=rng.choice([1, 2]))
+    heuristic2 = mode == "Computer vs Computer" and player == 2
+    maximum = player == play.maxplayer
+    game = load(main2.Game(), pits)
+    expected = deepcopySearch2(
+        play, legacyGame(pits), player, depth, -inf, inf, heuristic2, maximum)
+    reference = load(main2.Game(), pits)
+    actual = MinimaxAlphaBetaPruning(
+        play, game, player, depth, -inf, inf, heuristic2, maximum)
+    if actual != expected:
+        failures.append(("main2", pits, expected, actual))
+    if game.state.pits != reference.state.pits:
+        failures.append(("main2 state", pits, reference.state.pits, game.state.pits))
+
+    player = rng.choice([1, -1])
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = load(main.Game(), pits)
+        expected = deepcopySearch(load(main.Game(), pits), player, depth, -inf, inf)
+        actual = main.MinimaxAlphaBetaPruning(game, player, depth, -inf, inf)
+        reference = load(main.Game(), pits)
+    if actual != expected:
+        failures.append(("main", pits, expected, actual))
+    if game.state.pits != reference.state.pits:
+        failures.append(("main state", pits, reference.state.pits, game.state.pits))
+    return failures
+
+
+def checkSharedTable(pits, depth, player):
+    # A table is only shared within a position: across positions an entry
+    # searched deeper stands in for a shallower one, as it should.
+    inf = float('inf')
+    failures = []
+    tt = TranspositionTable()
+    for mode in MODES:
+        for maxplayer in (1, 2):
+            play = types.SimpleNamespace(mode=mode, maxplayer=maxplayer)
+            heuristic2 = mode == "Computer vs Computer" and player == 2
+            maximum = player == maxplayer
+            expected, _ = MinimaxAlphaBetaPruning(
+                play, load(main2.Game(), pits), player, depth, -inf, inf, heuristic2, maximum)
+            actual, _ = MinimaxAlphaBetaPruning(
+                play, load(main2.Game(), pits), player, depth, -inf, inf, heuristic2, maximum, tt=tt)
+            if actual != expected:
+                failures.append(("main2 shared tt", pits, mode, maxplayer, expected, actual))
+    return failures
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, default=2000)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    failures = []
+    for _ in range(args.positions):
+        pits = randomPosition(rng)
+        failures.extend(check(pits, args.depth, rng))
+        failures.extend(checkSharedTable(pits, args.depth, rng.choice([1, 2])))
+    for failure in failures[:10]:
+        print("MISMATCH", *failure)
+    print(f"{args.positions} positions at depth {args.depth}: {len(failures)} mismatches")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run()
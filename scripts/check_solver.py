@@ -0,0 +1,77 @@
+"""Differential check: the MTD(f) solver against exhaustive alpha-beta.
+
+Run from the repository root::
+
+    python -m scripts.check_solver [--positions N] [--seeds K] [--seed S]
+
+Every random endgame (random play down to at most ``--seeds`` seeds in the
+pits) is solved by ``Solver``, with and without a small tablebase built in
+a temporary file, and by ``Search`` without a depth or time limit, which
+only stops once no leaf was cut off by the horizon.  The values must agree,
+the solver's move must reach the value (the position after it, searched the
+same way, keeps it) and the position must be left as it was found.
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from mancala.game import Game
+from mancala.search import Search
+from mancala.solver import Solver, randomPosition
+from mancala.tablebase import Tablebase, build
+
+
+def exact(game, side):
+    return Search(evaluator='evaluate').run(game, side)[0]
+
+
+def check(game, side, solvers):
+    failures = []
+    pits = list(game.state.pits)
+    expected = exact(game, side)
+    for name, solver in solvers:
+        value, pit = solver.run(game, side)
+        if value != expected:
+            failures.append((name, pits, side, expected, value))
+        if game.state.pits != pits:
+            failures.append((name + " state", pits, game.state.pits))
+            continue
+        record = game.state.doMove(side, pit)
+        after = exact(game, 3 - side)
+        game.state.undoMove(record)
+        if after != expected:
+            failures.append((name + " move", pits, side, pit, expected, after))
+    return failures
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, default=150)
+    parser.add_argument('--seeds', type=int, default=14)
+    parser.add_argument('--tablebase-seeds', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    handle, path = tempfile.mkstemp(suffix=".tb")
+    os.close(handle)
+    try:
+        build(args.tablebase_seeds, path)
+        tablebase = Tablebase(path)
+        failures = []
+        for _ in range(args.positions):
+            game, side = randomPosition(Game, rng, args.seeds)
+            failures.extend(check(game, side, [("solver", Solver()), ("solver+tablebase", Solver(tablebase))]))
+        tablebase.close()
+    finally:
+        os.remove(path)
+    for failure in failures[:10]:
+        print("MISMATCH", *failure)
+    print(f"{args.positions} endgames of up to {args.seeds} seeds: {len(failures)} mismatches")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,89 @@
+"""Differential check: the endgame tablebase against brute-force negamax.
+
+Run from the repository root::
+
+    python -m scripts.check_tablebase [--positions N] [--seeds K] [--seed S]
+
+Builds a table of up to ``--seeds`` seeds in a temporary file, then plays
+every random endgame (at most that many seeds in the pits, any stores, either
+side to move) out to the end with a plain alpha-beta negamax that shares no
+code with the table.  The final store difference of ``Tablebase.value`` and
+the value of the move ``Tablebase.bestMove`` picks must both equal the
+search's.
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from mancala.board import PLAYER_PITS, MancalaBoard
+from mancala.tablebase import Tablebase, build
+
+
+def negamax(state, side, alpha, beta):
+    """Final store difference for ``side`` to move under perfect play."""
+    if state.is_terminal():
+        score_1, score_2 = state.final_scores()
+        return score_1 - score_2 if side == 1 else score_2 - score_1
+    best = float('-inf')
+    for index in PLAYER_PITS[side]:
+        if not state.pits[index]:
+            continue
+        record = state.sow(side, index)
+        value = -negamax(state, 3 - side, -beta, -alpha)
+        state.unsow(record)
+        if value > best:
+            best = value
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    return best
+
+
+def randomEndgame(rng, max_seeds):
+    pits = [0] * 14
+    for _ in range(rng.randint(1, max_seeds)):
+        pits[rng.choice((0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12))] += 1
+    rest = 48 - sum(pits)
+    pits[6] = rng.randint(0, rest)
+    pits[13] = rest - pits[6]
+    return pits
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--positions', type=int, default=200)
+    parser.add_argument('--seeds', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    handle, path = tempfile.mkstemp(suffix=".tb")
+    os.close(handle)
+    try:
+        build(args.seeds, path)
+        tablebase = Tablebase(path)
+        failures = []
+        for _ in range(args.positions):
+            pits = randomEndgame(rng, args.seeds)
+            side = rng.choice((1, 2))
+            state = MancalaBoard.fromPits(pits)
+            expected = negamax(state, side, float('-inf'), float('inf'))
+            value = tablebase.value(state, side)
+            best, index = tablebase.bestMove(state, side) if not state.is_terminal() else (expected, None)
+            if value != expected or best != expected:
+                failures.append((pits, side, expected, value, best, index))
+            if state.pits != pits:
+                failures.append(("state", pits, state.pits))
+        tablebase.close()
+    finally:
+        os.remove(path)
+    for failure in failures[:10]:
+        print("MISMATCH", *failure)
+    print(f"{args.positions} endgames of up to {args.seeds} seeds: {len(failures)} mismatches")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run()
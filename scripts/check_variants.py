@@ -0,0 +1,103 @@
+"""Differential check of the generated boards for other pit and seed counts.
+
+Run from the repository root::
+
+    python -m scripts.check_variants [--games N] [--seed S]
+
+Random games are played on every board from 4 to 8 pits a side and 3 to 6
+seeds a pit.  Each move is compared with a plain seed-by-seed sowing of the
+same rules, the incremental seed counts and hash with
+values recomputed from scratch (and ``features()`` with a plain count), and
+undoing the move must restore the position exactly.
+"""
+import argparse
+import random
+
+from mancala import MancalaBoard
+from mancala.board import layout
+
+PITS = range(4, 9)
+SEEDS = range(3, 7)
+
+
+def referenceSow(pits, n, side, index):
+    """The rules spelled out: one seed at a time, skipping the other store."""
+    pits = list(pits)
+    store, skip = (n, 2 * n + 1) if side == 1 else (2 * n + 1, n)
+    own = range(0, n) if side == 1 else range(n + 1, 2 * n + 1)
+    seeds, pits[index] = pits[index], 0
+    i = index
+    while seeds:
+        i = (i + 1) % len(pits)
+        if i == skip:
+            continue
+        pits[i] += 1
+        seeds -= 1
+    if i in own and pits[i] == 1:
+        pits[store] += pits[2 * n - i] + 1
+        pits[2 * n - i] = 0
+        pits[i] = 0
+    return pits
+
+
+def referenceFeatures(pits, n):
+    stores = pits[n] - pits[-1]
+    counts = {}
+    for side, own in ((1, range(0, n)), (2, range(n + 1, 2 * n + 1))):
+        counts[side] = (sum(pits[i] for i in own), sum(pits[i] == 0 for i in own),
+                        sum(pits[2 * n - i] for i in own if pits[i] == 0))
+    return (stores,) + tuple(a - b for a, b in zip(counts[1], counts[2]))
+
+
+def check(board_class, rng):
+    config = board_class.layout
+    n = config.pits
+    state = board_class()
+    side = 1
+    moves = 0
+    while not state.is_terminal():
+        index = rng.choice([i for i in config.player_pits[side] if state.pits[i]])
+        before = (list(state.pits), list(state.side_seeds), state.hash)
+        expected = referenceSow(state.pits, n, side, index)
+        record = state.sow(side, index)
+        if state.pits != expected:
+            raise AssertionError(f"{config}: sowing {index} for {side} from {before[0]} gave {state.pits}")
+        if state.side_seeds != [0, sum(state.pits[0:n]), sum(state.pits[n + 1:-1])]:
+            raise AssertionError(f"{config}: side seeds {state.side_seeds} for {state.pits}")
+        if state.features() != referenceFeatures(state.pits, n):
+            raise AssertionError(f"{config}: features {state.features()} for {state.pits}")
+        if state.hash != config.zobristHash(state.pits):
+            raise AssertionError(f"{config}: stale hash after {before[0]} -> {state.pits}")
+        state.unsow(record)
+        if (state.pits, state.side_seeds, state.hash) != before:
+            raise AssertionError(f"{config}: undo of {index} did not restore {before[0]}")
+        state.sow(side, index)
+        side = 3 - side
+        moves += 1
+    if sum(state.pits) != config.total_seeds:
+        raise AssertionError(f"{config}: seeds not conserved")
+    return moves
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=50, help="games per board")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if MancalaBoard.variant(6, 4) is not MancalaBoard or layout(6, 4) is not MancalaBoard.layout:
+        raise AssertionError("the standard board is not the default variant")
+    rng = random.Random(args.seed)
+    total = 0
+    for pits in PITS:
+        for seeds in SEEDS:
+            board_class = MancalaBoard.variant(pits, seeds)
+            if MancalaBoard.variant(pits, seeds) is not board_class:
+                raise AssertionError("variant classes are not cached")
+            for _ in range(args.games):
+                total += check(board_class, rng)
+    print(f"{len(PITS) * len(SEEDS)} boards, {total} moves: ok")
+
+
+if __name__ == "__main__":
+    run()